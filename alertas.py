@@ -0,0 +1,337 @@
+"""
+Motor de alertas incremental.
+
+Las alertas se guardan en memoria por persona y por proyecto. Cada
+actualización lee la tabla `cambios` (alimentada por triggers, ver
+migraciones/0004_cambios.sql) desde el último id procesado y solo recalcula las
+personas y proyectos tocados. El primer uso del día hace un recálculo
+total, porque "termina pronto" y "sin asignación" dependen de la fecha.
+Sin tabla de cambios se recalcula todo cada TTL_SIN_REGISTRO segundos.
+
+Tipos: sobrecarga (> 100 % algún día laborable), solapamiento (pares de
+asignaciones que juntas superan el 100 %), proyecto confirmado sin
+personal, asignación que termina pronto y persona sin asignación.
+"""
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+import metricas
+from calendario_laboral import disponibilidad
+from carga import DEDICACION_COMPLETA, acumular, dedicaciones, fechas
+from database import get_connection
+
+HORIZONTE_DIAS = 30      # sobrecarga / solapamiento
+AVISO_FIN_DIAS = 7       # asignación que termina pronto
+OCIO_DIAS = 14           # persona sin asignación
+
+TTL_SIN_REGISTRO = 60
+RETENCION_CAMBIOS_DIAS = 7
+
+NIVELES = {"alta": "🔴", "media": "🟠", "baja": "🟡"}
+
+
+def _alerta(tipo, nivel, mensaje, personal_id=None, proyecto_id=None):
+    return {
+        "tipo": tipo,
+        "nivel": nivel,
+        "personal_id": personal_id,
+        "proyecto_id": proyecto_id,
+        "mensaje": mensaje,
+    }
+
+
+# =====================================================
+# REGLAS (SIN BD)
+# =====================================================
+def alertas_personas(personal, asignaciones, trabaja, hoy):
+    """
+    personal: DataFrame id, nombre
+    asignaciones: DataFrame id, personal_id, proyecto_id, proyecto, inicio, fin, dedicacion
+    trabaja: bool (personas × HORIZONTE_DIAS) días laborables sin ausencia
+
+    Devuelve {personal_id: [alertas]} para todas las personas recibidas.
+    """
+    ids = personal["id"].to_numpy()
+    nombres = personal["nombre"].to_numpy()
+    resultado = {int(i): [] for i in ids}
+
+    idx = pd.Index(ids).get_indexer(asignaciones["personal_id"])
+    ini = fechas(asignaciones["inicio"])
+    fin = fechas(asignaciones["fin"])
+    ded = dedicaciones(asignaciones)
+    origen = np.datetime64(hoy, "D")
+
+    diaria = acumular(len(ids), idx, ini, fin, ded, origen, trabaja.shape[1]) * trabaja
+
+    # Sobrecarga
+    exceso = diaria > DEDICACION_COMPLETA
+    for p in np.nonzero(exceso.any(axis=1))[0]:
+        resultado[int(ids[p])].append(_alerta(
+            "sobrecarga", "alta",
+            f"{nombres[p]}: sobreasignado {int(exceso[p].sum())} días laborables "
+            f"(pico {int(diaria[p].max())} %)",
+            personal_id=int(ids[p])
+        ))
+
+    # Sin asignación en los próximos OCIO_DIAS días
+    ocioso = diaria[:, :OCIO_DIAS].sum(axis=1) == 0
+    for p in np.nonzero(ocioso & trabaja[:, :OCIO_DIAS].any(axis=1))[0]:
+        resultado[int(ids[p])].append(_alerta(
+            "sin_asignacion", "baja",
+            f"{nombres[p]}: sin asignación en los próximos {OCIO_DIAS} días",
+            personal_id=int(ids[p])
+        ))
+
+    # Termina pronto
+    limite = origen + np.timedelta64(AVISO_FIN_DIAS, "D")
+    pronto = (fin >= origen) & (fin <= limite)
+    for r, p in zip(asignaciones[pronto].itertuples(), idx[pronto]):
+        resultado[int(ids[p])].append(_alerta(
+            "termina_pronto", "media",
+            f"{nombres[p]}: la asignación a {r.proyecto} termina el {r.fin}",
+            personal_id=int(ids[p]), proyecto_id=int(r.proyecto_id)
+        ))
+
+    # Solapamientos que superan el 100 % (pares de la misma persona)
+    a = asignaciones.assign(d0=ini, d1=fin, ded=ded)
+    pares = a.merge(a, on="personal_id", suffixes=("", "_b"))
+    pares = pares[
+        (pares["id"] < pares["id_b"])
+        & (pares["d0"] <= pares["d1_b"])
+        & (pares["d0_b"] <= pares["d1"])
+        & (pares["ded"] + pares["ded_b"] > DEDICACION_COMPLETA)
+    ]
+    pos = dict(zip(ids, range(len(ids))))
+    for r in pares.itertuples():
+        p = pos[r.personal_id]
+        resultado[int(r.personal_id)].append(_alerta(
+            "solapamiento", "alta",
+            f"{nombres[p]}: {r.proyecto} y {r.proyecto_b} se solapan "
+            f"({max(r.d0, r.d0_b):%Y-%m-%d} → {min(r.d1, r.d1_b):%Y-%m-%d})",
+            personal_id=int(r.personal_id), proyecto_id=int(r.proyecto_id)
+        ))
+
+    return resultado
+
+
+def alertas_proyectos(proyectos):
+    """
+    proyectos: DataFrame id, nombre, inicio, personas (asignaciones activas)
+    Devuelve {proyecto_id: [alertas]}.
+    """
+    resultado = {int(i): [] for i in proyectos["id"]}
+    for r in proyectos[proyectos["personas"] == 0].itertuples():
+        resultado[int(r.id)].append(_alerta(
+            "proyecto_sin_personal", "alta",
+            f"Proyecto confirmado {r.nombre} (inicio {r.inicio}) sin personal asignado",
+            proyecto_id=int(r.id)
+        ))
+    return resultado
+
+
+# =====================================================
+# MOTOR INCREMENTAL
+# =====================================================
+class MotorAlertas:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._por_persona = {}
+        self._por_proyecto = {}
+        self._ultimo = None         # último id de `cambios` procesado
+        self._dia = None            # fecha del último recálculo total
+        self._leido = 0.0
+        self.ultima_actualizacion = {}
+
+    # ---------- lectura ----------
+    def _personas(self, conn, ids, hoy):
+        filtro = "" if ids is None else "AND p.id = ANY(%(ids)s)"
+        params = {"ids": ids, "hoy": hoy, "hasta": hoy + timedelta(days=HORIZONTE_DIAS - 1)}
+
+        personal = pd.read_sql(f"""
+            SELECT p.id, p.nombre
+            FROM personal p
+            WHERE p.activo = TRUE
+            {filtro}
+            ORDER BY p.id
+        """, conn, params=params)
+
+        asignaciones = pd.read_sql(f"""
+            SELECT a.id, a.personal_id, a.proyecto_id, pr.nombre AS proyecto,
+                   a.inicio, a.fin, a.dedicacion
+            FROM asignaciones a
+            JOIN proyectos pr ON pr.id = a.proyecto_id
+            JOIN personal p ON p.id = a.personal_id
+            WHERE a.activa = TRUE
+            AND pr.eliminado = FALSE
+            AND p.activo = TRUE
+            AND a.inicio <= %(hasta)s
+            AND a.fin >= %(hoy)s
+            {filtro}
+        """, conn, params=params)
+
+        trabaja = disponibilidad(personal["id"], hoy, HORIZONTE_DIAS)
+        return alertas_personas(personal, asignaciones, trabaja, hoy)
+
+    def _proyectos(self, conn, ids, hoy):
+        filtro = "" if ids is None else "AND pr.id = ANY(%(ids)s)"
+
+        proyectos = pd.read_sql(f"""
+            SELECT pr.id, pr.nombre, pr.inicio,
+                   COUNT(a.id) AS personas
+            FROM proyectos pr
+            LEFT JOIN asignaciones a ON a.proyecto_id = pr.id AND a.activa = TRUE
+            WHERE pr.confirmado = TRUE
+            AND pr.eliminado = FALSE
+            AND pr.fin >= %(hoy)s
+            {filtro}
+            GROUP BY pr.id, pr.nombre, pr.inicio
+        """, conn, params={"ids": ids, "hoy": hoy})
+
+        return alertas_proyectos(proyectos)
+
+    def _cambios(self, cur):
+        """
+        (último id, personas, proyectos) pendientes. Falla si no existe la tabla.
+        """
+        cur.execute("""
+            SELECT COALESCE(MAX(id), 0),
+                   ARRAY_AGG(DISTINCT personal_id) FILTER (WHERE personal_id IS NOT NULL),
+                   ARRAY_AGG(DISTINCT proyecto_id) FILTER (WHERE proyecto_id IS NOT NULL)
+            FROM cambios
+            WHERE id > %s
+        """, (self._ultimo or 0,))
+        ultimo, personas, proyectos = cur.fetchone()
+        return ultimo, set(personas or ()), set(proyectos or ())
+
+    # ---------- actualización ----------
+    def actualizar(self):
+        """
+        Aplica los cambios pendientes. Devuelve (personas, proyectos)
+        recalculados; None significa "todos".
+        """
+        with self._lock:
+            hoy = date.today()
+            conn = get_connection()
+            cur = conn.cursor()
+
+            try:
+                try:
+                    ultimo, personas, proyectos = self._cambios(cur)
+                    con_registro = True
+                except Exception:
+                    conn.rollback()
+                    con_registro = False
+
+                total = (
+                    self._dia != hoy
+                    or (con_registro and self._ultimo is None)
+                    or (not con_registro and time.monotonic() - self._leido > TTL_SIN_REGISTRO)
+                )
+
+                if total:
+                    self._por_persona = self._personas(conn, None, hoy)
+                    self._por_proyecto = self._proyectos(conn, None, hoy)
+                    personas = proyectos = None
+
+                elif con_registro and (personas or proyectos):
+                    # Un proyecto tocado afecta a todo su personal
+                    if proyectos:
+                        cur.execute("""
+                            SELECT DISTINCT personal_id
+                            FROM asignaciones
+                            WHERE proyecto_id = ANY(%s)
+                        """, (list(proyectos),))
+                        personas |= {r[0] for r in cur.fetchall()}
+
+                    # Se reemplaza cada id tocado: los que no vuelven (inactivos,
+                    # eliminados, ya confirmados) se quedan sin alertas
+                    if personas:
+                        nuevas = self._personas(conn, list(personas), hoy)
+                        for pid in personas:
+                            self._por_persona[pid] = nuevas.get(pid, [])
+                    if proyectos:
+                        nuevas = self._proyectos(conn, list(proyectos), hoy)
+                        for pid in proyectos:
+                            self._por_proyecto[pid] = nuevas.get(pid, [])
+
+                else:
+                    personas = proyectos = set()
+
+                if con_registro:
+                    self._ultimo = ultimo
+                if total:
+                    self._dia = hoy
+                    self._leido = time.monotonic()
+
+                self.ultima_actualizacion = {
+                    "fecha": time.strftime("%H:%M:%S"),
+                    "personas": "todas" if personas is None else len(personas),
+                    "proyectos": "todos" if proyectos is None else len(proyectos),
+                }
+                return personas, proyectos
+
+            finally:
+                cur.close()
+                conn.close()
+
+    # ---------- consulta ----------
+    def alertas(self, pid=None):
+        """
+        Alertas de una persona o de todas (incluye proyectos sin personal).
+        """
+        self.actualizar()
+
+        with self._lock:
+            if pid is None:
+                metricas.registrar_cache("alertas", True)
+                lista = [a for v in self._por_persona.values() for a in v]
+                lista += [a for v in self._por_proyecto.values() for a in v]
+                return lista
+
+            pid = int(pid)
+            metricas.registrar_cache("alertas", pid in self._por_persona)
+            propias = list(self._por_persona.get(pid, ()))
+
+        if pid not in self._por_persona:
+            with self._lock:
+                conn = get_connection()
+                try:
+                    self._por_persona.update(self._personas(conn, [pid], date.today()))
+                finally:
+                    conn.close()
+                propias = list(self._por_persona.get(pid, ()))
+
+        return propias
+
+
+_motor = MotorAlertas()
+
+
+def obtener_alertas(pid=None):
+    return _motor.alertas(pid)
+
+
+def a_tabla(alertas):
+    columnas = ["nivel", "tipo", "mensaje", "personal_id", "proyecto_id"]
+    orden = {"alta": 0, "media": 1, "baja": 2}
+    df = pd.DataFrame(alertas, columns=columnas)
+    return df.sort_values("nivel", key=lambda s: s.map(orden), kind="stable").reset_index(drop=True)
+
+
+def purgar_cambios(dias=RETENCION_CAMBIOS_DIAS):
+    """
+    Borra registros de `cambios` ya antiguos (el motor solo lee los nuevos).
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM cambios WHERE fecha < NOW() - %s * INTERVAL '1 day'", (dias,))
+    borrados = cur.rowcount
+    conn.commit()
+    cur.close()
+    conn.close()
+    return borrados
@@ -1,5 +1,10 @@
+import threading
+
 import streamlit as st
 from logic import validar_usuario, tiene_permiso, asegurar_sesion
+from particiones import crear_particiones_futuras
+from metricas import iniciar_servidor
+from vencimientos import MAX_LOTES_APP, vencer_asignaciones
 
 # =====================================================
 # CONFIG APP
@@ -9,6 +14,47 @@ st.set_page_config(
     layout="wide"
 )
 
+# =====================================================
+# PARTICIONES FUTURAS (UNA VEZ POR PROCESO / DÍA)
+# =====================================================
+@st.cache_resource(ttl=86400, show_spinner=False)
+def mantener_particiones():
+    return crear_particiones_futuras()
+
+try:
+    mantener_particiones()
+except Exception:
+    # Los errores no se cachean: se reintenta en el siguiente rerun
+    pass
+
+# =====================================================
+# ASIGNACIONES VENCIDAS (UNA VEZ POR PROCESO / DÍA)
+# =====================================================
+@st.cache_resource(ttl=86400, show_spinner=False)
+def vencer_asignaciones_diario():
+    # En segundo plano y acotada: no retrasa el primer render;
+    # el resto (si lo hay) lo hace el cron o la siguiente pasada
+    def _tarea():
+        try:
+            vencer_asignaciones(max_lotes=MAX_LOTES_APP)
+        except Exception:
+            pass
+
+    hilo = threading.Thread(target=_tarea, name="vencer-asignaciones", daemon=True)
+    hilo.start()
+    return hilo
+
+vencer_asignaciones_diario()
+
+# =====================================================
+# MÉTRICAS PROMETHEUS (SERVIDOR LATERAL)
+# =====================================================
+@st.cache_resource(show_spinner=False)
+def servidor_metricas():
+    return iniciar_servidor()
+
+servidor_metricas()
+
 # =====================================================
 # SESSION SEGURA (SIEMPRE PRIMERO)
 # =====================================================
@@ -82,6 +128,9 @@ st.sidebar.page_link("app.py", label="Dashboard")
 if rol in ["admin", "gestor"]:
     st.sidebar.page_link("pages/proyectos.py", label="Proyectos")
     st.sidebar.page_link("pages/asignaciones.py", label="Asignaciones")
+    st.sidebar.page_link("pages/planificacion_horizonte.py", label="Planificador")
+    st.sidebar.page_link("pages/nivelacion.py", label="Nivelación")
+    st.sidebar.page_link("pages/calendario_laboral.py", label="Calendario laboral")
 
 # Calendario (todos)
 st.sidebar.page_link("pages/calendario_recursos.py", label="Calendario")
@@ -89,6 +138,8 @@ st.sidebar.page_link("pages/calendario_recursos.py", label="Calendario")
 # Usuarios (solo admin)
 if rol == "admin":
     st.sidebar.page_link("pages/usuarios.py", label="Usuarios")
+    st.sidebar.page_link("pages/rendimiento_consultas.py", label="Rendimiento SQL")
+    st.sidebar.page_link("pages/depuracion_trazas.py", label="Trazas de render")
 
 # =====================================================
 # PANTALLA PRINCIPAL
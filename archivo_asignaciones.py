@@ -0,0 +1,129 @@
+"""
+Separación caliente / fría de asignaciones.
+
+Las asignaciones terminadas hace más de RETENCION_DIAS (activas o no) se
+mueven a asignaciones_archivo en lotes de LOTE filas. Cada lote es una
+única sentencia (DELETE … RETURNING → INSERT) en su propia transacción,
+y las filas bloqueadas por otra sesión se saltan (SKIP LOCKED). Así la
+tabla caliente solo guarda lo vigente y lo reciente, y disponibilidad,
+calendario y alertas recorren menos filas. La vista asignaciones_todas
+sigue mostrando todo para informes.
+
+Tablas y vista: migraciones/0007_archivo_asignaciones.sql.
+Programado por cron, p. ej. cada noche:
+
+    30 2 * * *  cd /app && python mantenimiento.py archivar-asignaciones
+"""
+import time
+from datetime import date, timedelta
+
+import metricas
+from database import get_connection
+
+RETENCION_DIAS = 180
+LOTE = 5000
+
+
+def _columnas(cur):
+    """
+    Columnas comunes a asignaciones y asignaciones_archivo, en orden.
+    """
+    cur.execute("""
+        SELECT a.column_name
+        FROM information_schema.columns a
+        JOIN information_schema.columns b
+            ON b.table_schema = a.table_schema
+            AND b.table_name = 'asignaciones_archivo'
+            AND b.column_name = a.column_name
+        WHERE a.table_schema = current_schema()
+        AND a.table_name = 'asignaciones'
+        ORDER BY a.ordinal_position
+    """)
+    return [r[0] for r in cur.fetchall()]
+
+
+def archivar_asignaciones(retencion_dias=RETENCION_DIAS, lote=LOTE, max_lotes=None, vacuum=False):
+    """
+    Mueve al archivo las asignaciones con fin anterior a hoy − retencion_dias.
+    Devuelve dict filas, lotes, segundos y corte.
+    """
+    corte = date.today() - timedelta(days=retencion_dias)
+    t0 = time.perf_counter()
+    filas = lotes = 0
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        columnas = ", ".join(_columnas(cur))
+
+        while max_lotes is None or lotes < max_lotes:
+            # Mover filas ya terminadas no cambia la planificación:
+            # el trigger de `cambios` no las registra
+            cur.execute("SET LOCAL cambios.omitir = 'on'")
+            cur.execute(f"""
+                WITH lote AS (
+                    SELECT id
+                    FROM asignaciones
+                    WHERE fin < %s
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                ), movidas AS (
+                    DELETE FROM asignaciones a
+                    USING lote
+                    WHERE a.id = lote.id
+                    RETURNING a.*
+                )
+                INSERT INTO asignaciones_archivo ({columnas})
+                SELECT {columnas} FROM movidas
+            """, (corte, lote))
+            n = cur.rowcount
+            conn.commit()
+
+            if n <= 0:
+                break
+            filas += n
+            lotes += 1
+
+        if vacuum and filas:
+            conn.autocommit = True
+            cur.execute("VACUUM (ANALYZE) asignaciones")
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+    segundos = time.perf_counter() - t0
+    metricas.registrar_tarea("archivar_asignaciones", filas, segundos)
+
+    return {
+        "filas": filas,
+        "lotes": lotes,
+        "segundos": round(segundos, 2),
+        "corte": corte,
+    }
+
+
+def resumen_archivo():
+    """
+    Filas en caliente y en archivo (para ver el efecto del archivado).
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM asignaciones),
+                (SELECT COUNT(*) FROM asignaciones_archivo),
+                (SELECT MAX(archivada_en) FROM asignaciones_archivo)
+        """)
+        caliente, archivo, ultima = cur.fetchone()
+        return {"caliente": caliente, "archivo": archivo, "ultima": ultima}
+    finally:
+        cur.close()
+        conn.close()
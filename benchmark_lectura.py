@@ -0,0 +1,139 @@
+"""
+Benchmark de lectura: pd.read_sql frente a lectura.leer_frame (COPY + tipos).
+
+Requiere una base Postgres con datos (ver generar_dataset.py):
+
+    python benchmark_lectura.py
+    python benchmark_lectura.py --repeticiones 5 --salida bench/lectura.json
+
+Para cada consulta mide la mediana de tiempo, el pico de memoria durante
+la lectura (tracemalloc, incluye los buffers de numpy) y el tamaño final
+del DataFrame (memory_usage(deep=True)). En read_sql se incluye la
+conversión a datetime que hacían las páginas para que ambas rutas
+entreguen fechas utilizables.
+"""
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from database import get_connection
+from lectura import leer_frame
+
+CONSULTAS = {
+    "asignaciones": ("""
+        SELECT
+            a.id,
+            p.nombre AS "Personal",
+            pr.nombre AS "Proyecto",
+            a.inicio AS "Inicio",
+            a.fin AS "Fin",
+            a.dedicacion AS "Dedicacion",
+            a.activa
+        FROM asignaciones a
+        JOIN personal p ON p.id = a.personal_id
+        JOIN proyectos pr ON pr.id = a.proyecto_id
+        ORDER BY a.inicio
+    """, ["Inicio", "Fin"], ()),
+    "historial": ("""
+        SELECT
+            ph.fecha,
+            p.nombre AS proyecto,
+            ph.accion,
+            ph.campo,
+            ph.valor_anterior,
+            ph.valor_nuevo,
+            ph.usuario
+        FROM proyectos_historial ph
+        JOIN proyectos p ON p.id = ph.proyecto_id
+        ORDER BY ph.fecha DESC
+    """, ["fecha"], ("valor_anterior", "valor_nuevo")),
+}
+
+
+def _read_sql(conn, consulta, fechas, texto):
+    df = pd.read_sql(consulta, conn)
+    for c in fechas:
+        df[c] = pd.to_datetime(df[c], errors="coerce")
+    return df
+
+
+def _leer_frame(conn, consulta, fechas, texto):
+    return leer_frame(consulta, conn=conn, texto=texto)
+
+
+METODOS = {"read_sql": _read_sql, "leer_frame": _leer_frame}
+
+
+def medir(metodo, consulta, repeticiones):
+    conn = get_connection()
+    tiempos, picos = [], []
+
+    try:
+        metodo(conn, *consulta)   # calentamiento (y caché de descripción)
+
+        for _ in range(repeticiones):
+            tracemalloc.start()
+            t0 = time.perf_counter()
+            df = metodo(conn, *consulta)
+            tiempos.append((time.perf_counter() - t0) * 1000)
+            picos.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+    finally:
+        conn.close()
+
+    return {
+        "mediana_ms": round(statistics.median(tiempos), 3),
+        "min_ms": round(min(tiempos), 3),
+        "pico_mb": round(max(picos) / 2**20, 2),
+        "frame_mb": round(df.memory_usage(deep=True).sum() / 2**20, 2),
+        "filas": len(df),
+        "tipos": {c: str(t) for c, t in df.dtypes.items()},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="pd.read_sql vs COPY tipado")
+    parser.add_argument("--repeticiones", type=int, default=3)
+    parser.add_argument("--consulta", choices=list(CONSULTAS), help="Solo esta consulta")
+    parser.add_argument("--salida", default="bench/lectura.json")
+    args = parser.parse_args(argv)
+
+    # pandas avisa en cada read_sql sobre conexiones DBAPI crudas
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    resultados = {}
+    for nombre, consulta in CONSULTAS.items():
+        if args.consulta and nombre != args.consulta:
+            continue
+
+        resultados[nombre] = {m: medir(fn, consulta, args.repeticiones) for m, fn in METODOS.items()}
+        base, nuevo = resultados[nombre]["read_sql"], resultados[nombre]["leer_frame"]
+
+        print(f"📊 {nombre} ({nuevo['filas']} filas)")
+        for m, r in resultados[nombre].items():
+            print(f"   {m:<11} {r['mediana_ms']:>9.1f} ms  pico {r['pico_mb']:>8.1f} MB  frame {r['frame_mb']:>8.1f} MB")
+        print(
+            f"   → x{base['mediana_ms'] / max(nuevo['mediana_ms'], 1e-9):.1f} más rápido, "
+            f"frame x{base['frame_mb'] / max(nuevo['frame_mb'], 1e-9):.1f} más pequeño"
+        )
+
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps({
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "repeticiones": args.repeticiones,
+        "consultas": resultados,
+    }, indent=2, ensure_ascii=False))
+    print(f"✅ Resultados en {salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Micro-benchmarks de las funciones públicas de logic.py.
+
+Requiere una base Postgres con datos (ver generar_dataset.py):
+
+    python generar_dataset.py --destino postgres --crear-esquema --limpiar
+    python benchmark_logic.py --salida bench/base.json
+    python benchmark_logic.py --salida bench/nuevo.json --comparar bench/base.json
+
+Con --comparar el proceso termina con código 1 si algún caso empeora
+más que --tolerancia respecto a la referencia.
+
+Solo Postgres: logic.py usa psycopg2, así que el destino sqlite de
+generar_dataset.py no sirve para este benchmark.
+"""
+import argparse
+import io
+import json
+import platform
+import statistics
+import sys
+import time
+import warnings
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+import importaciones
+import logic
+from database import get_connection
+
+CASOS = []
+
+
+def caso(nombre, escritura=False):
+    def decorador(fn):
+        CASOS.append((nombre, fn, escritura))
+        return fn
+    return decorador
+
+
+# =====================================================
+# CONTEXTO (IDS REALES DEL DATASET)
+# =====================================================
+class Contexto:
+    def __init__(self):
+        conn = get_connection()
+        cur = conn.cursor()
+
+        cur.execute("SELECT COUNT(*) FROM personal")
+        self.n_personal = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM proyectos")
+        self.n_proyectos = cur.fetchone()[0]
+        cur.execute("SELECT COUNT(*) FROM asignaciones")
+        self.n_asignaciones = cur.fetchone()[0]
+
+        # Persona con más asignaciones activas → peor caso por persona
+        cur.execute("""
+            SELECT personal_id
+            FROM asignaciones
+            WHERE activa = TRUE
+            GROUP BY personal_id
+            ORDER BY COUNT(*) DESC
+            LIMIT 1
+        """)
+        row = cur.fetchone()
+        self.pid = row[0] if row else None
+
+        cur.execute("SELECT usuario FROM usuarios WHERE activo = TRUE ORDER BY id LIMIT 1")
+        row = cur.fetchone()
+        self.usuario = row[0] if row else None
+
+        logic.cerrar(conn, cur)
+
+        self.inicio = date.today()
+        self.fin = self.inicio + timedelta(days=14)
+        self.proyecto_bench = None
+
+
+# =====================================================
+# LECTURAS
+# =====================================================
+@caso("validar_usuario")
+def _(ctx):
+    return logic.validar_usuario(ctx.usuario, "clave-incorrecta")
+
+@caso("obtener_usuarios")
+def _(ctx):
+    return logic.obtener_usuarios()
+
+@caso("calendario_recursos")
+def _(ctx):
+    return logic.calendario_recursos(ctx.inicio - timedelta(weeks=4), ctx.inicio + timedelta(weeks=8))
+
+@caso("obtener_personal_dashboard")
+def _(ctx):
+    return logic.obtener_personal_dashboard()
+
+@caso("obtener_personal_disponible")
+def _(ctx):
+    return logic.obtener_personal_disponible(ctx.inicio, ctx.fin)
+
+@caso("obtener_asignaciones")
+def _(ctx):
+    return logic.obtener_asignaciones()
+
+@caso("iterar_asignaciones[bloques]")
+def _(ctx):
+    return [len(b) for b in logic.iterar_asignaciones()]
+
+@caso("obtener_carga_personal")
+def _(ctx):
+    return logic.obtener_carga_personal(ctx.pid)
+
+@caso("obtener_cargas_personal")
+def _(ctx):
+    return logic.obtener_cargas_personal(logic.obtener_personal_dashboard()["id"])
+
+@caso("sugerir_personal")
+def _(ctx):
+    return logic.sugerir_personal(ctx.inicio, ctx.fin, 5)
+
+@caso("obtener_proyectos")
+def _(ctx):
+    return logic.obtener_proyectos()
+
+@caso("hay_solapamiento")
+def _(ctx):
+    return logic.hay_solapamiento(ctx.pid, ctx.inicio, ctx.fin)
+
+@caso("kpi_proyectos")
+def _(ctx):
+    return logic.kpi_proyectos()
+
+@caso("kpi_personal")
+def _(ctx):
+    return logic.kpi_personal()
+
+@caso("kpi_asignaciones")
+def _(ctx):
+    return logic.kpi_asignaciones()
+
+@caso("kpi_proyectos_confirmados")
+def _(ctx):
+    return logic.kpi_proyectos_confirmados()
+
+@caso("kpi_solapamientos")
+def _(ctx):
+    return logic.kpi_solapamientos()
+
+@caso("obtener_alertas_por_persona")
+def _(ctx):
+    return logic.obtener_alertas_por_persona(ctx.pid)
+
+@caso("proyectos_gantt_por_persona[todos]")
+def _(ctx):
+    return logic.proyectos_gantt_por_persona()
+
+@caso("proyectos_gantt_por_persona[persona]")
+def _(ctx):
+    return logic.proyectos_gantt_por_persona(ctx.pid)
+
+@caso("logic_async.leer[dashboard]")
+def _(ctx):
+    import logic_async as la
+    return la.leer(
+        kpi_proyectos=la.kpi_proyectos(),
+        kpi_personal=la.kpi_personal(),
+        kpi_asignaciones=la.kpi_asignaciones(),
+        kpi_proyectos_confirmados=la.kpi_proyectos_confirmados(),
+        kpi_solapamientos=la.kpi_solapamientos(),
+        calendario=la.calendario_recursos(),
+        gantt=la.proyectos_gantt_por_persona(ctx.pid)
+    )
+
+
+# =====================================================
+# IMPORTACIONES (en simulación: todo se deshace con rollback)
+# =====================================================
+IMPORT_PERSONAL = 500
+IMPORT_PROYECTOS = 50
+IMPORT_ASIGNACIONES = 2000
+
+
+def _libro_erp(ctx):
+    """
+    Libro ERP sintético: personal existente (actualizaciones), proyectos
+    nuevos y asignaciones entre ambos. Se genera una vez por ejecución.
+    """
+    if getattr(ctx, "libro_erp", None) is not None:
+        return ctx.libro_erp
+
+    conn = get_connection()
+    personal = pd.read_sql(
+        "SELECT nombre, cargo, area FROM personal WHERE activo = TRUE ORDER BY id LIMIT %s",
+        conn, params=(IMPORT_PERSONAL,)
+    )
+    logic.cerrar(conn)
+
+    proyectos = pd.DataFrame({
+        "nombre": [f"__benchmark__ importación {i}" for i in range(IMPORT_PROYECTOS)],
+        "inicio": ctx.inicio,
+        "fin": ctx.fin,
+        "confirmado": False,
+    })
+    n = IMPORT_ASIGNACIONES
+    asignaciones = pd.DataFrame({
+        "personal": personal["nombre"].to_numpy()[[i % len(personal) for i in range(n)]],
+        "proyecto": proyectos["nombre"].to_numpy()[[i % IMPORT_PROYECTOS for i in range(n)]],
+        "inicio": ctx.inicio,
+        "fin": ctx.fin,
+        "dedicacion": 20,
+    })
+
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf) as xls:
+        personal.to_excel(xls, sheet_name="Personal", index=False)
+        proyectos.to_excel(xls, sheet_name="Proyectos", index=False)
+        asignaciones.to_excel(xls, sheet_name="Asignaciones", index=False)
+
+    ctx.libro_erp = buf.getvalue()
+    return ctx.libro_erp
+
+
+@caso("importaciones.analizar_erp[sin caché]")
+def _(ctx):
+    # La versión pública cachea por huella: se mide el análisis en sí
+    return importaciones._analizar_erp(_libro_erp(ctx))["hojas"]["Asignaciones"]
+
+@caso("importaciones.importar_erp[simulacion]", escritura=True)
+def _(ctx):
+    res = importaciones.importar_erp(importaciones.analizar_erp(_libro_erp(ctx)), simulacion=True)
+    return res["errores"]
+
+
+# =====================================================
+# ESCRITURAS (sobre un proyecto propio que se limpia al final)
+# =====================================================
+@caso("crear_proyecto", escritura=True)
+def _(ctx):
+    return logic.crear_proyecto("__benchmark__", ctx.inicio, ctx.fin, False)
+
+@caso("modificar_proyecto", escritura=True)
+def _(ctx):
+    return logic.modificar_proyecto(ctx.proyecto_bench, "__benchmark__", ctx.inicio, ctx.fin, True)
+
+@caso("asignar_personal", escritura=True)
+def _(ctx):
+    return logic.asignar_personal(ctx.proyecto_bench, [ctx.pid], ctx.inicio, ctx.fin)
+
+@caso("registrar_auditoria", escritura=True)
+def _(ctx):
+    return logic.registrar_auditoria(None, "BENCHMARK", "BENCHMARK", None, "benchmark")
+
+
+def preparar_escrituras(ctx):
+    logic.crear_proyecto("__benchmark__", ctx.inicio, ctx.fin, False)
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT MAX(id) FROM proyectos WHERE nombre = '__benchmark__'")
+    ctx.proyecto_bench = cur.fetchone()[0]
+    logic.cerrar(conn, cur)
+
+
+def limpiar_escrituras(ctx):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        DELETE FROM asignaciones
+        WHERE proyecto_id IN (SELECT id FROM proyectos WHERE nombre = '__benchmark__')
+    """)
+    cur.execute("DELETE FROM proyectos WHERE nombre = '__benchmark__'")
+    cur.execute("DELETE FROM auditoria WHERE accion = 'BENCHMARK'")
+    conn.commit()
+    logic.cerrar(conn, cur)
+
+
+# =====================================================
+# EJECUCIÓN
+# =====================================================
+def _filas(res):
+    if hasattr(res, "__len__"):
+        return len(res)
+    return None
+
+
+def medir(fn, ctx, repeticiones, calentamiento):
+    for _ in range(calentamiento):
+        fn(ctx)
+
+    tiempos = []
+    res = None
+    for _ in range(repeticiones):
+        t0 = time.perf_counter()
+        res = fn(ctx)
+        tiempos.append((time.perf_counter() - t0) * 1000)
+
+    tiempos.sort()
+    return {
+        "min_ms": round(tiempos[0], 3),
+        "mediana_ms": round(statistics.median(tiempos), 3),
+        "media_ms": round(statistics.fmean(tiempos), 3),
+        "p95_ms": round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 3),
+        "max_ms": round(tiempos[-1], 3),
+        "filas": _filas(res),
+    }
+
+
+def ejecutar(repeticiones=5, calentamiento=1, filtro=None, escrituras=True):
+    ctx = Contexto()
+    resultados = {}
+
+    if escrituras:
+        preparar_escrituras(ctx)
+
+    try:
+        for nombre, fn, es_escritura in CASOS:
+            if es_escritura and not escrituras:
+                continue
+            if filtro and filtro not in nombre:
+                continue
+
+            resultados[nombre] = medir(fn, ctx, repeticiones, calentamiento)
+            r = resultados[nombre]
+            print(f"⏱️ {nombre:<40} mediana {r['mediana_ms']:>9.2f} ms  p95 {r['p95_ms']:>9.2f} ms")
+
+    finally:
+        if escrituras:
+            limpiar_escrituras(ctx)
+
+    return {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "dataset": {
+            "personal": ctx.n_personal,
+            "proyectos": ctx.n_proyectos,
+            "asignaciones": ctx.n_asignaciones,
+        },
+        "repeticiones": repeticiones,
+        "casos": resultados,
+    }
+
+
+def comparar(actual, referencia, tolerancia):
+    """
+    Compara medianas caso a caso. Devuelve la lista de regresiones.
+    """
+    regresiones = []
+
+    for nombre, r in actual["casos"].items():
+        base = referencia.get("casos", {}).get(nombre)
+        if not base or not base["mediana_ms"]:
+            continue
+
+        ratio = r["mediana_ms"] / base["mediana_ms"]
+        marca = "🔴" if ratio > 1 + tolerancia else "🟢" if ratio < 1 - tolerancia else "⚪"
+        print(f"{marca} {nombre:<40} {base['mediana_ms']:>9.2f} → {r['mediana_ms']:>9.2f} ms  (x{ratio:.2f})")
+
+        if ratio > 1 + tolerancia:
+            regresiones.append(nombre)
+
+    return regresiones
+
+
+# =====================================================
+# CLI
+# =====================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de logic.py")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--calentamiento", type=int, default=1)
+    parser.add_argument("--filtro", help="Solo casos cuyo nombre contenga este texto")
+    parser.add_argument("--sin-escrituras", action="store_true")
+    parser.add_argument("--salida", default="bench/resultado.json")
+    parser.add_argument("--comparar", help="JSON de referencia")
+    parser.add_argument("--tolerancia", type=float, default=0.20)
+    args = parser.parse_args(argv)
+
+    # pandas avisa en cada read_sql sobre conexiones DBAPI crudas
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    resultado = ejecutar(args.repeticiones, args.calentamiento, args.filtro, not args.sin_escrituras)
+
+    salida = Path(args.salida)
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    print(f"✅ Resultados en {salida}")
+
+    if args.comparar:
+        referencia = json.loads(Path(args.comparar).read_text())
+        regresiones = comparar(resultado, referencia, args.tolerancia)
+        if regresiones:
+            print(f"❌ {len(regresiones)} regresiones: {', '.join(regresiones)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
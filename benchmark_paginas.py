@@ -0,0 +1,156 @@
+"""
+Consultas SQL por interacción en las páginas con st.fragment.
+
+Reproduce las interacciones con streamlit.testing (AppTest) y lee el
+contador de consultas de cada traza (trazas.trazar_pagina /
+trazar_fragmento). AppTest reejecuta siempre el script completo; aquí una
+interacción dentro de un fragmento reejecuta solo ese fragmento, como hace
+el navegador.
+
+Requiere una base Postgres con datos (ver generar_dataset.py):
+
+    python generar_dataset.py --destino postgres --crear-esquema --limpiar
+    python benchmark_paginas.py
+
+"usuarios: cambiar rol" escribe (cambia el rol del usuario 'user' y lo
+deja como estaba); --sin-escrituras lo omite.
+"""
+import argparse
+import warnings
+from pathlib import Path
+
+import logic  # noqa: F401  (antes de AppTest: pages/ queda primero en sys.path)
+import trazas
+from database import get_connection
+
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+import streamlit.testing.v1.local_script_runner as runner
+
+RAIZ = Path(__file__).resolve().parent
+
+_fragmento = [None]
+
+
+def _rerun_data(**datos):
+    # El navegador manda el id del fragmento que contiene el widget tocado
+    if _fragmento[0]:
+        datos["fragment_id_queue"] = [_fragmento[0]]
+    return RerunData(**datos)
+
+
+runner.RerunData = _rerun_data
+
+
+# =====================================================
+# SESIÓN SIMULADA
+# =====================================================
+def _sesion(pagina):
+    at = AppTest.from_file(str(RAIZ / "pages" / pagina), default_timeout=300)
+    at.session_state["autenticado"] = True
+    at.session_state["rol"] = "admin"
+    at.session_state["user_id"] = 1
+    at.session_state["usuario"] = "admin"
+    return at
+
+
+def _id_fragmento(at, funcion, argumento=None):
+    for fid, envoltura in at._fragment_storage._fragments.items():
+        celdas = dict(zip(
+            envoltura.__code__.co_freevars,
+            (c.cell_contents for c in envoltura.__closure__ or ())
+        ))
+        fn = celdas.get("non_optional_func")
+        if fn is not None and fn.__name__ == funcion and (argumento is None or celdas["args"][0] == argumento):
+            return fid
+    raise LookupError(f"Fragmento {funcion} no registrado")
+
+
+def _consultas(at, traza, fragmento=None):
+    """
+    Ejecuta un rerun (completo o del fragmento) y devuelve las consultas
+    de la traza resultante.
+    """
+    _fragmento[0] = fragmento
+    try:
+        at.run()
+    finally:
+        _fragmento[0] = None
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return trazas.obtener_trazas(traza)[0]["consultas"]
+
+
+def _widget(lista, etiqueta):
+    return next(w for w in lista if w.label == etiqueta)
+
+
+# =====================================================
+# CASOS
+# =====================================================
+def asignaciones():
+    resultado = {}
+
+    at = _sesion("asignaciones.py")
+    resultado["primera carga"] = _consultas(at, "Asignaciones")
+    resultado["rerun completo"] = _consultas(at, "Asignaciones")
+    manual = _widget(at.multiselect, "Selecciona personal (ordenado por menor carga)")
+    resultado["personal libre (N)"] = len(manual.options)
+
+    fid = _id_fragmento(at, "seccion_auto")
+    _widget(at.number_input, "Cantidad de personal requerido").set_value(2)
+    resultado["cambiar cantidad"] = _consultas(at, "Asignaciones · Auto", fid)
+
+    at = _sesion("asignaciones.py")
+    _consultas(at, "Asignaciones")
+    fid = _id_fragmento(at, "seccion_manual")
+    manual = _widget(at.multiselect, "Selecciona personal (ordenado por menor carga)")
+    manual.select(manual.options[0])
+    resultado["selección manual"] = _consultas(at, "Asignaciones · Manual", fid)
+
+    return resultado
+
+
+def usuarios(escrituras=True):
+    resultado = {}
+
+    at = _sesion("usuarios.py")
+    resultado["primera carga"] = _consultas(at, "Usuarios")
+    resultado["rerun completo"] = _consultas(at, "Usuarios")
+    if not escrituras:
+        return resultado
+
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("SELECT id, rol FROM usuarios WHERE usuario = 'user'")
+    uid, rol = cur.fetchone()
+
+    try:
+        fid = _id_fragmento(at, "fila_usuario", uid)
+        at.selectbox(key=f"rol_{uid}").set_value("gestor" if rol != "gestor" else "usuario")
+        resultado["cambiar rol"] = _consultas(at, "Usuarios · Fila", fid)
+    finally:
+        cur.execute("UPDATE usuarios SET rol = %s WHERE id = %s", (rol, uid))
+        conn.commit()
+        cur.close()
+        conn.close()
+
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Consultas por interacción en las páginas")
+    parser.add_argument("--sin-escrituras", action="store_true")
+    args = parser.parse_args(argv)
+
+    # pandas avisa en cada read_sql sobre conexiones DBAPI crudas
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    for pagina, resultado in (("asignaciones", asignaciones()),
+                              ("usuarios", usuarios(not args.sin_escrituras))):
+        for caso, n in resultado.items():
+            print(f"{pagina + ': ' + caso:40s} {n:>5}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Calendario laboral: fines de semana, feriados de empresa y ausencias.
+
+Los feriados se leen una vez y se guardan como arreglo datetime64[D]
+ordenado (cacheado por proceso), que es lo que esperan np.busday_count,
+np.is_busday y np.busday_offset. Las ausencias por persona se convierten
+en una matriz personas × días con la misma acumulación por intervalos que
+la carga, de modo que todo el cálculo sigue vectorizado sobre la plantilla.
+
+Tablas: ver migraciones/0003_calendario_laboral.sql.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import metricas
+from carga import acumular, fechas
+from database import get_connection
+
+# Lunes..domingo; "1111100" = lunes a viernes
+SEMANA_LABORAL = os.environ.get("SEMANA_LABORAL", "1111100")
+
+# Segundos que se reutiliza la lista de feriados antes de releerla
+TTL_FERIADOS = 600
+
+_feriados = {"valor": None, "leido": 0.0}
+_lock = threading.Lock()
+
+
+# =====================================================
+# FERIADOS
+# =====================================================
+def feriados():
+    """
+    Feriados como arreglo datetime64[D] ordenado (cacheado TTL_FERIADOS s).
+    """
+    with _lock:
+        vigente = (
+            _feriados["valor"] is not None
+            and time.monotonic() - _feriados["leido"] < TTL_FERIADOS
+        )
+        metricas.registrar_cache("feriados", vigente)
+        if vigente:
+            return _feriados["valor"]
+
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("SELECT fecha FROM feriados ORDER BY fecha")
+        valor = np.array([f for (f,) in cur.fetchall()], dtype="datetime64[D]")
+        cur.close()
+        conn.close()
+    except Exception:
+        # Sin tabla o sin conexión: solo fines de semana
+        valor = np.array([], dtype="datetime64[D]")
+
+    with _lock:
+        _feriados["valor"] = valor
+        _feriados["leido"] = time.monotonic()
+    return valor
+
+
+def invalidar_feriados():
+    with _lock:
+        _feriados["valor"] = None
+
+
+def obtener_feriados():
+    conn = get_connection()
+    df = pd.read_sql("SELECT id, fecha, nombre FROM feriados ORDER BY fecha", conn)
+    conn.close()
+    return df
+
+
+def agregar_feriado(fecha, nombre):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO feriados (fecha, nombre)
+        VALUES (%s, %s)
+        ON CONFLICT (fecha) DO UPDATE SET nombre = EXCLUDED.nombre
+    """, (fecha, nombre))
+    conn.commit()
+    cur.close()
+    conn.close()
+    invalidar_feriados()
+
+
+def eliminar_feriado(fid):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM feriados WHERE id = %s", (fid,))
+    conn.commit()
+    cur.close()
+    conn.close()
+    invalidar_feriados()
+
+
+# =====================================================
+# DÍAS LABORABLES (VECTORIZADO)
+# =====================================================
+def dias_laborables(inicio, fin, festivos=None):
+    """
+    Días laborables en [inicio, fin] (inclusive); admite arrays.
+    """
+    festivos = feriados() if festivos is None else festivos
+    inicio = np.asarray(inicio, dtype="datetime64[D]")
+    fin = np.asarray(fin, dtype="datetime64[D]") + np.timedelta64(1, "D")
+    return np.busday_count(inicio, np.maximum(fin, inicio), weekmask=SEMANA_LABORAL, holidays=festivos)
+
+
+def mascara_laboral(desde, dias, festivos=None):
+    """
+    Bool por día de [desde, desde + dias): True si es laborable.
+    """
+    festivos = feriados() if festivos is None else festivos
+    rango = np.datetime64(desde, "D") + np.arange(dias)
+    return np.is_busday(rango, weekmask=SEMANA_LABORAL, holidays=festivos)
+
+
+def sumar_laborables(fecha, n, festivos=None):
+    """
+    Fecha tras avanzar `n` días laborables (n = 0 → primer laborable ≥ fecha).
+    """
+    festivos = feriados() if festivos is None else festivos
+    return np.busday_offset(
+        np.asarray(fecha, dtype="datetime64[D]"), n,
+        roll="forward", weekmask=SEMANA_LABORAL, holidays=festivos
+    )
+
+
+# =====================================================
+# AUSENCIAS
+# =====================================================
+def obtener_ausencias(desde=None, hasta=None, ids=None):
+    filtros, params = [], []
+    if desde is not None:
+        filtros.append("AND a.fin >= %s")
+        params.append(desde)
+    if hasta is not None:
+        filtros.append("AND a.inicio <= %s")
+        params.append(hasta)
+    if ids is not None:
+        filtros.append("AND a.personal_id = ANY(%s)")
+        params.append([int(i) for i in ids])
+
+    try:
+        conn = get_connection()
+        df = pd.read_sql(f"""
+            SELECT a.id, a.personal_id, p.nombre, a.inicio, a.fin, a.tipo
+            FROM ausencias a
+            JOIN personal p ON p.id = a.personal_id
+            WHERE TRUE
+            {" ".join(filtros)}
+            ORDER BY a.inicio
+        """, conn, params=params or None)
+        conn.close()
+        return df
+
+    except Exception:
+        return pd.DataFrame(columns=["id", "personal_id", "nombre", "inicio", "fin", "tipo"])
+
+
+def registrar_ausencia(personal_id, inicio, fin, tipo):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        INSERT INTO ausencias (personal_id, inicio, fin, tipo)
+        VALUES (%s, %s, %s, %s)
+    """, (personal_id, inicio, fin, tipo))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def eliminar_ausencia(aid):
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("DELETE FROM ausencias WHERE id = %s", (aid,))
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def matriz_ausencias(ids, ausencias, desde, dias):
+    """
+    Bool (len(ids) × dias): True si la persona está ausente ese día.
+    """
+    idx = pd.Index(ids).get_indexer(ausencias["personal_id"])
+    ok = idx >= 0
+    return acumular(
+        len(ids),
+        idx[ok],
+        fechas(ausencias["inicio"])[ok],
+        fechas(ausencias["fin"])[ok],
+        1,
+        np.datetime64(desde, "D"),
+        dias
+    ) > 0
+
+
+def disponibilidad(ids, desde, dias, festivos=None, ausencias=None):
+    """
+    Bool (len(ids) × dias): día laborable y sin ausencia para cada persona.
+    Si no se pasan ausencias se leen de la base para ese rango.
+    """
+    laborable = mascara_laboral(desde, dias, festivos)
+    if ausencias is None:
+        hasta = np.datetime64(desde, "D") + np.timedelta64(dias - 1, "D")
+        ausencias = obtener_ausencias(desde, hasta.astype(object), ids)
+    return laborable[None, :] & ~matriz_ausencias(ids, ausencias, desde, dias)
@@ -0,0 +1,139 @@
+"""
+Pronóstico de capacidad por área y semana.
+
+Disponible y comprometido se expresan en personas-día laborables. Lo
+disponible descuenta fines de semana, feriados y ausencias; lo comprometido
+(dedicación de cada asignación en días laborables) se acumula por intervalos
+sobre una matriz área × día y luego se agrega por semanas, en capas
+separadas para proyectos confirmados y no confirmados.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from calendario_laboral import mascara_laboral, matriz_ausencias, obtener_ausencias
+from carga import acumular, dedicaciones, fechas, por_semana
+from database import get_connection
+from logic import cerrar
+from trazas import trazado
+
+SEMANAS = 52
+SIN_AREA = "Sin área"
+
+
+def _lunes(fecha):
+    return fecha - timedelta(days=fecha.weekday())
+
+
+def pronostico(personal, asignaciones, desde, semanas=SEMANAS, laborable=None, ausencias=None):
+    """
+    personal: DataFrame id, area
+    asignaciones: DataFrame personal_id, inicio, fin, dedicacion, confirmado
+    laborable: bool por día del horizonte (None = todos los días)
+    ausencias: DataFrame personal_id, inicio, fin (opcional)
+
+    Devuelve dict con areas, semanas (lunes), disponible, confirmado y
+    no_confirmado; las tres matrices son área × semana.
+    """
+    desde = np.datetime64(_lunes(desde), "D")
+    dias = semanas * 7
+
+    area_persona = personal["area"].fillna(SIN_AREA).astype("category")
+    areas = list(area_persona.cat.categories)
+    n_areas = len(areas)
+
+    codigos = area_persona.cat.codes.to_numpy()
+    codigo = pd.Series(codigos, index=personal["id"].to_numpy())
+    plantilla = np.bincount(codigos, minlength=n_areas)
+
+    if laborable is None:
+        laborable = np.ones(dias, dtype=bool)
+
+    # Personas-día disponibles: plantilla en días laborables menos ausencias
+    disponible = plantilla[:, None] * laborable[None, :]
+    if ausencias is not None and not ausencias.empty:
+        ausente = matriz_ausencias(personal["id"], ausencias, desde, dias) & laborable[None, :]
+        con_ausencia = np.nonzero(ausente.any(axis=1))[0]
+        por_area = np.zeros((n_areas, len(con_ausencia)))
+        por_area[codigos[con_ausencia], np.arange(len(con_ausencia))] = 1
+        disponible = disponible - por_area @ ausente[con_ausencia]
+
+    area = asignaciones["personal_id"].map(codigo)
+    ok = area.notna().to_numpy()
+
+    area = area.to_numpy()[ok].astype(np.int64)
+    ini = fechas(asignaciones["inicio"])[ok]
+    fin = fechas(asignaciones["fin"])[ok]
+    ded = dedicaciones(asignaciones)[ok]
+    conf = asignaciones["confirmado"].fillna(False).to_numpy(dtype=bool)[ok]
+
+    def capa(m):
+        # % de dedicación por área y día → personas-día por semana
+        diaria = acumular(n_areas, area[m], ini[m], fin[m], ded[m], desde, dias) * laborable[None, :]
+        return por_semana(diaria) / 100
+
+    return {
+        "areas": areas,
+        "semanas": desde + np.arange(semanas) * np.timedelta64(7, "D"),
+        "disponible": por_semana(disponible),
+        "confirmado": capa(conf),
+        "no_confirmado": capa(~conf),
+    }
+
+
+@trazado()
+def pronostico_capacidad(semanas=SEMANAS, desde=None):
+    """
+    Carga personal y asignaciones activas del horizonte y calcula el pronóstico.
+    """
+    desde = _lunes(desde or date.today())
+    hasta = desde + timedelta(weeks=semanas) - timedelta(days=1)
+
+    conn = get_connection()
+
+    personal = pd.read_sql("""
+        SELECT id, area
+        FROM personal
+        WHERE activo = TRUE
+    """, conn)
+
+    asignaciones = pd.read_sql("""
+        SELECT a.personal_id, a.inicio, a.fin, a.dedicacion, pr.confirmado
+        FROM asignaciones a
+        JOIN proyectos pr ON pr.id = a.proyecto_id
+        WHERE a.activa = TRUE
+        AND pr.eliminado = FALSE
+        AND a.inicio <= %s AND a.fin >= %s
+    """, conn, params=(hasta, desde))
+
+    cerrar(conn)
+
+    return pronostico(
+        personal,
+        asignaciones,
+        desde,
+        semanas,
+        laborable=mascara_laboral(desde, semanas * 7),
+        ausencias=obtener_ausencias(desde, hasta)
+    )
+
+
+def a_tabla(res):
+    """
+    Formato largo (Area, Semana, Disponible, Confirmado, No confirmado, % uso).
+    """
+    n_areas, n_semanas = res["disponible"].shape
+
+    df = pd.DataFrame({
+        "Area": np.repeat(res["areas"], n_semanas),
+        "Semana": np.tile(res["semanas"], n_areas),
+        "Disponible": res["disponible"].ravel(),
+        "Confirmado": res["confirmado"].ravel(),
+        "No confirmado": res["no_confirmado"].ravel(),
+    })
+
+    comprometido = df["Confirmado"] + df["No confirmado"]
+    df["% uso"] = (comprometido / df["Disponible"].where(df["Disponible"] > 0) * 100).round(1)
+    df["% uso confirmado"] = (df["Confirmado"] / df["Disponible"].where(df["Disponible"] > 0) * 100).round(1)
+    return df
@@ -0,0 +1,134 @@
+"""
+Acumulación vectorizada de dedicación (%) por intervalos de fechas.
+
+Cada asignación aporta su `dedicacion` (1..100, % de jornada) a todos los
+días de [inicio, fin]. La suma por fila (persona, área…) y día se obtiene
+con diferencias (+d al inicio, −d tras el fin) y una cumsum, sin iterar
+por asignación. Sin acceso a BD.
+"""
+import numpy as np
+import pandas as pd
+
+DEDICACION_COMPLETA = 100
+
+
+def fechas(valores):
+    """
+    Columna de fechas (date, Timestamp o str) → numpy datetime64[D].
+    """
+    return pd.to_datetime(pd.Series(valores)).to_numpy().astype("datetime64[D]")
+
+
+def dedicaciones(df, columna="dedicacion"):
+    """
+    Dedicación de cada fila; filas sin columna o con nulo cuentan como completas.
+    """
+    if columna not in df:
+        return np.full(len(df), DEDICACION_COMPLETA, dtype=np.int32)
+    return df[columna].fillna(DEDICACION_COMPLETA).to_numpy(dtype=np.int32)
+
+
+def acumular(n_filas, fila, inicio, fin, peso, desde, dias, dtype=np.int32):
+    """
+    Matriz n_filas × dias con la suma de `peso` de los intervalos
+    [inicio, fin] (datetime64[D]) recortados a [desde, desde + dias).
+    """
+    dif = np.zeros((n_filas, dias + 1), dtype=dtype)
+
+    if len(fila):
+        d0 = np.clip((inicio - desde).astype(np.int64), 0, dias)
+        d1 = np.clip((fin - desde).astype(np.int64) + 1, 0, dias)
+        np.add.at(dif, (fila, d0), peso)
+        np.add.at(dif, (fila, d1), -np.asarray(peso, dtype=dtype))
+
+    return np.cumsum(dif, axis=1, dtype=dtype)[:, :dias]
+
+
+def por_semana(diaria):
+    """
+    Suma por bloques de 7 días (las columnas deben ser múltiplo de 7).
+    """
+    n, dias = diaria.shape
+    return diaria.reshape(n, dias // 7, 7).sum(axis=2)
+
+
+def pico_por_persona(n_personas, persona, inicio, fin, dedicacion, desde, hasta, mascara=None):
+    """
+    Dedicación máxima comprometida por persona en algún día de [desde, hasta].
+    `mascara` (bool por día) limita el cálculo a esos días, p. ej. laborables.
+    """
+    desde = np.datetime64(desde, "D")
+    dias = int((np.datetime64(hasta, "D") - desde).astype(np.int64)) + 1
+    if dias <= 0:
+        return np.zeros(n_personas, dtype=np.int32)
+
+    diaria = acumular(n_personas, persona, inicio, fin, dedicacion, desde, dias)
+    if mascara is not None:
+        diaria = diaria * mascara[None, :]
+    return diaria.max(axis=1)
+
+
+# =====================================================
+# SOBRECARGAS (SORT-AND-SWEEP)
+# =====================================================
+def _clave(fila, dia):
+    # (fila, día) → entero ordenable
+    return (np.asarray(fila, dtype=np.int64) << 32) + (np.asarray(dia, dtype=np.int64) + (1 << 31))
+
+
+def sobrecargas(fila, inicio, fin, peso, limite=DEDICACION_COMPLETA):
+    """
+    Tramos en los que la suma de `peso` de los intervalos [inicio, fin]
+    (datetime64[D]) de una misma fila supera `limite`. Un único barrido
+    ordenado de eventos (+peso al inicio, −peso tras el fin), sin matriz
+    de días. Devuelve (fila, desde, hasta, carga) con tramos disjuntos y
+    ordenados por fila y fecha; `hasta` es inclusive.
+    """
+    fila = np.asarray(fila, dtype=np.int64)
+    peso = np.asarray(peso, dtype=np.int64)
+    dia0 = np.asarray(inicio, dtype="datetime64[D]").astype(np.int64)
+    dia1 = np.asarray(fin, dtype="datetime64[D]").astype(np.int64) + 1
+
+    clave = np.concatenate([_clave(fila, dia0), _clave(fila, dia1)])
+    delta = np.concatenate([peso, -peso])
+
+    # Eventos de la misma (fila, día) se suman antes de barrer
+    claves, grupo = np.unique(clave, return_inverse=True)
+    delta = np.bincount(grupo, weights=delta, minlength=len(claves)).astype(np.int64)
+
+    # Cada fila suma 0 en total: la cumsum global vuelve a 0 entre filas
+    nivel = np.cumsum(delta)
+    exceso = np.nonzero(nivel[:-1] > limite)[0] if len(nivel) else np.zeros(0, dtype=np.int64)
+
+    f = claves >> 32
+    dia = (claves & ((1 << 32) - 1)) - (1 << 31)
+    return (
+        f[exceso],
+        dia[exceso].astype("datetime64[D]"),
+        (dia[exceso + 1] - 1).astype("datetime64[D]"),
+        nivel[exceso],
+    )
+
+
+def carga_en_tramos(tramos, fila, inicio, fin):
+    """
+    Para cada intervalo [inicio, fin] de `fila`, la carga del último tramo
+    de `sobrecargas` que lo corta (0 si ninguno).
+    """
+    t_fila, t_desde, t_hasta, t_carga = tramos
+    resultado = np.zeros(len(fila), dtype=np.int64)
+    if not len(t_fila) or not len(fila):
+        return resultado
+
+    claves = _clave(t_fila, t_desde.astype(np.int64))
+    fin_dia = np.asarray(fin, dtype="datetime64[D]").astype(np.int64)
+    ini_dia = np.asarray(inicio, dtype="datetime64[D]").astype(np.int64)
+
+    # Último tramo que empieza no después del fin del intervalo
+    k = np.searchsorted(claves, _clave(fila, fin_dia), side="right") - 1
+    ok = k >= 0
+    kk = np.where(ok, k, 0)
+    ok &= (t_fila[kk] == fila) & (t_hasta[kk].astype(np.int64) >= ini_dia)
+
+    resultado[ok] = t_carga[kk[ok]]
+    return resultado
@@ -0,0 +1,109 @@
+"""
+Carga concurrente de datos de página.
+
+Las lecturas independientes se envían a un pool de hilos acotado (una
+conexión del pool de database.py por hilo) y la página recoge cada
+resultado cuando lo necesita: la latencia total queda cerca de la consulta
+más lenta en lugar de la suma. Cada llamada tiene su propio timeout,
+contado desde que empieza a ejecutarse (no desde que entra en la cola);
+si vence o falla, la sección recibe un valor por defecto y el error queda
+anotado sin bloquear el resto. Una tarea que sigue en cola pasados
+ESPERA_COLA segundos se cancela: no llega a ocupar un hilo para una página
+que ya se dibujó sin ella.
+
+Cada tarea corre en una copia del contexto (contextvars), de modo que las
+trazas de trazas.py siguen colgando de la página que la lanzó.
+"""
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from capacidad import pronostico_capacidad
+from logic import (
+    calendario_recursos,
+    kpi_asignaciones,
+    kpi_personal,
+    kpi_proyectos,
+    kpi_proyectos_confirmados,
+    kpi_solapamientos,
+    obtener_alertas_por_persona,
+    proyectos_gantt_por_persona
+)
+
+HILOS = int(os.environ.get("CARGA_HILOS", "6"))
+TIMEOUT_SEGUNDOS = float(os.environ.get("CARGA_TIMEOUT", "15"))
+ESPERA_COLA = float(os.environ.get("CARGA_ESPERA_COLA", "10"))
+
+_executor = ThreadPoolExecutor(max_workers=HILOS, thread_name_prefix="carga")
+
+
+class _Tarea:
+    __slots__ = ("futuro", "timeout", "enviada", "inicio", "empezo")
+
+    def __init__(self, timeout):
+        self.timeout = timeout
+        self.enviada = time.monotonic()
+        self.inicio = None
+        self.empezo = threading.Event()
+        self.futuro = None
+
+    def correr(self, ctx, fn, args, kwargs):
+        self.inicio = time.monotonic()
+        self.empezo.set()
+        return ctx.run(fn, *args, **kwargs)
+
+
+class CargaParalela:
+
+    def __init__(self, timeout=TIMEOUT_SEGUNDOS, espera_cola=ESPERA_COLA):
+        self.timeout = timeout
+        self.espera_cola = espera_cola
+        self._tareas = {}
+        self.errores = {}
+
+    def enviar(self, nombre, fn, *args, timeout=None, **kwargs):
+        tarea = _Tarea(self.timeout if timeout is None else timeout)
+        tarea.futuro = _executor.submit(tarea.correr, contextvars.copy_context(), fn, args, kwargs)
+        self._tareas[nombre] = tarea
+        return self
+
+    def resultado(self, nombre, defecto=None):
+        """
+        Espera la tarea hasta su límite; ante timeout o error devuelve `defecto`.
+        """
+        tarea = self._tareas[nombre]
+        try:
+            espera = tarea.enviada + self.espera_cola - time.monotonic()
+            if not tarea.empezo.wait(max(0.0, espera)) and tarea.futuro.cancel():
+                self.errores[nombre] = "timeout (en cola)"
+                return defecto
+
+            # Empezó (quizá justo ahora): el límite cuenta desde su inicio
+            tarea.empezo.wait()
+            restante = tarea.inicio + tarea.timeout - time.monotonic()
+            return tarea.futuro.result(timeout=max(0.0, restante))
+        except TimeoutError:
+            self.errores[nombre] = "timeout"
+        except Exception as e:
+            self.errores[nombre] = e
+        return defecto
+
+
+def cargar_dashboard(personal_id, inicio, fin, semanas_capacidad):
+    """
+    Lanza todas las lecturas del Dashboard que no dependen de otras.
+    """
+    return (
+        CargaParalela()
+        .enviar("kpi_proyectos", kpi_proyectos)
+        .enviar("kpi_personal", kpi_personal)
+        .enviar("kpi_asignaciones", kpi_asignaciones)
+        .enviar("kpi_solapamientos", kpi_solapamientos)
+        .enviar("kpi_confirmados", kpi_proyectos_confirmados)
+        .enviar("alertas", obtener_alertas_por_persona, personal_id)
+        .enviar("calendario", calendario_recursos, inicio, fin)
+        .enviar("capacidad", pronostico_capacidad, semanas_capacidad)
+        .enviar("gantt", proyectos_gantt_por_persona, personal_id)
+    )
@@ -1,13 +1,123 @@
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
 import os
+import threading
+import time
+import metricas
+from instrumentacion import CursorInstrumentado
 
-def get_connection():
-    return psycopg2.connect(
+# Conexiones reutilizables por proceso; conn.close() las devuelve al pool
+POOL_MIN = int(os.environ.get("DB_POOL_MIN", "1"))
+POOL_MAX = int(os.environ.get("DB_POOL_MAX", "10"))
+
+_pool = None
+_lock = threading.Lock()
+
+
+class ConexionPool(psycopg2.extensions.connection):
+    """
+    Conexión que al cerrarse vuelve al pool en lugar de cerrarse.
+    Fuera de un pool (o con el pool cerrado) se cierra de verdad.
+    """
+    pool = None
+    prestada = False    # en uso por quien la pidió
+    en_pool = False     # ociosa dentro del pool: close() no hace nada
+
+    def close(self):
+        pool = self.pool
+        if self.en_pool and pool is not None and not pool.closed:
+            return
+        if not self.prestada or pool is None or pool.closed:
+            return super().close()
+
+        self.prestada = False
+        try:
+            if not self.closed and self.autocommit:
+                self.autocommit = False
+        except psycopg2.Error:
+            pass
+
+        if self.closed:
+            pool.putconn(self, close=True)
+        else:
+            pool.putconn(self)
+            self.en_pool = True
+
+
+class PoolConexiones(psycopg2.pool.ThreadedConnectionPool):
+
+    def __init__(self, minconn, maxconn):
+        super().__init__(minconn, maxconn)
+        # psycopg2 solo conserva `minconn` ociosas; se guardan hasta maxconn
+        self.minconn = maxconn
+
+    def _connect(self, key=None):
+        conn = _conectar()
+        conn.pool = self
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            conn.en_pool = True
+            self._pool.append(conn)
+        return conn
+
+    def prestar(self):
+        while True:
+            conn = self.getconn()
+            conn.en_pool = False
+            if not conn.closed:
+                conn.prestada = True
+                return conn
+            # Cerrada por el servidor: se descarta y se pide otra
+            self.putconn(conn, close=True)
+
+    def closeall(self):
+        for conn in self._pool + list(self._used.values()):
+            conn.prestada = conn.en_pool = False
+        super().closeall()
+
+
+def _conectar():
+    t0 = time.perf_counter()
+    conn = psycopg2.connect(
         host=os.environ["SUPABASE_DB_HOST"],
         database=os.environ.get("SUPABASE_DB_NAME", "postgres"),
         user=os.environ["SUPABASE_DB_USER"],
         password=os.environ["SUPABASE_DB_PASSWORD"],
         port=os.environ.get("SUPABASE_DB_PORT", "6543"),
-        sslmode="require",
-        connect_timeout=10
+        sslmode=os.environ.get("SUPABASE_DB_SSLMODE", "require"),
+        connect_timeout=10,
+        connection_factory=ConexionPool,
+        cursor_factory=CursorInstrumentado
     )
+    metricas.CONEXIONES_DB.inc()
+    metricas.DURACION_CONEXION.observar(time.perf_counter() - t0)
+    return conn
+
+
+def obtener_pool():
+    global _pool
+    with _lock:
+        if _pool is None or _pool.closed:
+            _pool = PoolConexiones(POOL_MIN, POOL_MAX)
+        return _pool
+
+
+def get_connection():
+    """
+    Conexión del pool; si está agotado se abre una directa (se cierra al usarla).
+    """
+    try:
+        return obtener_pool().prestar()
+    except psycopg2.pool.PoolError:
+        return _conectar()
+
+
+def cerrar_pool():
+    global _pool
+    with _lock:
+        if _pool is not None and not _pool.closed:
+            _pool.closeall()
+        _pool = None
@@ -0,0 +1,70 @@
+"""
+Exportaciones escritas bloque a bloque (ver lectura.leer_por_bloques).
+
+Ninguna función junta el resultado completo en un DataFrame. Cada bloque
+se escribe y se descarta, así que la memoria del proceso no crece con
+el número de filas. Solo crece la salida, y en CSV esa salida puede ser
+un archivo o un gzip.
+"""
+import gzip
+import io
+
+import pandas as pd
+from openpyxl import Workbook
+
+# Excel admite 1 048 576 filas por hoja (una es la cabecera)
+MAX_FILAS_HOJA = 1_048_575
+
+
+def _celda(valor):
+    if valor is None or valor is pd.NaT:
+        return None
+    if isinstance(valor, float) and valor != valor:
+        return None
+    if isinstance(valor, pd.Timestamp):
+        return valor.to_pydatetime()
+    return valor
+
+
+def excel_por_bloques(bloques, hoja="Datos"):
+    """
+    Libro xlsx (bytes) con los bloques uno tras otro. Usa el modo
+    write_only de openpyxl y abre hojas nuevas (hoja_2, …) al llegar al
+    límite de filas de Excel.
+    """
+    libro = Workbook(write_only=True)
+    actual, filas, n = None, 0, 0
+
+    for df in bloques:
+        for registro in df.itertuples(index=False, name=None):
+            if actual is None or filas >= MAX_FILAS_HOJA:
+                n += 1
+                actual = libro.create_sheet(hoja if n == 1 else f"{hoja}_{n}")
+                actual.append(list(df.columns))
+                filas = 0
+            actual.append([_celda(v) for v in registro])
+            filas += 1
+
+    if actual is None:
+        libro.create_sheet(hoja)
+
+    buf = io.BytesIO()
+    libro.save(buf)
+    return buf.getvalue()
+
+
+def csv_por_bloques(bloques, destino):
+    """
+    Escribe los bloques como CSV en `destino`. Si la ruta termina en .gz
+    se comprime. Devuelve el número de filas escritas.
+    """
+    destino = str(destino)
+    abrir = gzip.open if destino.endswith(".gz") else open
+    total = 0
+
+    with abrir(destino, "wt", newline="", encoding="utf-8") as f:
+        for df in bloques:
+            df.to_csv(f, header=total == 0, index=False)
+            total += len(df)
+
+    return total
@@ -0,0 +1,653 @@
+"""
+Generador de datasets sintéticos reproducibles (misma semilla → mismos datos).
+
+    python generar_dataset.py --personal 5000 --proyectos 2000 --asignaciones 100000
+    python generar_dataset.py --destino sqlite --sqlite-path data/bench.db
+    python generar_dataset.py --destino postgres --crear-esquema --limpiar
+
+Con --crear-esquema en Postgres se aplican también las migraciones de
+migraciones/ (índices) después de la carga.
+
+Postgres usa las variables SUPABASE_DB_* de database.py
+(para un servidor local: SUPABASE_DB_PORT=5432 SUPABASE_DB_SSLMODE=disable).
+
+El destino sqlite es solo una copia para inspección offline: logic.py y
+benchmark_logic.py trabajan contra Postgres (psycopg2).
+"""
+import argparse
+import csv
+import hashlib
+import io
+import sqlite3
+import time
+import unicodedata
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+# =====================================================
+# CATÁLOGOS
+# =====================================================
+NOMBRES = [
+    "Juan", "José", "Luis", "Carlos", "Jorge", "Miguel", "Pedro", "Manuel",
+    "Ricardo", "Fernando", "Raúl", "Víctor", "Óscar", "César", "Andrés", "Héctor",
+    "María", "Ana", "Rosa", "Carmen", "Lucía", "Patricia", "Elena", "Sofía",
+    "Diana", "Claudia", "Mónica", "Verónica", "Gabriela", "Pilar", "Julia", "Inés",
+    "Alberto", "Javier", "Sergio", "Diego", "Pablo", "Álvaro", "Iván", "Ramón",
+]
+
+APELLIDOS = [
+    "Pérez", "García", "Rodríguez", "López", "Martínez", "Sánchez", "Gómez", "Díaz",
+    "Torres", "Ramírez", "Flores", "Rojas", "Vargas", "Castillo", "Chávez", "Mendoza",
+    "Quispe", "Huamán", "Valenzuela", "Salazar", "Cárdenas", "Ríos", "Paredes", "Núñez",
+    "Vega", "Ramos", "Herrera", "Medina", "Aguilar", "Castro", "Ortiz", "Silva",
+    "Morales", "Delgado", "Espinoza", "Fernández", "Gutiérrez", "Córdova", "León", "Campos",
+]
+
+# (área, peso relativo)
+AREAS = [
+    ("Operaciones", 0.30), ("Mantenimiento", 0.22), ("Ingeniería", 0.15),
+    ("Proyectos", 0.10), ("Logística", 0.08), ("Calidad", 0.06),
+    ("Seguridad", 0.05), ("Administración", 0.04),
+]
+
+CARGOS = [
+    ("Técnico", 0.30), ("Operario", 0.20), ("Electricista", 0.12), ("Mecánico", 0.12),
+    ("Ingeniero", 0.10), ("Supervisor", 0.08), ("Jefe de Proyecto", 0.04), ("Asistente", 0.04),
+]
+
+TIPOS_PROYECTO = [
+    "Mantenimiento", "Overhaul", "Montaje", "Instalación", "Inspección",
+    "Rebobinado", "Puesta en marcha", "Modernización",
+]
+
+CLIENTES = [
+    "Minera Andina", "Planta Norte", "Hidro Sur", "Cementos Pacífico", "Petro Centro",
+    "Agroindustrial Valle", "Puerto Callao", "Textil Lima", "Siderúrgica Chimbote", "Energía Sierra",
+]
+
+ACCIONES_HISTORIAL = ["INSERT", "UPDATE", "UPDATE", "UPDATE", "DELETE"]
+CAMPOS_HISTORIAL = ["nombre", "inicio", "fin", "confirmado", "estado"]
+
+USUARIOS = [
+    ("admin", "admin123", "admin"),
+    ("gestor", "gestor123", "gestor"),
+    ("user", "user123", "usuario"),
+]
+
+
+# =====================================================
+# ESQUEMA
+# =====================================================
+ESQUEMA_POSTGRES = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id SERIAL PRIMARY KEY,
+    usuario TEXT UNIQUE NOT NULL,
+    password_hash TEXT,
+    rol TEXT,
+    activo BOOLEAN DEFAULT TRUE,
+    email TEXT,
+    reset_token TEXT,
+    reset_expira TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS personal (
+    id SERIAL PRIMARY KEY,
+    nombre TEXT,
+    cargo TEXT,
+    area TEXT,
+    activo BOOLEAN DEFAULT TRUE,
+    nombre_normalizado TEXT
+);
+
+CREATE TABLE IF NOT EXISTS proyectos (
+    id SERIAL PRIMARY KEY,
+    nombre TEXT,
+    codigo TEXT,
+    estado TEXT,
+    inicio DATE,
+    fin DATE,
+    confirmado BOOLEAN DEFAULT FALSE,
+    eliminado BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS asignaciones (
+    id SERIAL PRIMARY KEY,
+    personal_id INTEGER REFERENCES personal(id),
+    proyecto_id INTEGER REFERENCES proyectos(id),
+    inicio DATE,
+    fin DATE,
+    dedicacion SMALLINT NOT NULL DEFAULT 100 CHECK (dedicacion BETWEEN 1 AND 100),
+    activa BOOLEAN DEFAULT TRUE
+);
+
+CREATE TABLE IF NOT EXISTS asignaciones_archivo (
+    LIKE asignaciones,
+    archivada_en TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id)
+);
+
+CREATE OR REPLACE VIEW asignaciones_todas AS
+SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion, activa, FALSE AS archivada
+FROM asignaciones
+UNION ALL
+SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion, activa, TRUE AS archivada
+FROM asignaciones_archivo;
+
+CREATE TABLE IF NOT EXISTS feriados (
+    id SERIAL PRIMARY KEY,
+    fecha DATE NOT NULL UNIQUE,
+    nombre TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ausencias (
+    id SERIAL PRIMARY KEY,
+    personal_id INTEGER REFERENCES personal(id),
+    inicio DATE NOT NULL,
+    fin DATE NOT NULL,
+    tipo TEXT
+);
+
+CREATE TABLE IF NOT EXISTS auditoria (
+    id SERIAL PRIMARY KEY,
+    usuario_id INTEGER,
+    accion TEXT,
+    modulo TEXT,
+    referencia INTEGER,
+    detalle TEXT,
+    fecha TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS proyectos_historial (
+    id SERIAL PRIMARY KEY,
+    proyecto_id INTEGER,
+    accion TEXT,
+    campo TEXT,
+    valor_anterior TEXT,
+    valor_nuevo TEXT,
+    usuario TEXT,
+    fecha TIMESTAMP DEFAULT NOW()
+);
+"""
+
+ESQUEMA_SQLITE = """
+CREATE TABLE IF NOT EXISTS usuarios (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario TEXT UNIQUE,
+    password_hash TEXT,
+    rol TEXT,
+    activo INTEGER DEFAULT 1,
+    email TEXT,
+    reset_token TEXT,
+    reset_expira TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS personal (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT,
+    cargo TEXT,
+    area TEXT,
+    activo INTEGER DEFAULT 1,
+    nombre_normalizado TEXT
+);
+
+CREATE TABLE IF NOT EXISTS proyectos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT,
+    codigo TEXT,
+    estado TEXT,
+    inicio DATE,
+    fin DATE,
+    confirmado INTEGER DEFAULT 0,
+    eliminado INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS asignaciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    personal_id INTEGER,
+    proyecto_id INTEGER,
+    inicio DATE,
+    fin DATE,
+    dedicacion INTEGER NOT NULL DEFAULT 100,
+    activa INTEGER DEFAULT 1
+);
+
+CREATE TABLE IF NOT EXISTS asignaciones_archivo (
+    id INTEGER PRIMARY KEY,
+    personal_id INTEGER,
+    proyecto_id INTEGER,
+    inicio DATE,
+    fin DATE,
+    dedicacion INTEGER NOT NULL DEFAULT 100,
+    activa INTEGER DEFAULT 1,
+    archivada_en TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE VIEW IF NOT EXISTS asignaciones_todas AS
+SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion, activa, 0 AS archivada
+FROM asignaciones
+UNION ALL
+SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion, activa, 1 AS archivada
+FROM asignaciones_archivo;
+
+CREATE TABLE IF NOT EXISTS feriados (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    fecha DATE NOT NULL UNIQUE,
+    nombre TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ausencias (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    personal_id INTEGER,
+    inicio DATE NOT NULL,
+    fin DATE NOT NULL,
+    tipo TEXT
+);
+
+CREATE TABLE IF NOT EXISTS auditoria (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    usuario_id INTEGER,
+    accion TEXT,
+    modulo TEXT,
+    referencia INTEGER,
+    detalle TEXT,
+    fecha TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS proyectos_historial (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    proyecto_id INTEGER,
+    accion TEXT,
+    campo TEXT,
+    valor_anterior TEXT,
+    valor_nuevo TEXT,
+    usuario TEXT,
+    fecha TIMESTAMP
+);
+"""
+
+# Orden de carga (respeta claves foráneas) y columnas de cada tabla
+TABLAS = {
+    "usuarios": ["id", "usuario", "password_hash", "rol", "activo", "email"],
+    "personal": ["id", "nombre", "cargo", "area", "activo", "nombre_normalizado"],
+    "proyectos": ["id", "nombre", "codigo", "estado", "inicio", "fin", "confirmado", "eliminado"],
+    "asignaciones": ["id", "personal_id", "proyecto_id", "inicio", "fin", "dedicacion", "activa"],
+    "feriados": ["id", "fecha", "nombre"],
+    "ausencias": ["id", "personal_id", "inicio", "fin", "tipo"],
+    "auditoria": ["id", "usuario_id", "accion", "modulo", "referencia", "detalle", "fecha"],
+    "proyectos_historial": ["id", "proyecto_id", "accion", "campo", "valor_anterior", "valor_nuevo", "usuario", "fecha"],
+}
+
+
+# =====================================================
+# GENERACIÓN
+# =====================================================
+def _elegir(rng, catalogo, n):
+    valores = [v for v, _ in catalogo]
+    pesos = np.array([p for _, p in catalogo])
+    return np.array(valores, dtype=object)[rng.choice(len(valores), n, p=pesos / pesos.sum())]
+
+
+def _clave_nombre(nombre):
+    # Misma regla que nombres.normalizar_nombres / normalizar_nombre() en SQL
+    sin_acentos = unicodedata.normalize("NFKD", nombre).encode("ascii", "ignore").decode("ascii")
+    return " ".join(sin_acentos.lower().split())
+
+
+def generar_personal(rng, n):
+    combinaciones = len(NOMBRES) * len(APELLIDOS) * len(APELLIDOS)
+    if n > combinaciones:
+        raise ValueError(f"Máximo {combinaciones} personas con nombres únicos")
+
+    codigos = rng.choice(combinaciones, n, replace=False)
+    nombre_i, resto = np.divmod(codigos, len(APELLIDOS) * len(APELLIDOS))
+    ap1_i, ap2_i = np.divmod(resto, len(APELLIDOS))
+
+    nombres = [
+        f"{NOMBRES[a]} {APELLIDOS[b]} {APELLIDOS[c]}"
+        for a, b, c in zip(nombre_i, ap1_i, ap2_i)
+    ]
+
+    return {
+        "id": np.arange(1, n + 1),
+        "nombre": nombres,
+        "cargo": _elegir(rng, CARGOS, n),
+        "area": _elegir(rng, AREAS, n),
+        "activo": rng.random(n) > 0.03,
+        "nombre_normalizado": [_clave_nombre(x) for x in nombres],
+    }
+
+
+def generar_proyectos(rng, n, hoy, dias_pasado, dias_futuro):
+    inicio = hoy + rng.integers(-dias_pasado, dias_futuro, n).astype("timedelta64[D]")
+    # Duraciones log-normales: mayoría 2–6 semanas, cola larga hasta 6 meses
+    duracion = np.clip(rng.lognormal(3.3, 0.6, n), 3, 180).astype(int)
+    fin = inicio + duracion.astype("timedelta64[D]")
+
+    futuro = inicio > hoy
+    confirmado = np.where(futuro, rng.random(n) < 0.6, rng.random(n) < 0.95)
+
+    tipos = rng.integers(0, len(TIPOS_PROYECTO), n)
+    clientes = rng.integers(0, len(CLIENTES), n)
+
+    return {
+        "id": np.arange(1, n + 1),
+        "nombre": [f"{TIPOS_PROYECTO[t]} {CLIENTES[c]} {i:05d}" for i, (t, c) in enumerate(zip(tipos, clientes), 1)],
+        "codigo": [f"PRY-{i:05d}" for i in range(1, n + 1)],
+        "estado": np.where(fin < hoy, "Cerrado", "Activo"),
+        "inicio": inicio,
+        "fin": fin,
+        "confirmado": confirmado,
+        "eliminado": rng.random(n) < 0.02,
+    }
+
+
+def generar_asignaciones(rng, personal, proyectos, n, solapamiento, hoy):
+    """
+    Recorre la línea de tiempo de cada persona encadenando proyectos.
+    Con probabilidad `solapamiento` el siguiente proyecto empieza antes
+    de que termine el anterior (sobreasignación deliberada).
+    """
+    n_personal = len(personal["id"])
+    n_proyectos = len(proyectos["id"])
+
+    orden = np.argsort(proyectos["inicio"], kind="stable")
+    ini_ord = proyectos["inicio"][orden]
+    fin_ord = proyectos["fin"][orden]
+
+    por_persona = rng.multinomial(n, np.full(n_personal, 1 / n_personal))
+    primer_inicio = ini_ord[0]
+
+    filas_p, filas_pr, filas_i, filas_f = [], [], [], []
+
+    for pid, k in zip(personal["id"], por_persona):
+        t = primer_inicio + np.timedelta64(int(rng.integers(0, 60)), "D")
+        ini_ult = fin_ult = None
+
+        for _ in range(k):
+            if fin_ult is not None and rng.random() < solapamiento:
+                lo = np.searchsorted(ini_ord, ini_ult, "left")
+                hi = np.searchsorted(ini_ord, fin_ult, "right")
+            else:
+                t = t + np.timedelta64(int(rng.integers(0, 14)), "D")
+                lo = np.searchsorted(ini_ord, t, "left")
+                hi = min(lo + 25, n_proyectos)
+
+            if lo >= hi:
+                break
+
+            j = int(rng.integers(lo, hi))
+            filas_p.append(pid)
+            filas_pr.append(orden[j] + 1)
+            filas_i.append(ini_ord[j])
+            filas_f.append(fin_ord[j])
+
+            ini_ult, fin_ult = ini_ord[j], fin_ord[j]
+            t = max(t, fin_ult + np.timedelta64(1, "D"))
+
+    inicio = np.array(filas_i, dtype="datetime64[D]")
+    fin = np.array(filas_f, dtype="datetime64[D]")
+    total = len(filas_p)
+
+    # Las vigentes siguen activas; el histórico queda mayormente inactivo
+    vigente = fin >= hoy - np.timedelta64(30, "D")
+    activa = vigente | (rng.random(total) < 0.3)
+
+    # Mayoría a jornada completa; el resto a tiempo parcial
+    dedicacion = rng.choice([100, 75, 50, 25], total, p=[0.8, 0.05, 0.1, 0.05])
+
+    return {
+        "id": np.arange(1, total + 1),
+        "personal_id": np.array(filas_p),
+        "proyecto_id": np.array(filas_pr),
+        "inicio": inicio,
+        "fin": fin,
+        "dedicacion": dedicacion,
+        "activa": activa,
+    }
+
+
+# Feriados fijos (mes, día, nombre) repetidos cada año del rango
+FERIADOS = [
+    (1, 1, "Año Nuevo"), (5, 1, "Día del Trabajo"), (9, 18, "Fiestas Patrias"),
+    (9, 19, "Glorias del Ejército"), (12, 8, "Inmaculada Concepción"), (12, 25, "Navidad"),
+]
+
+TIPOS_AUSENCIA = ["Vacaciones", "Licencia médica", "Capacitación", "Permiso"]
+
+
+def generar_feriados(hoy, dias_pasado, dias_futuro):
+    anio_hoy = int(str(hoy)[:4])
+    anios = range(anio_hoy - dias_pasado // 365 - 1, anio_hoy + dias_futuro // 365 + 2)
+    filas = [(np.datetime64(f"{a}-{m:02d}-{d:02d}"), n) for a in anios for m, d, n in FERIADOS]
+
+    return {
+        "id": np.arange(1, len(filas) + 1),
+        "fecha": np.array([f for f, _ in filas], dtype="datetime64[D]"),
+        "nombre": [n for _, n in filas],
+    }
+
+
+def generar_ausencias(rng, personal, n, hoy, dias_pasado, dias_futuro):
+    inicio = hoy + rng.integers(-dias_pasado, dias_futuro, n).astype("timedelta64[D]")
+    duracion = rng.choice([1, 2, 5, 10, 15], n, p=[0.3, 0.2, 0.25, 0.15, 0.1])
+
+    return {
+        "id": np.arange(1, n + 1),
+        "personal_id": rng.integers(1, len(personal["id"]) + 1, n),
+        "inicio": inicio,
+        "fin": inicio + (duracion - 1).astype("timedelta64[D]"),
+        "tipo": np.array(TIPOS_AUSENCIA, dtype=object)[rng.integers(0, len(TIPOS_AUSENCIA), n)],
+    }
+
+
+def generar_historial(rng, proyectos, n, hoy, dias_pasado):
+    fecha = (
+        np.datetime64(hoy, "s")
+        - rng.integers(0, dias_pasado * 86400, n).astype("timedelta64[s]")
+    )
+    campos = rng.integers(0, len(CAMPOS_HISTORIAL), n)
+
+    return {
+        "id": np.arange(1, n + 1),
+        "proyecto_id": rng.integers(1, len(proyectos["id"]) + 1, n),
+        "accion": np.array(ACCIONES_HISTORIAL, dtype=object)[rng.integers(0, len(ACCIONES_HISTORIAL), n)],
+        "campo": np.array(CAMPOS_HISTORIAL, dtype=object)[campos],
+        "valor_anterior": [f"v{i}" for i in rng.integers(0, 1000, n)],
+        "valor_nuevo": [f"v{i}" for i in rng.integers(0, 1000, n)],
+        "usuario": np.array([u for u, _, _ in USUARIOS], dtype=object)[rng.integers(0, len(USUARIOS), n)],
+        "fecha": fecha,
+    }
+
+
+def generar_auditoria(rng, n, hoy, dias_pasado):
+    fecha = (
+        np.datetime64(hoy, "s")
+        - rng.integers(0, dias_pasado * 86400, n).astype("timedelta64[s]")
+    )
+    acciones = [
+        ("ASIGNAR_PERSONAL", "ASIGNACIONES"), ("CREAR_PROYECTO", "PROYECTOS"),
+        ("MODIFICAR_PROYECTO", "PROYECTOS"), ("EDITAR", "PERSONAL"), ("EDITAR", "USUARIO"),
+    ]
+    idx = rng.integers(0, len(acciones), n)
+
+    return {
+        "id": np.arange(1, n + 1),
+        "usuario_id": rng.integers(1, len(USUARIOS) + 1, n),
+        "accion": [acciones[i][0] for i in idx],
+        "modulo": [acciones[i][1] for i in idx],
+        "referencia": rng.integers(1, 1000, n),
+        "detalle": ["generado"] * n,
+        "fecha": fecha,
+    }
+
+
+def generar_usuarios():
+    return {
+        "id": np.arange(1, len(USUARIOS) + 1),
+        "usuario": [u for u, _, _ in USUARIOS],
+        "password_hash": [hashlib.sha256(p.encode()).hexdigest() for _, p, _ in USUARIOS],
+        "rol": [r for _, _, r in USUARIOS],
+        "activo": [True] * len(USUARIOS),
+        "email": [f"{u}@example.com" for u, _, _ in USUARIOS],
+    }
+
+
+def generar(semilla=42, personal=5000, proyectos=2000, asignaciones=100000,
+            solapamiento=0.05, historial=20000, auditoria=20000,
+            dias_pasado=730, dias_futuro=365, hoy=None, ausencias=5000):
+    """
+    Devuelve {tabla: {columna: array}} listo para cargar.
+    """
+    rng = np.random.default_rng(semilla)
+    hoy = np.datetime64(hoy or date.today(), "D")
+
+    datos = {"usuarios": generar_usuarios()}
+    datos["personal"] = generar_personal(rng, personal)
+    datos["proyectos"] = generar_proyectos(rng, proyectos, hoy, dias_pasado, dias_futuro)
+    datos["asignaciones"] = generar_asignaciones(
+        rng, datos["personal"], datos["proyectos"], asignaciones, solapamiento, hoy
+    )
+    datos["feriados"] = generar_feriados(hoy, dias_pasado, dias_futuro)
+    datos["ausencias"] = generar_ausencias(rng, datos["personal"], ausencias, hoy, dias_pasado, dias_futuro)
+    datos["proyectos_historial"] = generar_historial(rng, datos["proyectos"], historial, hoy, dias_pasado)
+    datos["auditoria"] = generar_auditoria(rng, auditoria, hoy, dias_pasado)
+    return datos
+
+
+# =====================================================
+# CARGA
+# =====================================================
+def _filas(columnas, datos, booleano=bool):
+    valores = []
+    for c in columnas:
+        v = datos[c]
+        if isinstance(v, np.ndarray) and v.dtype.kind == "M":
+            v = v.astype(str)
+        elif isinstance(v, np.ndarray) and v.dtype.kind == "b":
+            v = [booleano(x) for x in v]
+        elif isinstance(v, np.ndarray) and v.dtype.kind in "iu":
+            v = v.tolist()
+        valores.append(v)
+    return list(zip(*valores))
+
+
+def cargar_sqlite(datos, ruta, limpiar=False):
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(ruta)
+    conn.executescript(ESQUEMA_SQLITE)
+
+    if limpiar:
+        for tabla in reversed(list(TABLAS)):
+            conn.execute(f"DELETE FROM {tabla}")
+        conn.execute("DELETE FROM asignaciones_archivo")
+
+    for tabla, columnas in TABLAS.items():
+        marcadores = ",".join("?" * len(columnas))
+        conn.executemany(
+            f"INSERT INTO {tabla} ({','.join(columnas)}) VALUES ({marcadores})",
+            _filas(columnas, datos[tabla], booleano=int)
+        )
+
+    conn.commit()
+    conn.close()
+
+
+def cargar_postgres(datos, crear_esquema=False, limpiar=False):
+    from database import get_connection
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        if crear_esquema:
+            cur.execute(ESQUEMA_POSTGRES)
+
+        if limpiar:
+            cur.execute(f"TRUNCATE TABLE {', '.join(TABLAS)} RESTART IDENTITY CASCADE")
+            cur.execute("SELECT to_regclass('asignaciones_archivo') IS NOT NULL")
+            if cur.fetchone()[0]:
+                cur.execute("TRUNCATE TABLE asignaciones_archivo")
+
+        # Carga masiva: sin una fila en `cambios` por cada fila copiada
+        cur.execute("SET LOCAL cambios.omitir = 'on'")
+
+        for tabla, columnas in TABLAS.items():
+            buf = io.StringIO()
+            csv.writer(buf).writerows(_filas(columnas, datos[tabla]))
+            buf.seek(0)
+
+            cur.copy_expert(
+                f"COPY {tabla} ({','.join(columnas)}) FROM STDIN WITH (FORMAT csv)",
+                buf
+            )
+            cur.execute(
+                f"SELECT setval(pg_get_serial_sequence('{tabla}', 'id'), (SELECT MAX(id) FROM {tabla}))"
+            )
+
+        cur.execute(f"ANALYZE {', '.join(TABLAS)}")
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+    # Índices después de la carga (más rápido que mantenerlos durante el COPY)
+    if crear_esquema:
+        from migrar_esquema import aplicar_migraciones
+        aplicar_migraciones()
+
+
+# =====================================================
+# CLI
+# =====================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dataset sintético Gestión de Recursos")
+    parser.add_argument("--semilla", type=int, default=42)
+    parser.add_argument("--personal", type=int, default=5000)
+    parser.add_argument("--proyectos", type=int, default=2000)
+    parser.add_argument("--asignaciones", type=int, default=100000)
+    parser.add_argument("--solapamiento", type=float, default=0.05,
+                        help="Probabilidad de que una asignación se solape con la anterior de la misma persona")
+    parser.add_argument("--historial", type=int, default=20000)
+    parser.add_argument("--auditoria", type=int, default=20000)
+    parser.add_argument("--ausencias", type=int, default=5000)
+    parser.add_argument("--dias-pasado", type=int, default=730)
+    parser.add_argument("--dias-futuro", type=int, default=365)
+    parser.add_argument("--hoy", type=date.fromisoformat, default=None,
+                        help="Fecha de referencia (YYYY-MM-DD) para reproducir un dataset exacto")
+    parser.add_argument("--destino", choices=["sqlite", "postgres"], default="sqlite")
+    parser.add_argument("--sqlite-path", default="data/bench.db")
+    parser.add_argument("--crear-esquema", action="store_true")
+    parser.add_argument("--limpiar", action="store_true", help="Vacía las tablas antes de cargar")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    datos = generar(
+        args.semilla, args.personal, args.proyectos, args.asignaciones, args.solapamiento,
+        args.historial, args.auditoria, args.dias_pasado, args.dias_futuro, args.hoy,
+        args.ausencias
+    )
+    t1 = time.perf_counter()
+
+    if args.destino == "sqlite":
+        cargar_sqlite(datos, args.sqlite_path, args.limpiar)
+        print("ℹ️ Copia SQLite: benchmark_logic.py necesita --destino postgres")
+    else:
+        cargar_postgres(datos, args.crear_esquema, args.limpiar)
+    t2 = time.perf_counter()
+
+    for tabla in TABLAS:
+        print(f"📦 {tabla}: {len(datos[tabla]['id'])} filas")
+    print(f"✅ Generado en {t1 - t0:.2f}s, cargado en {t2 - t1:.2f}s ({args.destino})")
+
+
+if __name__ == "__main__":
+    main()
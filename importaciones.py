@@ -0,0 +1,566 @@
+"""
+Importaciones masivas desde Excel (usado por pages/carga_masiva_personal.py).
+
+Cada archivo subido se identifica por el SHA-256 de su contenido. El
+análisis (lectura, normalización y validación) se hace una sola vez por
+huella y queda en una caché en memoria, de modo que los reruns de la
+página no vuelven a leer el libro. La escritura solo ocurre al llamar a
+importar_*; la tabla `importaciones` (ver migraciones/0005_importaciones.sql) guarda
+las huellas ya importadas y un advisory lock por huella evita que dos
+sesiones importen el mismo archivo a la vez.
+"""
+import hashlib
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+import metricas
+from carga import DEDICACION_COMPLETA, carga_en_tramos, fechas, sobrecargas
+from database import get_connection
+from nombres import normalizar_nombres, resolver_personal
+
+# Análisis cacheados (los más recientes)
+MAX_ANALISIS = 16
+
+MAPEO_COLUMNAS = {
+    "nombre": ["nombre", "name", "empleado"],
+    "cargo": ["cargo", "puesto", "rol", "position"],
+    "area": ["area", "área", "department", "dept"]
+}
+
+HOJAS_ERP = ("Personal", "Proyectos", "Asignaciones")
+
+COLUMNAS_CONFLICTO = ["fila", "personal", "proyecto", "inicio", "fin", "dedicacion", "motivo", "carga"]
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+class ImportacionDuplicada(Exception):
+    """
+    El archivo ya se importó (args: dict con fecha, usuario_id y resumen).
+    """
+
+
+# =====================================================
+# HUELLA Y CACHÉ
+# =====================================================
+def huella(contenido):
+    return hashlib.sha256(contenido).hexdigest()
+
+
+def _cacheado(tipo, contenido, analizar):
+    clave = (tipo, huella(contenido))
+
+    with _lock:
+        res = _cache.get(clave)
+        metricas.registrar_cache("importaciones", res is not None)
+        if res is not None:
+            _cache.move_to_end(clave)
+            return res
+
+    res = analizar(contenido)
+    res["huella"] = clave[1]
+    res["tipo"] = tipo
+
+    with _lock:
+        _cache[clave] = res
+        while len(_cache) > MAX_ANALISIS:
+            _cache.popitem(last=False)
+    return res
+
+
+# =====================================================
+# LECTURA / NORMALIZACIÓN
+# =====================================================
+def normalizar_columnas(df):
+    columnas_nuevas = {}
+    for col in df.columns:
+        c = str(col).strip().lower()
+        for destino, aliases in MAPEO_COLUMNAS.items():
+            if c in aliases:
+                columnas_nuevas[col] = destino
+    return df.rename(columns=columnas_nuevas)
+
+
+def _texto(df, columna):
+    """
+    Columna de texto sin espacios sobrantes ("" si falta o es nulo).
+    """
+    if columna not in df:
+        return pd.Series("", index=df.index, dtype=object)
+    return df[columna].fillna("").astype(str).str.strip()
+
+
+def _fecha(df, columna):
+    if columna not in df:
+        return pd.Series(pd.NaT, index=df.index)
+    return pd.to_datetime(df[columna], errors="coerce").dt.normalize()
+
+
+def _analizar_personal(contenido):
+    df = normalizar_columnas(pd.read_excel(io.BytesIO(contenido)))
+
+    if set(df.columns) != {"nombre", "cargo", "area"}:
+        return {"valido": False, "error": "Columnas no válidas", "personal": None}
+
+    df = pd.DataFrame({
+        "nombre": _texto(df, "nombre"),
+        "cargo": _texto(df, "cargo").astype("category"),
+        "area": _texto(df, "area").astype("category"),
+    })
+    df = df[df["nombre"] != ""]
+    df = df[~normalizar_nombres(df["nombre"]).duplicated().to_numpy()].reset_index(drop=True)
+
+    return {"valido": True, "error": None, "personal": df}
+
+
+def _analizar_erp(contenido):
+    xls = pd.ExcelFile(io.BytesIO(contenido))
+    hojas, errores = {}, []
+
+    if "Personal" in xls.sheet_names:
+        df = pd.read_excel(xls, "Personal")
+        p = pd.DataFrame({
+            "fila": df.index,
+            "nombre": _texto(df, "nombre"),
+            "cargo": _texto(df, "cargo").astype("category"),
+            "area": _texto(df, "area").astype("category"),
+        })
+        errores += [("Personal", i, "Nombre vacío") for i in p.loc[p["nombre"] == "", "fila"]]
+        hojas["Personal"] = p[p["nombre"] != ""].reset_index(drop=True)
+
+    if "Proyectos" in xls.sheet_names:
+        df = pd.read_excel(xls, "Proyectos")
+        confirmado = df["confirmado"] if "confirmado" in df else pd.Series(False, index=df.index)
+        p = pd.DataFrame({
+            "fila": df.index,
+            "nombre": _texto(df, "nombre"),
+            "inicio": _fecha(df, "inicio"),
+            "fin": _fecha(df, "fin"),
+            "confirmado": confirmado.fillna(False).astype(bool),
+        })
+        errores += [("Proyectos", i, "Proyecto sin nombre") for i in p.loc[p["nombre"] == "", "fila"]]
+        hojas["Proyectos"] = p[p["nombre"] != ""].reset_index(drop=True)
+
+    if "Asignaciones" in xls.sheet_names:
+        df = pd.read_excel(xls, "Asignaciones")
+        dedicacion = (
+            pd.to_numeric(df["dedicacion"], errors="coerce") if "dedicacion" in df
+            else pd.Series(float("nan"), index=df.index)
+        )
+        a = pd.DataFrame({
+            "fila": df.index,
+            "personal": _texto(df, "personal"),
+            "proyecto": _texto(df, "proyecto"),
+            "inicio": _fecha(df, "inicio"),
+            "fin": _fecha(df, "fin"),
+            "dedicacion": dedicacion.fillna(DEDICACION_COMPLETA),
+        })
+
+        incompleta = (a["personal"] == "") | (a["proyecto"] == "")
+        fuera = ~incompleta & ~a["dedicacion"].between(1, DEDICACION_COMPLETA)
+        errores += [("Asignaciones", i, "Asignación incompleta") for i in a.loc[incompleta, "fila"]]
+        errores += [("Asignaciones", i, "Dedicación fuera de 1..100") for i in a.loc[fuera, "fila"]]
+
+        a = a[~incompleta & ~fuera].reset_index(drop=True)
+        a["dedicacion"] = a["dedicacion"].astype("int16")
+        hojas["Asignaciones"] = a
+
+    return {
+        "valido": bool(hojas),
+        "error": None if hojas else f"El libro no tiene hojas {', '.join(HOJAS_ERP)}",
+        "hojas": hojas,
+        "errores": errores,
+    }
+
+
+def analizar_personal(contenido):
+    """
+    Hoja de personal (nombre, cargo, area) normalizada; cacheada por huella.
+    """
+    return _cacheado("personal", contenido, _analizar_personal)
+
+
+def analizar_erp(contenido):
+    """
+    Libro ERP (Personal / Proyectos / Asignaciones) normalizado y con los
+    errores de fila detectados sin tocar la base; cacheado por huella.
+    """
+    return _cacheado("erp", contenido, _analizar_erp)
+
+
+# =====================================================
+# VALIDACIÓN PREVIA DE ASIGNACIONES
+# =====================================================
+def _marcar(conflictos, a, mascara, motivo, carga=None):
+    if mascara.any():
+        c = a.loc[mascara, COLUMNAS_CONFLICTO[:6]].assign(
+            motivo=motivo,
+            carga=0 if carga is None else carga[mascara.to_numpy()]
+        )
+        conflictos.append(c)
+    return a[~mascara]
+
+
+def validar_asignaciones(hojas, cur=None):
+    """
+    Valida la hoja Asignaciones antes de escribir nada:
+    - nombres de personal (por nombre normalizado) y de proyecto resueltos
+      en bloque, incluidos los que crea el propio libro en sus hojas
+      Personal / Proyectos,
+    - fechas presentes, fin >= inicio y dentro de las fechas del proyecto,
+    - sobrecargas (> 100 %) dentro del archivo y contra las asignaciones
+      activas, con un barrido ordenado sobre el conjunto combinado.
+
+    Devuelve (validas, conflictos); conflictos es un DataFrame con
+    COLUMNAS_CONFLICTO (fila del Excel, motivo y pico de carga en %).
+    """
+    a = hojas.get("Asignaciones")
+    if a is None or a.empty:
+        return a, pd.DataFrame(columns=COLUMNAS_CONFLICTO)
+
+    propia = cur is None
+    if propia:
+        conn = get_connection()
+        cur = conn.cursor()
+
+    try:
+        ids = resolver_personal(a["personal"], cur)
+
+        cur.execute("""
+            SELECT nombre, MIN(inicio), MAX(fin)
+            FROM proyectos
+            WHERE eliminado = FALSE
+            AND nombre = ANY(%s)
+            GROUP BY nombre
+        """, (a["proyecto"].unique().tolist(),))
+        rangos = pd.DataFrame(cur.fetchall(), columns=["proyecto", "p_inicio", "p_fin"])
+
+        hasta = a["fin"].max()
+        desde = a["inicio"].min()
+        cur.execute("""
+            SELECT personal_id, inicio, fin, dedicacion
+            FROM asignaciones
+            WHERE activa = TRUE
+            AND personal_id = ANY(%s)
+            AND inicio <= %s
+            AND fin >= %s
+        """, (list(set(ids.values())), _dia(hasta), _dia(desde)))
+        existentes = pd.DataFrame(cur.fetchall(), columns=["personal", "inicio", "fin", "dedicacion"])
+
+    finally:
+        if propia:
+            cur.close()
+            conn.close()
+
+    # Clave de persona: id si ya existe; si solo la crea el libro, su nombre normalizado
+    clave = a["personal"].map(ids).astype(object)
+    nuevos = clave.isna()
+    clave[nuevos] = normalizar_nombres(a.loc[nuevos, "personal"]).to_numpy()
+    if "Personal" in hojas:
+        en_libro = set(normalizar_nombres(hojas["Personal"]["nombre"]))
+        nuevos &= ~clave.isin(en_libro)
+    a = a.assign(clave=clave, sin_personal=nuevos)
+    if "Proyectos" in hojas:
+        del_libro = hojas["Proyectos"].rename(
+            columns={"nombre": "proyecto", "inicio": "p_inicio", "fin": "p_fin"}
+        )[["proyecto", "p_inicio", "p_fin"]].drop_duplicates("proyecto", keep="last")
+        rangos = pd.concat([rangos[~rangos["proyecto"].isin(del_libro["proyecto"])], del_libro])
+
+    conflictos = []
+
+    # ---------- fechas y nombres ----------
+    a = _marcar(conflictos, a, a["inicio"].isna() | a["fin"].isna(), "Fecha inválida o vacía")
+    a = _marcar(conflictos, a, a["fin"] < a["inicio"], "Fin anterior al inicio")
+    a = _marcar(conflictos, a, a["sin_personal"], "No existe el personal")
+    a = _marcar(conflictos, a, ~a["proyecto"].isin(rangos["proyecto"]), "No existe el proyecto")
+
+    r = a.merge(rangos, on="proyecto", how="left")
+    fuera = (
+        (r["inicio"] < pd.to_datetime(r["p_inicio"])) | (r["fin"] > pd.to_datetime(r["p_fin"]))
+    ).to_numpy()
+    a = _marcar(conflictos, a, pd.Series(fuera, index=a.index), "Fuera de las fechas del proyecto")
+
+    # ---------- sobrecargas ----------
+    if not a.empty:
+        codigos, nombres = pd.factorize(pd.concat([a["clave"], existentes["personal"]]))
+        n = len(a)
+        ini = np.concatenate([fechas(a["inicio"]), fechas(existentes["inicio"])])
+        fin = np.concatenate([fechas(a["fin"]), fechas(existentes["fin"])])
+        ded = np.concatenate([
+            a["dedicacion"].to_numpy(dtype=np.int64),
+            existentes["dedicacion"].fillna(DEDICACION_COMPLETA).to_numpy(dtype=np.int64)
+        ])
+
+        propio = sobrecargas(codigos[:n], ini[:n], fin[:n], ded[:n])
+        carga_archivo = carga_en_tramos(propio, codigos[:n], ini[:n], fin[:n])
+
+        combinado = sobrecargas(codigos, ini, fin, ded)
+        carga_total = carga_en_tramos(combinado, codigos[:n], ini[:n], fin[:n])
+
+        en_archivo = carga_archivo > 0
+        con_existentes = ~en_archivo & (carga_total > 0)
+        idx = a.index
+
+        a = _marcar(conflictos, a, pd.Series(en_archivo, index=idx),
+                    "Sobrecarga entre filas del archivo", carga_archivo)
+        carga_total = carga_total[~en_archivo]
+        a = _marcar(conflictos, a, pd.Series(con_existentes[~en_archivo], index=a.index),
+                    "Sobrecarga con asignaciones existentes", carga_total)
+
+    reporte = (
+        pd.concat(conflictos, ignore_index=True) if conflictos
+        else pd.DataFrame(columns=COLUMNAS_CONFLICTO)
+    )
+    return a.drop(columns=["clave", "sin_personal"]), reporte.sort_values("fila", kind="stable").reset_index(drop=True)
+
+
+def reporte_conflictos(conflictos):
+    """
+    Informe de conflictos en Excel (bytes), listo para st.download_button.
+    """
+    buf = io.BytesIO()
+    conflictos.assign(
+        inicio=lambda d: pd.to_datetime(d["inicio"]).dt.date,
+        fin=lambda d: pd.to_datetime(d["fin"]).dt.date,
+        fila=lambda d: d["fila"] + 2   # fila visible en Excel (cabecera = 1)
+    ).to_excel(buf, index=False, engine="openpyxl")
+    return buf.getvalue()
+
+
+# =====================================================
+# IDEMPOTENCIA
+# =====================================================
+def obtener_importacion(huella_archivo, tipo):
+    """
+    Última importación registrada del archivo, o None.
+    """
+    try:
+        conn = get_connection()
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT fecha, usuario_id, archivo, resumen
+            FROM importaciones
+            WHERE huella = %s AND tipo = %s
+            ORDER BY fecha DESC
+            LIMIT 1
+        """, (huella_archivo, tipo))
+        row = cur.fetchone()
+        cur.close()
+        conn.close()
+    except Exception:
+        return None
+
+    if row is None:
+        return None
+    return dict(zip(("fecha", "usuario_id", "archivo", "resumen"), row))
+
+
+def _reservar(cur, analisis, forzar):
+    """
+    Bloquea la huella hasta el fin de la transacción y comprueba que no
+    se haya importado ya (salvo `forzar`).
+    """
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (analisis["huella"],))
+
+    if forzar:
+        return
+
+    cur.execute("""
+        SELECT fecha, usuario_id, resumen
+        FROM importaciones
+        WHERE huella = %s AND tipo = %s
+        LIMIT 1
+    """, (analisis["huella"], analisis["tipo"]))
+    row = cur.fetchone()
+    if row is not None:
+        raise ImportacionDuplicada(dict(zip(("fecha", "usuario_id", "resumen"), row)))
+
+
+def _registrar(cur, analisis, uid, archivo, resumen):
+    cur.execute("""
+        INSERT INTO importaciones (huella, tipo, archivo, usuario_id, resumen, fecha)
+        VALUES (%s, %s, %s, %s, %s, NOW())
+    """, (analisis["huella"], analisis["tipo"], archivo, uid, resumen))
+
+
+# =====================================================
+# IMPORTACIÓN
+# =====================================================
+def _separar_personal(cur, df):
+    """
+    Resuelve df (nombre, cargo, area) contra `personal` en una consulta.
+    Devuelve (insertar, actualizar): tuplas (nombre, cargo, area) y (id, cargo, area).
+    """
+    ids = df["nombre"].map(resolver_personal(df["nombre"], cur))
+    nuevo = ids.isna()
+
+    insertar = list(df.loc[nuevo, ["nombre", "cargo", "area"]].itertuples(index=False, name=None))
+    actualizar = list(zip(
+        ids[~nuevo].astype(int).tolist(),
+        df.loc[~nuevo, "cargo"].tolist(),
+        df.loc[~nuevo, "area"].tolist()
+    ))
+    return insertar, actualizar
+
+
+def _guardar_personal(cur, insertar, actualizar):
+    # nombre_normalizado lo rellena el trigger de `personal`
+    if insertar:
+        execute_values(
+            cur, "INSERT INTO personal (nombre, cargo, area) VALUES %s",
+            insertar, page_size=1000
+        )
+    if actualizar:
+        execute_values(cur, """
+            UPDATE personal p
+            SET cargo = v.cargo, area = v.area
+            FROM (VALUES %s) AS v(id, cargo, area)
+            WHERE p.id = v.id
+        """, actualizar, page_size=1000)
+
+
+def importar_personal(analisis, uid=None, archivo=None, simulacion=False, forzar=False):
+    """
+    Inserta o actualiza personal por nombre normalizado.
+    Devuelve (insertados, actualizados).
+    Lanza ImportacionDuplicada si el archivo ya se importó.
+    """
+    t0 = time.perf_counter()
+    df = analisis["personal"]
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        if not simulacion:
+            _reservar(cur, analisis, forzar)
+
+        insertar, actualizar = _separar_personal(cur, df)
+
+        if simulacion:
+            conn.rollback()
+        else:
+            _guardar_personal(cur, insertar, actualizar)
+            _registrar(cur, analisis, uid, archivo, f"Insert={len(insertar)} Update={len(actualizar)}")
+            conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+    metricas.registrar_importacion("personal", len(df), time.perf_counter() - t0)
+    return len(insertar), len(actualizar)
+
+
+def importar_erp(analisis, uid=None, archivo=None, simulacion=False, forzar=False):
+    """
+    Importa el libro ERP en una única transacción (rollback si simulación).
+    Devuelve dict insertados, actualizados y errores [(hoja, fila, motivo)].
+    Lanza ImportacionDuplicada si el archivo ya se importó.
+    """
+    t0 = time.perf_counter()
+    hojas = analisis["hojas"]
+    errores = list(analisis["errores"])
+    insertados = actualizados = 0
+
+    conn = get_connection()
+    conn.autocommit = False   # 🔴 TRANSACCIÓN
+    cur = conn.cursor()
+
+    try:
+        if not simulacion:
+            _reservar(cur, analisis, forzar)
+
+        # ================= PERSONAL =================
+        if "Personal" in hojas:
+            # Repetidos en la hoja: gana la última fila
+            p = hojas["Personal"]
+            p = p[~normalizar_nombres(p["nombre"]).duplicated(keep="last").to_numpy()]
+
+            insertar, actualizar = _separar_personal(cur, p)
+            _guardar_personal(cur, insertar, actualizar)
+            insertados += len(insertar)
+            actualizados += len(actualizar)
+
+        # ================= PROYECTOS =================
+        if "Proyectos" in hojas:
+            filas = [
+                (r.nombre, _dia(r.inicio), _dia(r.fin), bool(r.confirmado))
+                for r in hojas["Proyectos"].itertuples()
+            ]
+            if filas:
+                # Solo cuentan las filas que de verdad entraron (no las omitidas por conflicto)
+                creados = execute_values(cur, """
+                    INSERT INTO proyectos (nombre, inicio, fin, confirmado, estado, eliminado)
+                    VALUES %s
+                    ON CONFLICT DO NOTHING
+                    RETURNING id
+                """, filas, template="(%s,%s,%s,%s,'Activo',FALSE)", page_size=1000, fetch=True)
+                insertados += len(creados)
+
+        # ================= ASIGNACIONES =================
+        if "Asignaciones" in hojas:
+            # Se valida dentro de la transacción: ya ve el personal y los
+            # proyectos que acaba de crear este mismo libro
+            validas, conflictos = validar_asignaciones(hojas, cur)
+            errores += [("Asignaciones", r.fila, r.motivo) for r in conflictos.itertuples()]
+
+            ids_personal = resolver_personal(validas["personal"], cur)
+            cur.execute("""
+                SELECT nombre, MIN(id)
+                FROM proyectos
+                WHERE eliminado = FALSE
+                AND nombre = ANY(%s)
+                GROUP BY nombre
+            """, (validas["proyecto"].unique().tolist(),))
+            ids_proyecto = dict(cur.fetchall())
+
+            filas = list(zip(
+                validas["personal"].map(ids_personal).astype(int),
+                validas["proyecto"].map(ids_proyecto).astype(int),
+                validas["inicio"].dt.date,
+                validas["fin"].dt.date,
+                validas["dedicacion"].astype(int)
+            ))
+            if filas:
+                execute_values(cur, """
+                    INSERT INTO asignaciones (personal_id, proyecto_id, inicio, fin, dedicacion, activa)
+                    VALUES %s
+                """, filas, template="(%s,%s,%s,%s,%s,TRUE)", page_size=1000)
+            insertados += len(filas)
+
+        # 🔴 COMMIT / ROLLBACK
+        if simulacion:
+            conn.rollback()
+        else:
+            _registrar(
+                cur, analisis, uid, archivo,
+                f"Insert={insertados} Update={actualizados} Error={len(errores)}"
+            )
+            conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+    metricas.registrar_importacion("erp", insertados + actualizados + len(errores), time.perf_counter() - t0)
+    return {"insertados": insertados, "actualizados": actualizados, "errores": errores}
+
+
+def _dia(valor):
+    return None if pd.isna(valor) else valor.date()
@@ -0,0 +1,302 @@
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+import psycopg2.extensions
+
+import trazas
+
+# =====================================================
+# CONFIG
+# =====================================================
+UMBRAL_LENTA_MS = float(os.environ.get("SLOW_QUERY_MS", "500"))
+EXPLAIN_LENTAS = os.environ.get("SLOW_QUERY_EXPLAIN", "0") == "1"
+RUTA_LOG_LENTAS = Path(os.environ.get("SLOW_QUERY_LOG", "logs/consultas_lentas.log"))
+
+# Latencias recientes por consulta (ventana móvil para percentiles)
+VENTANA = 500
+
+# Límites superiores (ms) de los buckets del histograma
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+
+# Frames que no cuentan como "sitio de llamada"
+_IGNORAR_SITIO = ("instrumentacion.py", os.sep + "pandas" + os.sep, os.sep + "psycopg2" + os.sep,
+                  os.sep + "sqlalchemy" + os.sep, os.sep + "streamlit" + os.sep)
+
+_RAIZ = str(Path(__file__).resolve().parent) + os.sep
+_ESPACIOS = re.compile(r"\s+")
+
+
+# =====================================================
+# ESTADÍSTICAS EN MEMORIA (POR PROCESO)
+# =====================================================
+class EstadisticaConsulta:
+    __slots__ = ("consulta", "llamadas", "errores", "total_ms", "max_ms",
+                 "filas", "buckets", "recientes", "sitios")
+
+    def __init__(self, consulta):
+        self.consulta = consulta
+        self.llamadas = 0
+        self.errores = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.filas = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+        self.recientes = deque(maxlen=VENTANA)
+        self.sitios = Counter()
+
+    def registrar(self, ms, filas, sitio, error):
+        self.llamadas += 1
+        self.errores += int(error)
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.filas += max(filas, 0)
+        self.recientes.append(ms)
+        self.sitios[sitio] += 1
+
+        for i, limite in enumerate(BUCKETS_MS):
+            if ms <= limite:
+                self.buckets[i] += 1
+                break
+
+    def percentil(self, p):
+        if not self.recientes:
+            return 0.0
+        datos = sorted(self.recientes)
+        return datos[min(len(datos) - 1, int(len(datos) * p))]
+
+    def resumen(self):
+        return {
+            "consulta": self.consulta,
+            "llamadas": self.llamadas,
+            "errores": self.errores,
+            "total_ms": round(self.total_ms, 2),
+            "media_ms": round(self.total_ms / self.llamadas, 2) if self.llamadas else 0.0,
+            "p50_ms": round(self.percentil(0.50), 2),
+            "p95_ms": round(self.percentil(0.95), 2),
+            "max_ms": round(self.max_ms, 2),
+            "filas_media": round(self.filas / self.llamadas, 1) if self.llamadas else 0.0,
+            "sitio": self.sitios.most_common(1)[0][0] if self.sitios else "",
+            "histograma": dict(zip([str(b) for b in BUCKETS_MS], self.buckets)),
+        }
+
+
+_estadisticas = {}
+_lock = threading.Lock()
+_desde = datetime.now()
+
+
+def normalizar_consulta(consulta):
+    return _ESPACIOS.sub(" ", consulta).strip()
+
+
+def _sitio_llamada():
+    frame = sys._getframe(2)
+    while frame:
+        archivo = frame.f_code.co_filename
+        if not any(x in archivo for x in _IGNORAR_SITIO):
+            if archivo.startswith(_RAIZ):
+                archivo = archivo[len(_RAIZ):]
+            return f"{archivo}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "?"
+
+
+def registrar_consulta(consulta, ms, filas, sitio, error=False):
+    clave = normalizar_consulta(consulta)
+
+    with _lock:
+        est = _estadisticas.get(clave)
+        if est is None:
+            est = _estadisticas[clave] = EstadisticaConsulta(clave)
+        est.registrar(ms, filas, sitio, error)
+
+
+def resumen_consultas(orden="total_ms", limite=50):
+    """
+    Top de consultas agregadas desde el arranque del proceso
+    (o el último reinicio), ordenadas por `orden`.
+    """
+    with _lock:
+        filas = [e.resumen() for e in _estadisticas.values()]
+
+    filas.sort(key=lambda r: r[orden], reverse=True)
+    return filas[:limite]
+
+
+def reiniciar_estadisticas():
+    global _desde
+    with _lock:
+        _estadisticas.clear()
+        _desde = datetime.now()
+
+
+def estadisticas_desde():
+    return _desde
+
+
+# =====================================================
+# LOG DE CONSULTAS LENTAS
+# =====================================================
+_log_lentas = None
+
+
+def _logger_lentas():
+    global _log_lentas
+
+    if _log_lentas is None:
+        RUTA_LOG_LENTAS.parent.mkdir(parents=True, exist_ok=True)
+        log = logging.getLogger("consultas_lentas")
+        log.setLevel(logging.INFO)
+        log.propagate = False
+        if not log.handlers:
+            log.addHandler(RotatingFileHandler(RUTA_LOG_LENTAS, maxBytes=5_000_000, backupCount=3, encoding="utf-8"))
+        _log_lentas = log
+
+    return _log_lentas
+
+
+# Literales, identificadores entre comillas y comentarios (no cuentan como palabras clave)
+_LITERALES = re.compile(r"\$(\w*)\$.*?\$\1\$|'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|--[^\n]*|/\*.*?\*/", re.DOTALL)
+_LECTURA = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+# CTE con escritura, SELECT … INTO, bloqueos de filas y funciones con efectos
+_ESCRITURA = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|INTO|COPY|CREATE|ALTER|DROP|CALL|LOCK|SHARE"
+    r"|NEXTVAL|SETVAL|PG_ADVISORY_LOCK\w*|PG_ADVISORY_XACT_LOCK\w*|PG_NOTIFY|DBLINK\w*)\b",
+    re.IGNORECASE
+)
+
+
+def es_lectura(consulta):
+    """
+    True solo para SELECT/WITH sin escrituras, bloqueos (FOR UPDATE/SHARE)
+    ni funciones con efectos. Ante la duda devuelve False.
+    """
+    texto = _LITERALES.sub(" ", consulta)
+    return bool(_LECTURA.match(texto)) and not _ESCRITURA.search(texto)
+
+
+def _explain(conn, consulta, parametros):
+    """
+    EXPLAIN (ANALYZE, BUFFERS) solo para lecturas puras. ANALYZE vuelve a
+    ejecutar la sentencia, así que corre dentro de un SAVEPOINT (o de una
+    transacción propia si la conexión está en autocommit) que siempre se
+    deshace: la transacción de quien llama queda igual, falle o no.
+    """
+    if not es_lectura(consulta):
+        return None
+
+    estado = conn.get_transaction_status()
+    if estado == psycopg2.extensions.TRANSACTION_STATUS_INERROR:
+        return None
+    propia = conn.autocommit or estado == psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+    cur = psycopg2.extensions.cursor(conn)
+    try:
+        cur.execute("BEGIN" if conn.autocommit else "SAVEPOINT explain_lenta")
+        try:
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + consulta, parametros)
+            return "\n".join(r[0] for r in cur.fetchall())
+        except Exception as e:
+            return f"(EXPLAIN falló: {e})"
+        finally:
+            if conn.autocommit:
+                cur.execute("ROLLBACK")
+            else:
+                cur.execute("ROLLBACK TO SAVEPOINT explain_lenta")
+                cur.execute("RELEASE SAVEPOINT explain_lenta")
+                if propia:
+                    # La transacción la abrió el SAVEPOINT: no dejarla colgada
+                    conn.rollback()
+    finally:
+        cur.close()
+
+
+def registrar_lenta(conn, consulta, parametros, ms, filas, sitio, explicable=True):
+    plan = _explain(conn, consulta, parametros) if EXPLAIN_LENTAS and explicable else None
+
+    _logger_lentas().info(json.dumps({
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "ms": round(ms, 2),
+        "filas": filas,
+        "sitio": sitio,
+        "consulta": normalizar_consulta(consulta),
+        "plan": plan,
+    }, ensure_ascii=False))
+
+
+def leer_log_lentas(limite=50):
+    """
+    Últimas entradas del log de consultas lentas (más recientes primero).
+    """
+    if not RUTA_LOG_LENTAS.exists():
+        return []
+
+    with open(RUTA_LOG_LENTAS, encoding="utf-8") as f:
+        ultimas = deque(f, maxlen=limite)
+
+    entradas = []
+    for linea in reversed(ultimas):
+        try:
+            entradas.append(json.loads(linea))
+        except ValueError:
+            continue
+    return entradas
+
+
+# =====================================================
+# CURSOR INSTRUMENTADO
+# =====================================================
+class CursorInstrumentado(psycopg2.extensions.cursor):
+    """
+    Cursor psycopg2 que mide cada execute/executemany.
+    Se instala desde database.get_connection vía cursor_factory,
+    así pd.read_sql y los cursores de logic.py quedan cubiertos.
+    """
+
+    def _medir(self, metodo, consulta, parametros, muchos=False):
+        texto = consulta.as_string(self) if hasattr(consulta, "as_string") else consulta
+        if isinstance(texto, bytes):
+            texto = texto.decode("utf-8", "replace")
+
+        error = False
+        t0 = time.perf_counter()
+        try:
+            return metodo(consulta, parametros)
+        except Exception:
+            error = True
+            raise
+        finally:
+            t1 = time.perf_counter()
+            ms = (t1 - t0) * 1000
+            sitio = _sitio_llamada()
+            registrar_consulta(texto, ms, self.rowcount, sitio, error)
+            trazas.registrar_sql(normalizar_consulta(texto), t0, t1, self.rowcount)
+
+            if not error and ms >= UMBRAL_LENTA_MS:
+                try:
+                    registrar_lenta(
+                        self.connection, texto, None if muchos else parametros,
+                        ms, self.rowcount, sitio, explicable=not muchos
+                    )
+                except Exception:
+                    pass
+
+    def execute(self, query, vars=None):
+        return self._medir(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._medir(super().executemany, query, vars_list, muchos=True)
+
+    def copy_expert(self, sql, file, size=8192):
+        # COPY no admite EXPLAIN: se registra como executemany (sin plan)
+        copiar = super().copy_expert
+        return self._medir(lambda q, _: copiar(q, file, size), sql, None, muchos=True)
@@ -0,0 +1,177 @@
+"""
+Lectura de consultas grandes a DataFrame vía COPY (query) TO STDOUT.
+
+pd.read_sql recorre el cursor fila a fila y deja columnas object que
+luego hay que reconvertir (pd.to_datetime en cada página). leer_frame
+vuelca el resultado en CSV con un único COPY y lo parsea con el lector
+columnar de pandas, tipando cada columna según su OID en Postgres:
+
+    int2/int4 → int32        int8 → int64        bool → bool
+    date/timestamp → datetime64                  numeric/float → float64
+    text/varchar → category (salvo las indicadas en `texto`)
+
+Las columnas enteras o booleanas con NULL quedan como Int32/Int64/boolean.
+Comparativa con pd.read_sql: benchmark_lectura.py.
+
+Para tablas que no caben cómodamente en memoria (historial completo,
+exportaciones) leer_por_bloques usa un cursor con nombre (server-side):
+Postgres entrega `tamano` filas por ida y vuelta y el proceso solo tiene
+un bloque a la vez.
+"""
+import io
+import itertools
+import os
+import threading
+
+import pandas as pd
+
+from database import get_connection
+
+# OIDs de pg_type
+ENTEROS = {21: "Int32", 23: "Int32", 20: "Int64"}
+FLOTANTES = {700, 701, 1700}
+BOOLEANO = 16
+FECHAS = {1082, 1114}
+FECHA_ZONA = 1184
+
+NULO = r"\N"
+
+# Filas por bloque en leer_por_bloques
+TAMANO_BLOQUE = int(os.environ.get("LECTURA_BLOQUE", "10000"))
+
+# Descripción (nombre, OID) por texto de consulta: el LIMIT 0 se hace una vez
+_descripciones = {}
+_lock = threading.Lock()
+_cursores = itertools.count(1)
+
+
+def _describir(cur, consulta, params):
+    with _lock:
+        desc = _descripciones.get(consulta)
+    if desc is None:
+        cur.execute(f"SELECT * FROM ({consulta}) AS q LIMIT 0", params)
+        desc = [(c.name, c.type_code) for c in cur.description]
+        with _lock:
+            _descripciones[consulta] = desc
+    return desc
+
+
+def _tipar(df, desc):
+    columnas = {}
+    for nombre, oid in desc:
+        s = df[nombre]
+        if oid in ENTEROS:
+            if not s.hasnans:
+                s = s.astype(ENTEROS[oid].lower())
+        elif oid == BOOLEANO:
+            if not s.hasnans:
+                s = s.astype(bool)
+        elif oid in FECHAS:
+            s = pd.to_datetime(s, format="ISO8601")
+        elif oid == FECHA_ZONA:
+            s = pd.to_datetime(s, format="ISO8601", utc=True)
+        columnas[nombre] = s
+    return pd.DataFrame(columnas)
+
+
+def leer_frame(consulta, params=None, conn=None, texto=()):
+    """
+    Ejecuta `consulta` (con placeholders %s como en pd.read_sql) y devuelve
+    un DataFrame tipado. `texto`: columnas de texto libre que no conviene
+    convertir a category (alta cardinalidad).
+    """
+    propia = conn is None
+    if propia:
+        conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        desc = _describir(cur, consulta, params)
+
+        sql = cur.mogrify(consulta, params).decode()
+        buf = io.BytesIO()
+        cur.copy_expert(f"COPY ({sql}) TO STDOUT WITH (FORMAT csv, NULL '{NULO}')", buf)
+
+    finally:
+        cur.close()
+        if propia:
+            conn.close()
+
+    tipos = {}
+    for nombre, oid in desc:
+        if oid in ENTEROS:
+            tipos[nombre] = ENTEROS[oid]
+        elif oid in FLOTANTES:
+            tipos[nombre] = "float64"
+        elif oid == BOOLEANO:
+            tipos[nombre] = "boolean"
+        elif oid in FECHAS or oid == FECHA_ZONA:
+            tipos[nombre] = "str"
+        else:
+            tipos[nombre] = "str" if nombre in texto else "category"
+
+    buf.seek(0)
+    df = pd.read_csv(
+        buf,
+        header=None,
+        names=[n for n, _ in desc],
+        dtype=tipos,
+        na_values=[NULO],
+        keep_default_na=False,
+        true_values=["t"],
+        false_values=["f"],
+    )
+    return _tipar(df, desc)
+
+
+# =====================================================
+# LECTURA POR BLOQUES (CURSOR CON NOMBRE)
+# =====================================================
+def _bloque(filas, desc):
+    df = pd.DataFrame.from_records(filas, columns=[n for n, _ in desc])
+    for nombre, oid in desc:
+        if oid in ENTEROS:
+            df[nombre] = df[nombre].astype(ENTEROS[oid] if df[nombre].hasnans else ENTEROS[oid].lower())
+        elif oid in FECHAS:
+            df[nombre] = pd.to_datetime(df[nombre])
+        elif oid == FECHA_ZONA:
+            df[nombre] = pd.to_datetime(df[nombre], utc=True)
+        elif oid in FLOTANTES:
+            df[nombre] = df[nombre].astype("float64")
+    return df
+
+
+def leer_por_bloques(consulta, params=None, tamano=None, conn=None):
+    """
+    Generador de DataFrames de hasta `tamano` filas (TAMANO_BLOQUE por
+    defecto) leídos con un cursor del servidor. Los tipos siguen las mismas
+    reglas que leer_frame salvo el texto, que queda como str (las
+    categorías no serían comunes entre bloques).
+
+    Si el consumidor deja de iterar, el cursor se cierra igualmente.
+    """
+    tamano = tamano or TAMANO_BLOQUE
+
+    propia = conn is None
+    if propia:
+        conn = get_connection()
+        conn.autocommit = False   # los cursores con nombre viven en una transacción
+    cur = conn.cursor(name=f"bloques_{next(_cursores)}")
+    cur.itersize = tamano
+
+    try:
+        cur.execute(consulta, params)
+        desc = None
+        while True:
+            filas = cur.fetchmany(tamano)
+            if desc is None:
+                desc = [(c.name, c.type_code) for c in cur.description]
+            if not filas:
+                break
+            yield _bloque(filas, desc)
+
+    finally:
+        cur.close()
+        if propia:
+            conn.rollback()
+            conn.close()
@@ -1,9 +1,176 @@
 import hashlib
 import secrets
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import numpy as np
 import pandas as pd
 import streamlit as st
+from psycopg2.extras import execute_values
 from database import get_connection
+from trazas import trazado
+import metricas
+from optimizador import matriz_costos, resolver
+from carga import DEDICACION_COMPLETA, acumular, dedicaciones, fechas, pico_por_persona
+from calendario_laboral import disponibilidad, mascara_laboral
+from alertas import obtener_alertas
+from lectura import leer_frame, leer_por_bloques
+from modelo_planificacion import invalidar_modelo, modelo
+from archivo_asignaciones import RETENCION_DIAS
+
+# =====================================================
+# CONSULTAS FRECUENTES
+# (verificar_planes.py revisa que usen sus índices)
+# =====================================================
+SQL_USUARIO = """
+    SELECT id, usuario, rol, password_hash, activo
+    FROM usuarios
+    WHERE usuario=%s
+"""
+
+SQL_GUARDAR_TOKEN_RESET = """
+    UPDATE usuarios
+    SET reset_token=%s, reset_expira=%s
+    WHERE email=%s
+"""
+
+SQL_USUARIO_POR_TOKEN = """
+    SELECT id FROM usuarios
+    WHERE reset_token=%s AND reset_expira > NOW()
+"""
+
+SQL_PERSONAL_ACTIVO = """
+    SELECT id, nombre
+    FROM personal
+    WHERE activo = TRUE
+    ORDER BY nombre
+"""
+
+SQL_PROYECTOS_VIGENTES = """
+    SELECT 
+        id,
+        nombre,
+        inicio,
+        fin,
+        confirmado,
+        estado
+    FROM proyectos
+    WHERE eliminado = FALSE
+    ORDER BY inicio DESC
+"""
+
+SQL_PROYECTOS_TOTAL = "SELECT COUNT(*) FROM proyectos WHERE eliminado=FALSE"
+
+SQL_PROYECTOS_CONFIRMADOS = """
+    SELECT COUNT(*)
+    FROM proyectos
+    WHERE confirmado=TRUE AND eliminado=FALSE
+"""
+
+# (personal_id, fin, inicio)
+SQL_ASIGNACIONES_PERSONA = """
+    SELECT personal_id, inicio, fin, dedicacion
+    FROM asignaciones
+    WHERE personal_id=%s
+    AND activa=TRUE
+    AND inicio <= %s
+    AND fin >= %s
+"""
+
+# (fin, inicio, proyectos_ids): activas del horizonte + las de los proyectos
+SQL_DISPONIBILIDAD = """
+    SELECT personal_id, proyecto_id, inicio, fin, dedicacion, activa
+    FROM asignaciones
+    WHERE (activa = TRUE AND inicio <= %s AND fin >= %s)
+    OR proyecto_id = ANY(%s)
+"""
+
+# (dedicación completa,)
+SQL_KPI_PERSONAL = """
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (WHERE c.asignado >= %s OR EXISTS (
+            SELECT 1
+            FROM ausencias au
+            WHERE au.personal_id = p.id
+            AND au.inicio <= CURRENT_DATE
+            AND au.fin >= CURRENT_DATE
+        ))
+    FROM personal p
+    CROSS JOIN LATERAL (
+        SELECT COALESCE(SUM(a.dedicacion), 0) AS asignado
+        FROM asignaciones a
+        WHERE a.personal_id = p.id
+        AND a.activa = TRUE
+        AND a.inicio <= CURRENT_DATE
+        AND a.fin >= CURRENT_DATE
+    ) c
+    WHERE p.activo = TRUE
+"""
+
+SQL_ASIGNACIONES_ACTIVAS = "SELECT COUNT(*) FROM asignaciones WHERE activa=TRUE"
+
+SQL_ASIGNACIONES_HISTORIAL = """
+    SELECT 
+        a.id,
+        p.nombre AS "Personal",
+        pr.nombre AS "Proyecto",
+        a.inicio AS "Inicio",
+        a.fin AS "Fin",
+        a.dedicacion AS "Dedicacion",
+        a.activa,
+        a.archivada
+    FROM asignaciones_todas a   -- incluye las archivadas
+    JOIN personal p ON p.id = a.personal_id
+    JOIN proyectos pr ON pr.id = a.proyecto_id
+    ORDER BY a.inicio
+"""
+
+# (fin, inicio): calendario de rangos anteriores a la retención
+SQL_CALENDARIO_HISTORICO = """
+    SELECT
+        a.id,
+        p.nombre AS "Personal",
+        pr.nombre AS "Proyecto",
+        a.inicio AS "Inicio",
+        a.fin AS "Fin",
+        a.dedicacion AS "Dedicacion"
+    FROM asignaciones_todas a
+    JOIN personal p ON p.id = a.personal_id
+    JOIN proyectos pr ON pr.id = a.proyecto_id
+    WHERE a.inicio <= %s
+    AND a.fin >= %s
+    ORDER BY a.inicio
+"""
+
+# Historial completo de la persona (incluye las archivadas); una barra por proyecto
+SQL_GANTT_PERSONA = """
+    SELECT DISTINCT
+        pr.nombre AS "Proyecto",
+        pr.inicio AS "Inicio",
+        pr.fin AS "Fin",
+        CASE 
+            WHEN pr.confirmado = TRUE THEN 'Confirmado'
+            ELSE 'No confirmado'
+        END AS "Confirmacion"
+    FROM proyectos pr
+    JOIN asignaciones_todas a ON a.proyecto_id = pr.id
+    WHERE pr.eliminado = FALSE
+    AND a.personal_id = %s
+    ORDER BY "Inicio"
+"""
+
+SQL_GANTT_PROYECTOS = """
+    SELECT 
+        nombre AS "Proyecto",
+        inicio AS "Inicio",
+        fin AS "Fin",
+        CASE 
+            WHEN confirmado = TRUE THEN 'Confirmado'
+            ELSE 'No confirmado'
+        END AS "Confirmacion"
+    FROM proyectos
+    WHERE eliminado = FALSE
+    ORDER BY inicio
+"""
 
 # =====================================================
 # SESIÓN GLOBAL
@@ -40,15 +207,12 @@ def hash_password(p):
 # =====================================================
 # LOGIN
 # =====================================================
+@trazado()
 def validar_usuario(usuario, password):
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("""
-        SELECT id, usuario, rol, password_hash, activo
-        FROM usuarios
-        WHERE usuario=%s
-    """, (usuario,))
+    cur.execute(SQL_USUARIO, (usuario,))
     row = cur.fetchone()
 
     if not row:
@@ -76,7 +240,7 @@ PERMISOS = {
     "admin": {
         "ver_dashboard","gestionar_usuarios","crear_proyecto",
         "editar_proyecto","eliminar_proyecto","asignar_personal",
-        "editar_personal","ver_auditoria"
+        "editar_personal","ver_auditoria","ver_rendimiento"
     },
     "gestor": {
         "ver_dashboard","crear_proyecto","editar_proyecto",
@@ -92,6 +256,7 @@ def tiene_permiso(rol, permiso):
 # =====================================================
 # USUARIOS
 # =====================================================
+@trazado()
 def obtener_usuarios():
     conn = get_connection()
     df = pd.read_sql("""
@@ -172,11 +337,7 @@ def generar_token_reset(email):
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("""
-        UPDATE usuarios
-        SET reset_token=%s, reset_expira=%s
-        WHERE email=%s
-    """, (token, expira, email))
+    cur.execute(SQL_GUARDAR_TOKEN_RESET, (token, expira, email))
 
     conn.commit()
     cerrar(conn, cur)
@@ -188,10 +349,7 @@ def reset_password_por_token(token, nueva_password):
     conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("""
-        SELECT id FROM usuarios
-        WHERE reset_token=%s AND reset_expira > NOW()
-    """, (token,))
+    cur.execute(SQL_USUARIO_POR_TOKEN, (token,))
     row = cur.fetchone()
 
     if not row:
@@ -217,6 +375,7 @@ def reset_password_por_token(token, nueva_password):
 # AUDITORIA
 # =====================================================
 def registrar_auditoria(uid, accion, modulo, ref, detalle):
+    metricas.AUDITORIA_PENDIENTE.inc()
     try:
         conn = get_connection()
         cur = conn.cursor()
@@ -231,40 +390,37 @@ def registrar_auditoria(uid, accion, modulo, ref, detalle):
 
     except:
         pass
+
+    finally:
+        metricas.AUDITORIA_PENDIENTE.dec()
 # =====================================================
 # COMPATIBILIDAD CALENDARIO (NO BORRAR)
 # =====================================================
 
+@trazado()
 def calendario_recursos(inicio=None, fin=None):
     """
     Devuelve asignaciones activas para calendario.
     Compatible con pages/calendario_recursos.py
     """
     try:
-        conn = get_connection()
-
-        query = """
-            SELECT 
-                a.id,
-                p.nombre AS "Personal",
-                pr.nombre AS "Proyecto",
-                a.inicio AS "Inicio",
-                a.fin AS "Fin"
-            FROM asignaciones a
-            JOIN personal p ON p.id = a.personal_id
-            JOIN proyectos pr ON pr.id = a.proyecto_id
-            WHERE a.activa = TRUE
-            ORDER BY a.inicio
-        """
-
-        df = pd.read_sql(query, conn)
-        cerrar(conn)
-        return df
+        # El modelo solo tiene la tabla caliente: rangos anteriores a la
+        # retención se leen de asignaciones_todas (incluye las archivadas
+        # y las ya vencidas, activa = FALSE)
+        if inicio is not None and inicio < date.today() - timedelta(days=RETENCION_DIAS):
+            return leer_frame(SQL_CALENDARIO_HISTORICO, (fin or date.max, inicio))
+
+        # Vista del modelo compacto (nombres category, fechas datetime64)
+        m = modelo()
+        if inicio is None or fin is None:
+            return m.asignaciones_frame()
+        return m.asignaciones_frame(m.en_rango(inicio, fin))
 
     except Exception as e:
         return pd.DataFrame()
 
 
+@trazado()
 def obtener_personal_dashboard():
     """
     Lista personal para filtros Dashboard.
@@ -273,12 +429,7 @@ def obtener_personal_dashboard():
     try:
         conn = get_connection()
 
-        df = pd.read_sql("""
-            SELECT id, nombre
-            FROM personal
-            WHERE activo = TRUE
-            ORDER BY nombre
-        """, conn)
+        df = pd.read_sql(SQL_PERSONAL_ACTIVO, conn)
 
         cerrar(conn)
 
@@ -298,36 +449,46 @@ def obtener_personal_dashboard():
 # COMPATIBILIDAD PAGINA ASIGNACIONES (NO BORRAR)
 # =====================================================
 
-def obtener_personal_disponible(inicio, fin):
+def _pico_asignado(ids, asig, inicio, fin):
     """
-    Personal libre en un rango de fechas.
-    Compatible con pages/asignaciones.py
+    Dedicación máxima (%) ya comprometida por cada id en algún día
+    laborable de [inicio, fin].
+    """
+    idx = pd.Index(ids).get_indexer(asig["personal_id"])
+    ok = idx >= 0
+    dias = (pd.Timestamp(fin) - pd.Timestamp(inicio)).days + 1
+    return pico_por_persona(
+        len(ids),
+        idx[ok],
+        fechas(asig["inicio"])[ok],
+        fechas(asig["fin"])[ok],
+        dedicaciones(asig)[ok],
+        inicio,
+        fin,
+        mascara_laboral(inicio, max(dias, 0))
+    )
+
+
+@trazado()
+def obtener_personal_disponible(inicio, fin, dedicacion=DEDICACION_COMPLETA):
+    """
+    Personal con hueco para `dedicacion` % todos los días del rango.
+    Compatible con pages/asignaciones.py ('asignado' = % ya comprometido).
     """
     try:
-        conn = get_connection()
+        m = modelo()
+        filas = m.activos()
+        dias = (pd.Timestamp(fin) - pd.Timestamp(inicio)).days + 1
 
-        query = """
-            SELECT id, nombre
-            FROM personal
-            WHERE activo = TRUE
-            AND id NOT IN (
-                SELECT personal_id
-                FROM asignaciones
-                WHERE activa = TRUE
-                AND inicio <= %s
-                AND fin >= %s
-            )
-            ORDER BY nombre
-        """
-
-        df = pd.read_sql(query, conn, params=(fin, inicio))
-        cerrar(conn)
-        return df
+        df = m.personal_frame(filas)
+        df["asignado"] = m.pico(filas, inicio, fin, mascara_laboral(inicio, max(dias, 0)))
+        return df[df["asignado"] + dedicacion <= DEDICACION_COMPLETA].reset_index(drop=True)
 
     except Exception as e:
         return pd.DataFrame()
 
 
+@trazado()
 def obtener_asignaciones():
     """
     Lista completa de asignaciones.
@@ -335,19 +496,7 @@ def obtener_asignaciones():
     try:
         conn = get_connection()
 
-        df = pd.read_sql("""
-            SELECT 
-                a.id,
-                p.nombre AS "Personal",
-                pr.nombre AS "Proyecto",
-                a.inicio AS "Inicio",
-                a.fin AS "Fin",
-                a.activa
-            FROM asignaciones a
-            JOIN personal p ON p.id = a.personal_id
-            JOIN proyectos pr ON pr.id = a.proyecto_id
-            ORDER BY a.inicio
-        """, conn)
+        df = leer_frame(SQL_ASIGNACIONES_HISTORIAL, conn=conn)
 
         cerrar(conn)
         return df
@@ -355,47 +504,90 @@ def obtener_asignaciones():
     except:
         return pd.DataFrame()
 
+
+def iterar_asignaciones(tamano=None, desde=None):
+    """
+    Variante en bloques de obtener_asignaciones (cursor del servidor):
+    DataFrames de hasta `tamano` filas, para exportar o agregar el
+    historial completo sin cargarlo entero. `desde`: solo asignaciones
+    que terminan a partir de esa fecha.
+    """
+    return leer_por_bloques("""
+        SELECT 
+            a.id,
+            p.nombre AS "Personal",
+            pr.nombre AS "Proyecto",
+            a.inicio AS "Inicio",
+            a.fin AS "Fin",
+            a.dedicacion AS "Dedicacion",
+            a.activa,
+            a.archivada
+        FROM asignaciones_todas a   -- incluye las archivadas
+        JOIN personal p ON p.id = a.personal_id
+        JOIN proyectos pr ON pr.id = a.proyecto_id
+        WHERE %s IS NULL OR a.fin >= %s
+        ORDER BY a.id
+    """, (desde, desde), tamano)
+
 # =====================================================
 # IA / MOTOR ASIGNACION (COMPATIBILIDAD ERP ULTRA)
 # =====================================================
 
-def obtener_carga_personal(pid):
+# Ventana sobre la que se promedia la carga de cada persona
+DIAS_CARGA = 28
+
+
+@trazado()
+def obtener_cargas_personal(ids, dias=DIAS_CARGA):
     """
-    Calcula % de carga del personal según asignaciones activas.
-    Fórmula simple y estable para evitar errores.
+    % de carga medio de cada persona en los próximos `dias` días:
+    suma diaria de dedicaciones de sus asignaciones activas, promediada
+    sobre los días que la persona trabaja (laborables y sin ausencia).
+    Devuelve Series id → % (puede superar 100 si está sobreasignada).
     """
-    try:
-        conn = get_connection()
-        cur = conn.cursor()
+    ids = [int(i) for i in ids]
+    cargas = pd.Series(0, index=ids, dtype=np.int64)
+    if not ids:
+        return cargas
 
-        cur.execute("""
-            SELECT COUNT(*)
-            FROM asignaciones
-            WHERE personal_id=%s AND activa=TRUE
-        """, (pid,))
+    try:
+        hoy = date.today()
 
-        total = cur.fetchone()[0]
-        cerrar(conn, cur)
+        m = modelo()
+        filas = m.filas(ids)
+        diaria = np.zeros((len(ids), dias), dtype=np.int32)
+        diaria[filas >= 0] = m.diaria(filas[filas >= 0], hoy, dias)
 
-        # Escala simple: 0 asignaciones = 0%, 1 = 25%, 2 = 50%, 3 = 75%, 4+ = 100%
-        carga = min(total * 25, 100)
-        return carga
+        trabaja = disponibilidad(ids, hoy, dias)
+        laborables = trabaja.sum(axis=1)
+        total = (diaria * trabaja).sum(axis=1)
+        cargas[:] = np.where(laborables > 0, total / np.maximum(laborables, 1), 0).round().astype(np.int64)
+        return cargas
 
     except:
-        return 0
+        return cargas
 
 
-def sugerir_personal(inicio, fin, cantidad=1):
+@trazado()
+def obtener_carga_personal(pid):
+    """
+    % de carga de una persona (ver obtener_cargas_personal).
+    """
+    return int(obtener_cargas_personal([pid]).iloc[0])
+
+
+@trazado()
+def sugerir_personal(inicio, fin, cantidad=1, dedicacion=DEDICACION_COMPLETA):
     """
     Motor inteligente simple:
     Devuelve personal disponible ordenado por menor carga.
     """
     try:
-        df = obtener_personal_disponible(inicio, fin)
+        df = obtener_personal_disponible(inicio, fin, dedicacion)
         if df.empty:
             return df
 
-        df["carga"] = df["id"].apply(obtener_carga_personal)
+        df["carga"] = obtener_cargas_personal(df["id"]).to_numpy()
         df = df.sort_values("carga")
 
         return df.head(cantidad)
@@ -404,22 +596,135 @@ def sugerir_personal(inicio, fin, cantidad=1):
         return pd.DataFrame()
 
 
+# =====================================================
+# MOTOR ÓPTIMO MULTI-PROYECTO (HÚNGARO)
+# =====================================================
+
+@trazado()
+def planificar_asignacion_optima(requerimientos, tiempo_max=0.8):
+    """
+    Asignación de costo mínimo para uno o varios proyectos.
+    requerimientos: [{proyecto_id, cantidad, inicio, fin, area?, cargo?, dedicacion?}]
+    Costo = sobrecarga (días-persona ya comprometidos en la ventana)
+            + carga en el horizonte
+            + área/cargo distintos − continuidad en el proyecto.
+    Devuelve dict con DataFrame 'asignaciones' y métricas vs voraz.
+    """
+    columnas = ["proyecto_id", "personal_id", "nombre", "area", "cargo", "sobrecarga_dias", "costo"]
+    requerimientos = [r for r in requerimientos if int(r.get("cantidad", 0)) > 0]
+
+    vacio = {
+        "asignaciones": pd.DataFrame(columns=columnas),
+        "sin_cubrir": {},
+        "optimo": True,
+        "sobrecarga_dias": 0.0,
+        "sobrecarga_voraz_dias": 0.0,
+        "costo": 0.0,
+        "costo_voraz": 0.0,
+        "segundos": 0.0,
+    }
+
+    if not requerimientos:
+        return vacio
+
+    h_ini = min(r["inicio"] for r in requerimientos)
+    h_fin = max(r["fin"] for r in requerimientos)
+    proyectos_ids = [int(r["proyecto_id"]) for r in requerimientos]
+
+    conn = get_connection()
+
+    personal = pd.read_sql("""
+        SELECT id, nombre, cargo, area
+        FROM personal
+        WHERE activo = TRUE
+        ORDER BY id
+    """, conn)
+
+    asig = pd.read_sql(SQL_DISPONIBILIDAD, conn, params=(h_fin, h_ini, proyectos_ids))
+
+    cerrar(conn)
+
+    if personal.empty:
+        return vacio
+
+    ids = personal["id"].to_numpy()
+    asig["persona"] = pd.Index(ids).get_indexer(asig["personal_id"])
+    asig = asig[asig["persona"] >= 0]
+
+    activas = asig[asig["activa"].astype(bool)]
+    existentes = {
+        "persona": activas["persona"].to_numpy(),
+        "proyecto_id": activas["proyecto_id"].to_numpy(),
+        "inicio": pd.to_datetime(activas["inicio"]).to_numpy().astype("datetime64[D]"),
+        "fin": pd.to_datetime(activas["fin"]).to_numpy().astype("datetime64[D]"),
+        "dedicacion": dedicaciones(activas),
+    }
+
+    historial = set(zip(
+        asig.loc[~asig["activa"].astype(bool), "persona"],
+        asig.loc[~asig["activa"].astype(bool), "proyecto_id"]
+    ))
+
+    personas = {
+        "id": ids,
+        "area": personal["area"].to_numpy(dtype=object),
+        "cargo": personal["cargo"].to_numpy(dtype=object),
+    }
+
+    laborable = mascara_laboral(h_ini, (pd.Timestamp(h_fin) - pd.Timestamp(h_ini)).days + 1)
+    costo, sobrecarga, plaza_req = matriz_costos(personas, existentes, requerimientos, historial, laborable=laborable)
+    res = resolver(costo, sobrecarga, tiempo_max)
+
+    asignacion = res["asignacion"]
+    ok = asignacion >= 0
+    filas = np.nonzero(ok)[0]
+    cols = asignacion[ok]
+
+    df = pd.DataFrame({
+        "proyecto_id": [requerimientos[k]["proyecto_id"] for k in plaza_req[filas]],
+        "personal_id": ids[cols],
+        "nombre": personal["nombre"].to_numpy()[cols],
+        "area": personas["area"][cols],
+        "cargo": personas["cargo"][cols],
+        "sobrecarga_dias": sobrecarga[filas, cols],
+        "costo": costo[filas, cols].round(2),
+    }, columns=columnas)
+
+    sin_cubrir = {}
+    for k in plaza_req[~ok]:
+        pid = requerimientos[k]["proyecto_id"]
+        sin_cubrir[pid] = sin_cubrir.get(pid, 0) + 1
+
+    return {
+        "asignaciones": df,
+        "sin_cubrir": sin_cubrir,
+        "optimo": res["optimo"],
+        "sobrecarga_dias": res["sobrecarga_dias"],
+        "sobrecarga_voraz_dias": res["sobrecarga_voraz_dias"],
+        "costo": res["costo"],
+        "costo_voraz": res["costo_voraz"],
+        "segundos": res["segundos"],
+    }
+
+
 # =====================================================
 # FIX FIRMA asignar_personal (COMPATIBLE CON PAGINAS)
 # =====================================================
 
-def asignar_personal(proyecto_id, personal_ids, inicio, fin, uid=None):
+@trazado()
+def asignar_personal(proyecto_id, personal_ids, inicio, fin, uid=None, dedicacion=DEDICACION_COMPLETA):
     conn = get_connection()
     cur = conn.cursor()
 
     for pid in personal_ids:
         cur.execute("""
-            INSERT INTO asignaciones(personal_id,proyecto_id,inicio,fin,activa)
-            VALUES(%s,%s,%s,%s,TRUE)
-        """, (pid, proyecto_id, inicio, fin))
+            INSERT INTO asignaciones(personal_id,proyecto_id,inicio,fin,dedicacion,activa)
+            VALUES(%s,%s,%s,%s,%s,TRUE)
+        """, (pid, proyecto_id, inicio, fin, dedicacion))
 
     conn.commit()
     cerrar(conn, cur)
+    invalidar_modelo()
 
     # Auditoría automática si se pasa usuario
     if uid:
@@ -429,15 +734,109 @@ def asignar_personal(proyecto_id, personal_ids, inicio, fin, uid=None):
                 "ASIGNAR_PERSONAL",
                 "ASIGNACIONES",
                 proyecto_id,
-                f"{len(personal_ids)} personas asignadas"
+                f"{len(personal_ids)} personas asignadas al {dedicacion}%"
+            )
+        except:
+            pass
+
+class ConflictoAsignacion(Exception):
+    """
+    El plan supera el 100 % de alguien (args[0]: {personal_id: días laborables}).
+    """
+
+
+def _conflictos_plan(cur, filas):
+    """
+    Re-chequeo dentro de la transacción de escritura: bloquea a las
+    personas del plan (FOR UPDATE) y suma sus asignaciones activas
+    actuales a las nuevas. Devuelve {personal_id: días con más de 100 %}.
+    """
+    nuevas = pd.DataFrame(filas, columns=["personal_id", "proyecto_id", "inicio", "fin", "dedicacion"])
+    ids = sorted(nuevas["personal_id"].unique().tolist())
+
+    # Dos confirmaciones simultáneas sobre la misma persona se serializan aquí
+    cur.execute("SELECT id FROM personal WHERE id = ANY(%s) ORDER BY id FOR UPDATE", (ids,))
+
+    ini, fin = fechas(nuevas["inicio"]), fechas(nuevas["fin"])
+    desde, hasta = ini.min(), fin.max()
+    cur.execute("""
+        SELECT personal_id, inicio, fin, dedicacion
+        FROM asignaciones
+        WHERE personal_id = ANY(%s)
+        AND activa = TRUE
+        AND inicio <= %s
+        AND fin >= %s
+    """, (ids, hasta.item(), desde.item()))
+    actuales = pd.DataFrame(cur.fetchall(), columns=["personal_id", "inicio", "fin", "dedicacion"])
+
+    dias = int((hasta - desde).astype(np.int64)) + 1
+    indice = pd.Index(ids)
+    propias = acumular(len(ids), indice.get_indexer(nuevas["personal_id"]), ini, fin, dedicaciones(nuevas), desde, dias)
+    total = propias + acumular(
+        len(ids), indice.get_indexer(actuales["personal_id"]),
+        fechas(actuales["inicio"]), fechas(actuales["fin"]), dedicaciones(actuales), desde, dias
+    )
+
+    exceso = (total > DEDICACION_COMPLETA) & (propias > 0) & mascara_laboral(desde, dias)[None, :]
+    return {int(ids[p]): int(exceso[p].sum()) for p in np.nonzero(exceso.any(axis=1))[0]}
+
+
+@trazado()
+def asignar_plan(filas, uid=None, accion="ASIGNAR_PLAN", detalle=None, verificar=True):
+    """
+    Inserta un plan completo en una sola transacción (todo o nada).
+    filas: [(proyecto_id, personal_id, inicio, fin, dedicacion)]
+    Con `verificar`, vuelve a comprobar la capacidad contra lo que hay en
+    la base en ese momento y lanza ConflictoAsignacion sin escribir nada.
+    Devuelve el número de asignaciones creadas.
+    """
+    filas = [
+        (int(pid), int(proyecto_id), inicio, fin, int(dedicacion))
+        for proyecto_id, pid, inicio, fin, dedicacion in filas
+    ]
+    if not filas:
+        return 0
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        if verificar:
+            conflictos = _conflictos_plan(cur, filas)
+            if conflictos:
+                raise ConflictoAsignacion(conflictos)
+
+        execute_values(cur, """
+            INSERT INTO asignaciones (personal_id, proyecto_id, inicio, fin, dedicacion, activa)
+            VALUES %s
+        """, filas, template="(%s,%s,%s,%s,%s,TRUE)")
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cerrar(conn, cur)
+
+    invalidar_modelo()
+
+    if uid:
+        try:
+            registrar_auditoria(
+                uid, accion, "ASIGNACIONES", None,
+                detalle or f"{len(filas)} asignaciones en {len({f[1] for f in filas})} proyectos"
             )
         except:
             pass
 
+    return len(filas)
+
 # =====================================================
 # PROYECTOS (COMPATIBILIDAD TOTAL)
 # =====================================================
 
+@trazado()
 def obtener_proyectos():
     """
     Lista de proyectos activos.
@@ -446,18 +845,7 @@ def obtener_proyectos():
     try:
         conn = get_connection()
 
-        df = pd.read_sql("""
-            SELECT 
-                id,
-                nombre,
-                inicio,
-                fin,
-                confirmado,
-                estado
-            FROM proyectos
-            WHERE eliminado = FALSE
-            ORDER BY inicio DESC
-        """, conn)
+        df = pd.read_sql(SQL_PROYECTOS_VIGENTES, conn)
 
         cerrar(conn)
         return df
@@ -469,6 +857,7 @@ def obtener_proyectos():
 # PROYECTOS CRUD (COMPATIBLE CON pages/proyectos.py)
 # =====================================================
 
+@trazado()
 def crear_proyecto(nombre, inicio, fin, confirmado=False, uid=None):
     try:
         conn = get_connection()
@@ -481,6 +870,7 @@ def crear_proyecto(nombre, inicio, fin, confirmado=False, uid=None):
 
         conn.commit()
         cerrar(conn, cur)
+        invalidar_modelo()
 
         if uid:
             registrar_auditoria(uid, "CREAR_PROYECTO", "PROYECTOS", None, nombre)
@@ -489,6 +879,7 @@ def crear_proyecto(nombre, inicio, fin, confirmado=False, uid=None):
         pass
 
 
+@trazado()
 def modificar_proyecto(pid, nombre, inicio, fin, confirmado, uid=None):
     try:
         conn = get_connection()
@@ -502,6 +893,7 @@ def modificar_proyecto(pid, nombre, inicio, fin, confirmado, uid=None):
 
         conn.commit()
         cerrar(conn, cur)
+        invalidar_modelo()
 
         if uid:
             registrar_auditoria(uid, "MODIFICAR_PROYECTO", "PROYECTOS", pid, nombre)
@@ -510,6 +902,7 @@ def modificar_proyecto(pid, nombre, inicio, fin, confirmado, uid=None):
         pass
 
 
+@trazado()
 def eliminar_proyecto(pid, uid=None):
     try:
         conn = get_connection()
@@ -519,6 +912,7 @@ def eliminar_proyecto(pid, uid=None):
 
         conn.commit()
         cerrar(conn, cur)
+        invalidar_modelo()
 
         if uid:
             registrar_auditoria(uid, "ELIMINAR_PROYECTO", "PROYECTOS", pid, "")
@@ -531,11 +925,12 @@ def eliminar_proyecto(pid, uid=None):
 # DASHBOARD KPI (COMPATIBLE CON Dashboard.py)
 # =====================================================
 
+@trazado()
 def kpi_proyectos():
     try:
         conn = get_connection()
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM proyectos WHERE eliminado=FALSE")
+        cur.execute(SQL_PROYECTOS_TOTAL)
         total = cur.fetchone()[0]
         cerrar(conn, cur)
         return total, 0
@@ -543,23 +938,30 @@ def kpi_proyectos():
         return 0, 0
 
 
+@trazado()
 def kpi_personal():
+    """
+    (total, disponibles hoy, ocupados hoy) del personal activo.
+    Ocupado = dedicación asignada hoy ≥ capacidad (100 %) o ausente hoy;
+    alguien al 10 % sigue disponible.
+    """
     try:
         conn = get_connection()
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM personal WHERE activo=TRUE")
-        total = cur.fetchone()[0]
+        cur.execute(SQL_KPI_PERSONAL, (DEDICACION_COMPLETA,))
+        total, ocupados = cur.fetchone()
         cerrar(conn, cur)
-        return total, 0, 0
+        return total, total - ocupados, ocupados
     except:
         return 0, 0, 0
 
 
+@trazado()
 def kpi_asignaciones():
     try:
         conn = get_connection()
         cur = conn.cursor()
-        cur.execute("SELECT COUNT(*) FROM asignaciones WHERE activa=TRUE")
+        cur.execute(SQL_ASIGNACIONES_ACTIVAS)
         total = cur.fetchone()[0]
         cerrar(conn, cur)
         return total
@@ -571,23 +973,18 @@ def kpi_asignaciones():
 # FIX SOLAPAMIENTO (ASIGNACIONES)
 # =====================================================
 
-def hay_solapamiento(pid, inicio, fin):
+@trazado()
+def hay_solapamiento(pid, inicio, fin, dedicacion=DEDICACION_COMPLETA):
+    """
+    True si sumar `dedicacion` % supera el 100 % algún día del rango.
+    """
     try:
         conn = get_connection()
-        cur = conn.cursor()
 
-        cur.execute("""
-            SELECT COUNT(*)
-            FROM asignaciones
-            WHERE personal_id=%s
-            AND activa=TRUE
-            AND inicio <= %s
-            AND fin >= %s
-        """, (pid, fin, inicio))
-
-        res = cur.fetchone()[0] > 0
-        cerrar(conn, cur)
-        return res
+        asig = pd.read_sql(SQL_ASIGNACIONES_PERSONA, conn, params=(pid, fin, inicio))
+
+        cerrar(conn)
+        return bool(_pico_asignado([pid], asig, inicio, fin)[0] + dedicacion > DEDICACION_COMPLETA)
 
     except:
         return False
@@ -597,15 +994,12 @@ def hay_solapamiento(pid, inicio, fin):
 # KPI EXTRA DASHBOARD
 # =====================================================
 
+@trazado()
 def kpi_proyectos_confirmados():
     try:
         conn = get_connection()
         cur = conn.cursor()
-        cur.execute("""
-            SELECT COUNT(*)
-            FROM proyectos
-            WHERE confirmado=TRUE AND eliminado=FALSE
-        """)
+        cur.execute(SQL_PROYECTOS_CONFIRMADOS)
         total = cur.fetchone()[0]
         cerrar(conn, cur)
         return total, 0
@@ -613,20 +1007,39 @@ def kpi_proyectos_confirmados():
         return 0, 0
 
 
-def kpi_solapamientos():
-    # Puedes mejorarlo luego — ahora evita que rompa Dashboard
-    return 0
+@trazado()
+def kpi_solapamientos(dias=365):
+    """
+    Personas cuya dedicación sumada supera el 100 % algún día
+    desde hoy hasta `dias` días vista.
+    """
+    try:
+        hoy = date.today()
+        hasta = hoy + timedelta(days=dias - 1)
+
+        m = modelo()
+        filas = np.unique(m.persona[m.en_rango(hoy, hasta)])
+        pico = m.pico(filas, hoy, hasta, mascara_laboral(hoy, dias))
+        return int((pico > DEDICACION_COMPLETA).sum())
+
+    except:
+        return 0
 
 
 # =====================================================
 # DATA EXTRA DASHBOARD
 # =====================================================
 
+@trazado()
 def obtener_alertas_por_persona(pid=None):
-    # Placeholder estable — evita crash
-    return []
+    """
+    Alertas (dicts tipo, nivel, mensaje…) de una persona o de todas.
+    Ver alertas.py: se recalculan solo las entidades cambiadas.
+    """
+    return obtener_alertas(pid)
 
 
+@trazado()
 def proyectos_gantt_por_persona(pid=None):
     """
     Datos Gantt compatibles con Plotly.
@@ -641,37 +1054,9 @@ def proyectos_gantt_por_persona(pid=None):
         conn = get_connection()
 
         if pid:
-            query = """
-                SELECT 
-                    pr.nombre AS "Proyecto",
-                    pr.inicio AS "Inicio",
-                    pr.fin AS "Fin",
-                    CASE 
-                        WHEN pr.confirmado = TRUE THEN 'Confirmado'
-                        ELSE 'No confirmado'
-                    END AS "Confirmacion"
-                FROM proyectos pr
-                JOIN asignaciones a ON a.proyecto_id = pr.id
-                WHERE pr.eliminado = FALSE
-                AND a.personal_id = %s
-                ORDER BY pr.inicio
-            """
-            df = pd.read_sql(query, conn, params=(pid,))
+            df = leer_frame(SQL_GANTT_PERSONA, (pid,), conn)
         else:
-            query = """
-                SELECT 
-                    nombre AS "Proyecto",
-                    inicio AS "Inicio",
-                    fin AS "Fin",
-                    CASE 
-                        WHEN confirmado = TRUE THEN 'Confirmado'
-                        ELSE 'No confirmado'
-                    END AS "Confirmacion"
-                FROM proyectos
-                WHERE eliminado = FALSE
-                ORDER BY inicio
-            """
-            df = pd.read_sql(query, conn)
+            df = leer_frame(SQL_GANTT_PROYECTOS, conn=conn)
 
         cerrar(conn)
 
@@ -690,11 +1075,7 @@ def proyectos_gantt_por_persona(pid=None):
 
         df = df[columnas]
 
-        # 🔒 Convertir fechas sin romper
-        df["Inicio"] = pd.to_datetime(df["Inicio"], errors="coerce")
-        df["Fin"] = pd.to_datetime(df["Fin"], errors="coerce")
-
-        # 🔒 Quitar filas corruptas
+        # 🔒 Quitar filas corruptas (fechas ya llegan como datetime64)
         df = df.dropna(subset=["Inicio", "Fin"])
 
         # 🔒 Si todo quedó vacío → devolver estructura válida
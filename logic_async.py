@@ -0,0 +1,281 @@
+"""
+Variante asíncrona (asyncpg) de las lecturas de logic.py.
+
+Las funciones `async` devuelven lo mismo que sus equivalentes de logic.py
+(mismos nombres, columnas y SQL: las constantes SQL_* de logic.py con los
+placeholders pasados a $1, $2…). Comparten un pool asyncpg propio que vive en
+un único event loop de fondo: muchas sesiones de Streamlit y tareas en
+segundo plano multiplexan sus consultas sobre pocas conexiones.
+
+Desde código síncrono (páginas, jobs) se usa el puente:
+
+    from logic_async import leer, kpi_proyectos, calendario_recursos
+    datos = leer(kpis=kpi_proyectos(), calendario=calendario_recursos())
+
+`leer` lanza todas las corutinas a la vez en el loop de fondo y espera
+el resultado (con timeout).
+"""
+import asyncio
+import itertools
+import os
+import re
+import threading
+from datetime import date, timedelta
+
+import asyncpg
+import pandas as pd
+
+import logic
+from archivo_asignaciones import RETENCION_DIAS
+from carga import DEDICACION_COMPLETA
+from logic import _pico_asignado
+from trazas import trazado
+
+POOL_MIN = int(os.environ.get("DB_ASYNC_POOL_MIN", "1"))
+POOL_MAX = int(os.environ.get("DB_ASYNC_POOL_MAX", "10"))
+TIMEOUT_SEGUNDOS = float(os.environ.get("DB_ASYNC_TIMEOUT", "30"))
+
+_bucle = None
+_pool = None
+_pool_lock = None
+_lock = threading.Lock()
+
+
+# =====================================================
+# LOOP DE FONDO Y POOL
+# =====================================================
+def _obtener_bucle():
+    global _bucle
+    with _lock:
+        if _bucle is None or _bucle.is_closed():
+            _bucle = asyncio.new_event_loop()
+            threading.Thread(
+                target=_bucle.run_forever,
+                name="logic-async",
+                daemon=True
+            ).start()
+        return _bucle
+
+
+async def obtener_pool():
+    """
+    Pool asyncpg (se crea en el primer uso, dentro del loop de fondo).
+    """
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+
+    # Varias corutinas lanzadas a la vez no deben crear dos pools
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+
+    async with _pool_lock:
+        if _pool is None:
+            _pool = await asyncpg.create_pool(
+                host=os.environ["SUPABASE_DB_HOST"],
+                database=os.environ.get("SUPABASE_DB_NAME", "postgres"),
+                user=os.environ["SUPABASE_DB_USER"],
+                password=os.environ["SUPABASE_DB_PASSWORD"],
+                port=int(os.environ.get("SUPABASE_DB_PORT", "6543")),
+                ssl=os.environ.get("SUPABASE_DB_SSLMODE", "require"),
+                min_size=POOL_MIN,
+                max_size=POOL_MAX,
+                timeout=10,
+                # El pooler de Supabase (modo transacción) no admite sentencias preparadas
+                statement_cache_size=0
+            )
+    return _pool
+
+
+async def _cerrar_pool():
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def ejecutar(corutina, timeout=TIMEOUT_SEGUNDOS):
+    """
+    Ejecuta una corutina en el loop de fondo y espera su resultado.
+    """
+    futuro = asyncio.run_coroutine_threadsafe(corutina, _obtener_bucle())
+    try:
+        return futuro.result(timeout)
+    except Exception:
+        futuro.cancel()
+        raise
+
+
+@trazado()
+def leer(timeout=TIMEOUT_SEGUNDOS, **corutinas):
+    """
+    Ejecuta varias lecturas a la vez; devuelve {nombre: resultado}.
+    """
+    async def _todas():
+        valores = await asyncio.gather(*corutinas.values())
+        return dict(zip(corutinas, valores))
+
+    return ejecutar(_todas(), timeout)
+
+
+def cerrar_pool():
+    if _bucle is not None and not _bucle.is_closed():
+        ejecutar(_cerrar_pool())
+
+
+async def _tabla(consulta, *params, columnas=None):
+    pool = await obtener_pool()
+    filas = await pool.fetch(consulta, *params)
+    if not filas:
+        return pd.DataFrame(columns=columnas)
+    return pd.DataFrame([tuple(f) for f in filas], columns=list(filas[0].keys()))
+
+
+async def _valor(consulta, *params):
+    pool = await obtener_pool()
+    return await pool.fetchval(consulta, *params)
+
+
+# =====================================================
+# SQL COMPARTIDO CON logic.py
+# =====================================================
+def _numerado(consulta):
+    """
+    Placeholders %s (psycopg2) → $1, $2… (asyncpg), en orden.
+    """
+    n = itertools.count(1)
+    return re.sub(r"%s", lambda m: f"${next(n)}", consulta)
+
+
+_SQL = {
+    nombre: _numerado(getattr(logic, nombre))
+    for nombre in dir(logic)
+    if nombre.startswith("SQL_")
+}
+
+# El calendario de logic.py lee la tabla caliente del modelo en memoria;
+# aquí se consulta directamente (mismas columnas que SQL_CALENDARIO_HISTORICO)
+_CALENDARIO = """
+    SELECT
+        a.id,
+        p.nombre AS "Personal",
+        pr.nombre AS "Proyecto",
+        a.inicio AS "Inicio",
+        a.fin AS "Fin",
+        a.dedicacion AS "Dedicacion"
+    FROM asignaciones a
+    JOIN personal p ON p.id = a.personal_id
+    JOIN proyectos pr ON pr.id = a.proyecto_id
+    WHERE a.activa = TRUE
+    {rango}
+    ORDER BY a.inicio
+"""
+
+
+# =====================================================
+# LECTURAS
+# =====================================================
+async def calendario_recursos(inicio=None, fin=None):
+    try:
+        # Igual que logic.calendario_recursos: antes de la retención, con las archivadas
+        if inicio is not None and inicio < date.today() - timedelta(days=RETENCION_DIAS):
+            return await _tabla(_SQL["SQL_CALENDARIO_HISTORICO"], fin or date.max, inicio)
+
+        if inicio is None or fin is None:
+            return await _tabla(_CALENDARIO.format(rango=""))
+        return await _tabla(_CALENDARIO.format(rango="AND a.inicio <= $1 AND a.fin >= $2"), fin, inicio)
+    except Exception:
+        return pd.DataFrame()
+
+
+async def obtener_personal_dashboard():
+    try:
+        return await _tabla(_SQL["SQL_PERSONAL_ACTIVO"], columnas=["id", "nombre"])
+    except Exception:
+        return pd.DataFrame(columns=["id", "nombre"])
+
+
+async def obtener_asignaciones():
+    try:
+        return await _tabla(_SQL["SQL_ASIGNACIONES_HISTORIAL"])
+    except Exception:
+        return pd.DataFrame()
+
+
+async def obtener_proyectos():
+    try:
+        return await _tabla(_SQL["SQL_PROYECTOS_VIGENTES"])
+    except Exception:
+        return pd.DataFrame()
+
+
+async def proyectos_gantt_por_persona(pid=None):
+    columnas = ["Proyecto", "Inicio", "Fin", "Confirmacion"]
+
+    try:
+        if pid:
+            df = await _tabla(_SQL["SQL_GANTT_PERSONA"], int(pid), columnas=columnas)
+        else:
+            df = await _tabla(_SQL["SQL_GANTT_PROYECTOS"], columnas=columnas)
+
+        df["Inicio"] = pd.to_datetime(df["Inicio"], errors="coerce")
+        df["Fin"] = pd.to_datetime(df["Fin"], errors="coerce")
+        return df.dropna(subset=["Inicio", "Fin"])
+
+    except Exception:
+        return pd.DataFrame(columns=columnas)
+
+
+# =====================================================
+# KPIs
+# =====================================================
+async def kpi_proyectos():
+    try:
+        return await _valor(_SQL["SQL_PROYECTOS_TOTAL"]), 0
+    except Exception:
+        return 0, 0
+
+
+async def kpi_personal():
+    try:
+        pool = await obtener_pool()
+        total, ocupados = await pool.fetchrow(_SQL["SQL_KPI_PERSONAL"], DEDICACION_COMPLETA)
+        return total, total - ocupados, ocupados
+    except Exception:
+        return 0, 0, 0
+
+
+async def kpi_asignaciones():
+    try:
+        return await _valor(_SQL["SQL_ASIGNACIONES_ACTIVAS"])
+    except Exception:
+        return 0
+
+
+async def kpi_proyectos_confirmados():
+    try:
+        return await _valor(_SQL["SQL_PROYECTOS_CONFIRMADOS"]), 0
+    except Exception:
+        return 0, 0
+
+
+async def kpi_solapamientos(dias=365):
+    try:
+        hoy = date.today()
+        hasta = hoy + timedelta(days=dias - 1)
+
+        asig = await _tabla("""
+            SELECT personal_id, inicio, fin, dedicacion
+            FROM asignaciones
+            WHERE activa = TRUE
+            AND inicio <= $1
+            AND fin >= $2
+        """, hasta, hoy, columnas=["personal_id", "inicio", "fin", "dedicacion"])
+
+        # Cálculo (y lectura de feriados) fuera del loop
+        ids = asig["personal_id"].unique()
+        pico = await asyncio.to_thread(_pico_asignado, ids, asig, hoy, hasta)
+        return int((pico > DEDICACION_COMPLETA).sum())
+
+    except Exception:
+        return 0
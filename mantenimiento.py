@@ -0,0 +1,175 @@
+"""
+Tareas de mantenimiento de base de datos (ejecutar por CLI o cron).
+
+    python mantenimiento.py migrar
+    python mantenimiento.py particionar
+    python mantenimiento.py crear-particiones --meses 3
+    python mantenimiento.py archivar-particiones --retencion 24 --destino archivo/
+    python mantenimiento.py purgar-cambios --dias 7
+    python mantenimiento.py duplicados-personal --umbral 0.9 --salida duplicados.csv
+    python mantenimiento.py exportar-asignaciones --salida asignaciones.csv.gz
+    python mantenimiento.py archivar-asignaciones --retencion 180 --lote 5000
+    python mantenimiento.py vencer-asignaciones --lote 5000
+
+Cron sugerido (vencer antes de archivar):
+
+    15 2 * * *  cd /app && python mantenimiento.py vencer-asignaciones
+    30 2 * * *  cd /app && python mantenimiento.py archivar-asignaciones
+"""
+import argparse
+from datetime import date
+
+from alertas import RETENCION_CAMBIOS_DIAS, purgar_cambios
+from archivo_asignaciones import LOTE, RETENCION_DIAS, archivar_asignaciones, resumen_archivo
+from exportar import csv_por_bloques
+from lectura import TAMANO_BLOQUE
+from logic import iterar_asignaciones
+from migrar_esquema import aplicar_migraciones, estado_migraciones
+from nombres import UMBRAL_SIMILITUD, VENTANA, duplicados_personal
+from particiones import (
+    TABLAS_PARTICIONADAS,
+    MESES_ADELANTE,
+    RETENCION_MESES,
+    DIRECTORIO_ARCHIVO,
+    convertir_a_particionada,
+    crear_particiones_futuras,
+    archivar_particiones
+)
+from vencimientos import LOTE as LOTE_VENCIMIENTOS, vencer_asignaciones
+
+
+# =====================================================
+# COMANDOS
+# =====================================================
+def cmd_migrar(args):
+    if not args.estado:
+        for version, nombre in aplicar_migraciones(hasta=args.hasta):
+            print(f"✅ {version:04d} {nombre}")
+    for version, nombre, estado in estado_migraciones():
+        if estado != "aplicada" or args.estado:
+            print(f"ℹ️ {version:04d} {nombre}: {estado}")
+
+
+def cmd_particionar(args):
+    for tabla in TABLAS_PARTICIONADAS:
+        res = convertir_a_particionada(tabla, args.meses, args.conservar_legado)
+        if res is False:
+            print(f"ℹ️ {tabla} ya está particionada")
+        else:
+            print(f"✅ {tabla} particionada ({res} filas migradas)")
+
+
+def cmd_crear_particiones(args):
+    creadas = crear_particiones_futuras(args.meses)
+    for nombre in creadas:
+        print(f"✅ {nombre}")
+    if not creadas:
+        print("ℹ️ Particiones al día")
+
+
+def cmd_archivar_particiones(args):
+    archivos = archivar_particiones(args.retencion, args.destino)
+    for a in archivos:
+        print(f"📦 {a}")
+    print(f"✅ {len(archivos)} particiones archivadas")
+
+
+def cmd_purgar_cambios(args):
+    print(f"✅ {purgar_cambios(args.dias)} registros de cambios eliminados")
+
+
+def cmd_duplicados_personal(args):
+    df = duplicados_personal(args.umbral, args.ventana, args.solo_activos)
+    if args.salida:
+        df.to_csv(args.salida, index=False)
+        print(f"📄 {args.salida}")
+    else:
+        print(df.to_string(index=False))
+    print(f"✅ {len(df)} posibles duplicados")
+
+
+def cmd_exportar_asignaciones(args):
+    desde = date.fromisoformat(args.desde) if args.desde else None
+    filas = csv_por_bloques(iterar_asignaciones(args.bloque, desde), args.salida)
+    print(f"✅ {filas} asignaciones exportadas a {args.salida}")
+
+
+def cmd_archivar_asignaciones(args):
+    res = archivar_asignaciones(args.retencion, args.lote, args.max_lotes, args.vacuum)
+    print(
+        f"📦 {res['filas']} asignaciones terminadas antes del {res['corte']} archivadas "
+        f"en {res['lotes']} lotes ({res['segundos']} s)"
+    )
+    r = resumen_archivo()
+    print(f"✅ En caliente: {r['caliente']} · En archivo: {r['archivo']}")
+
+
+def cmd_vencer_asignaciones(args):
+    res = vencer_asignaciones(lote=args.lote, max_lotes=args.max_lotes)
+    print(
+        f"✅ {res['filas']} asignaciones vencidas desactivadas en {res['lotes']} lotes "
+        f"({res['segundos']} s · {res['filas_por_segundo']} filas/s)"
+    )
+
+
+# =====================================================
+# CLI
+# =====================================================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mantenimiento Gestión de Recursos")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("migrar", help="Aplica las migraciones pendientes de migraciones/")
+    p.add_argument("--estado", action="store_true", help="Solo lista el estado")
+    p.add_argument("--hasta", type=int, help="Última versión a aplicar")
+    p.set_defaults(func=cmd_migrar)
+
+    p = sub.add_parser("particionar", help="Convierte auditoria/proyectos_historial a particiones mensuales")
+    p.add_argument("--meses", type=int, default=MESES_ADELANTE)
+    p.add_argument("--conservar-legado", action="store_true")
+    p.set_defaults(func=cmd_particionar)
+
+    p = sub.add_parser("crear-particiones", help="Crea particiones de los próximos meses")
+    p.add_argument("--meses", type=int, default=MESES_ADELANTE)
+    p.set_defaults(func=cmd_crear_particiones)
+
+    p = sub.add_parser("archivar-particiones", help="Desacopla y comprime particiones antiguas")
+    p.add_argument("--retencion", type=int, default=RETENCION_MESES)
+    p.add_argument("--destino", default=str(DIRECTORIO_ARCHIVO))
+    p.set_defaults(func=cmd_archivar_particiones)
+
+    p = sub.add_parser("purgar-cambios", help="Elimina registros antiguos de la tabla cambios")
+    p.add_argument("--dias", type=int, default=RETENCION_CAMBIOS_DIAS)
+    p.set_defaults(func=cmd_purgar_cambios)
+
+    p = sub.add_parser("duplicados-personal", help="Informe de posibles personas duplicadas")
+    p.add_argument("--umbral", type=float, default=UMBRAL_SIMILITUD)
+    p.add_argument("--ventana", type=int, default=VENTANA)
+    p.add_argument("--solo-activos", action="store_true")
+    p.add_argument("--salida", help="CSV de salida (por defecto se imprime)")
+    p.set_defaults(func=cmd_duplicados_personal)
+
+    p = sub.add_parser("exportar-asignaciones", help="Vuelca todas las asignaciones a CSV por bloques")
+    p.add_argument("--salida", default="asignaciones.csv.gz")
+    p.add_argument("--desde", help="Solo las que terminan desde esta fecha (AAAA-MM-DD)")
+    p.add_argument("--bloque", type=int, default=TAMANO_BLOQUE)
+    p.set_defaults(func=cmd_exportar_asignaciones)
+
+    p = sub.add_parser("archivar-asignaciones", help="Mueve asignaciones terminadas al archivo")
+    p.add_argument("--retencion", type=int, default=RETENCION_DIAS, help="Días tras el fin que siguen en caliente")
+    p.add_argument("--lote", type=int, default=LOTE)
+    p.add_argument("--max-lotes", type=int)
+    p.add_argument("--vacuum", action="store_true", help="VACUUM ANALYZE al terminar")
+    p.set_defaults(func=cmd_archivar_asignaciones)
+
+    p = sub.add_parser("vencer-asignaciones", help="Desactiva asignaciones cuyo fin ya pasó")
+    p.add_argument("--lote", type=int, default=LOTE_VENCIMIENTOS)
+    p.add_argument("--max-lotes", type=int)
+    p.set_defaults(func=cmd_vencer_asignaciones)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
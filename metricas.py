@@ -0,0 +1,223 @@
+"""
+Métricas en formato de texto Prometheus, servidas por un HTTP lateral:
+
+    curl http://localhost:9108/metrics
+
+Puerto/host configurables con METRICS_PORT / METRICS_HOST.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# =====================================================
+# CONFIG
+# =====================================================
+PUERTO = int(os.environ.get("METRICS_PORT", "9108"))
+HOST = os.environ.get("METRICS_HOST", "127.0.0.1")
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, float("inf"))
+
+PREFIJO = "gestion_"
+
+
+# =====================================================
+# TIPOS DE MÉTRICA
+# =====================================================
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _etiquetas(nombres, valores, extra=None):
+    pares = list(zip(nombres, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ""
+    return "{" + ",".join(f'{k}="{_escapar(v)}"' for k, v in pares) + "}"
+
+
+def _numero(v):
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+class _Metrica:
+    tipo = None
+
+    def __init__(self, nombre, ayuda, etiquetas=()):
+        self.nombre = PREFIJO + nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}
+        self._lock = threading.Lock()
+        REGISTRO.append(self)
+
+    def _clave(self, valores):
+        if len(valores) != len(self.etiquetas):
+            raise ValueError(f"{self.nombre} espera etiquetas {self.etiquetas}")
+        return tuple(str(v) for v in valores)
+
+    def exponer(self):
+        lineas = [f"# HELP {self.nombre} {self.ayuda}", f"# TYPE {self.nombre} {self.tipo}"]
+        with self._lock:
+            items = sorted(self._valores.items())
+        for clave, valor in items:
+            lineas.extend(self._lineas(clave, valor))
+        return lineas
+
+    def _lineas(self, clave, valor):
+        return [f"{self.nombre}{_etiquetas(self.etiquetas, clave)} {_numero(valor)}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, *etiquetas, valor=1):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def set(self, valor, *etiquetas):
+        with self._lock:
+            self._valores[self._clave(etiquetas)] = valor
+
+    def inc(self, *etiquetas, valor=1):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def dec(self, *etiquetas, valor=1):
+        self.inc(*etiquetas, valor=-valor)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = tuple(buckets)
+
+    def observar(self, valor, *etiquetas):
+        clave = self._clave(etiquetas)
+        with self._lock:
+            estado = self._valores.get(clave)
+            if estado is None:
+                estado = self._valores[clave] = [[0] * len(self.buckets), 0.0, 0]
+            for i, limite in enumerate(self.buckets):
+                if valor <= limite:
+                    estado[0][i] += 1
+            estado[1] += valor
+            estado[2] += 1
+
+    def _lineas(self, clave, estado):
+        conteos, suma, total = estado
+        lineas = [
+            f"{self.nombre}_bucket{_etiquetas(self.etiquetas, clave, ('le', _numero(b)))} {c}"
+            for b, c in zip(self.buckets, conteos)
+        ]
+        lineas.append(f"{self.nombre}_sum{_etiquetas(self.etiquetas, clave)} {_numero(suma)}")
+        lineas.append(f"{self.nombre}_count{_etiquetas(self.etiquetas, clave)} {total}")
+        return lineas
+
+
+REGISTRO = []
+
+
+# =====================================================
+# MÉTRICAS DE LA APP
+# =====================================================
+RENDERS_PAGINA = Contador("page_renders_total", "Reruns de página completados", ["pagina"])
+DURACION_PAGINA = Histograma("page_render_seconds", "Duración de cada rerun de página", ["pagina"])
+
+DURACION_LOGICA = Histograma("logic_call_seconds", "Latencia de funciones de logic.py", ["funcion"])
+ERRORES_LOGICA = Contador("logic_call_errors_total", "Excepciones en funciones de logic.py", ["funcion"])
+
+CONEXIONES_DB = Contador("db_connections_created_total", "Conexiones a la base creadas")
+DURACION_CONEXION = Histograma("db_connection_seconds", "Tiempo en abrir una conexión a la base")
+
+CACHE = Contador("cache_requests_total", "Consultas a cachés de la app", ["cache", "resultado"])
+
+FILAS_IMPORTADAS = Contador("import_rows_total", "Filas procesadas por importaciones", ["tipo"])
+DURACION_IMPORTACION = Histograma("import_seconds", "Duración de cada importación", ["tipo"])
+FILAS_POR_SEGUNDO = Medidor("import_rows_per_second", "Filas/s de la última importación", ["tipo"])
+
+AUDITORIA_PENDIENTE = Medidor("audit_queue_depth", "Escrituras de auditoría en curso")
+
+FILAS_TAREA = Contador("job_rows_total", "Filas procesadas por tareas de mantenimiento", ["tarea"])
+DURACION_TAREA = Histograma("job_seconds", "Duración de cada pasada de una tarea", ["tarea"])
+FILAS_POR_SEGUNDO_TAREA = Medidor("job_rows_per_second", "Filas/s de la última pasada", ["tarea"])
+
+
+def registrar_cache(cache, acierto):
+    CACHE.inc(cache, "hit" if acierto else "miss")
+
+
+def registrar_importacion(tipo, filas, segundos):
+    FILAS_IMPORTADAS.inc(tipo, valor=filas)
+    DURACION_IMPORTACION.observar(segundos, tipo)
+    if segundos > 0:
+        FILAS_POR_SEGUNDO.set(filas / segundos, tipo)
+
+
+def registrar_tarea(tarea, filas, segundos):
+    FILAS_TAREA.inc(tarea, valor=filas)
+    DURACION_TAREA.observar(segundos, tarea)
+    if segundos > 0:
+        FILAS_POR_SEGUNDO_TAREA.set(filas / segundos, tarea)
+
+
+def exponer():
+    lineas = []
+    for m in REGISTRO:
+        lineas.extend(m.exponer())
+    return "\n".join(lineas) + "\n"
+
+
+# =====================================================
+# SERVIDOR HTTP LATERAL
+# =====================================================
+class _Manejador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+
+        cuerpo = exponer().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+_servidor = None
+_lock_servidor = threading.Lock()
+
+
+def iniciar_servidor(puerto=PUERTO, host=HOST):
+    """
+    Arranca el servidor de métricas en un hilo daemon (una vez por proceso).
+    Si el puerto está ocupado devuelve None sin interrumpir la app.
+    """
+    global _servidor
+
+    with _lock_servidor:
+        if _servidor is not None:
+            return _servidor
+
+        try:
+            _servidor = ThreadingHTTPServer((host, puerto), _Manejador)
+        except OSError:
+            return None
+
+        _servidor.daemon_threads = True
+        threading.Thread(target=_servidor.serve_forever, name="metricas", daemon=True).start()
+        return _servidor
@@ -0,0 +1,49 @@
+-- Índices para los predicados de las consultas frecuentes de logic.py.
+-- verificar_planes.py comprueba que cada consulta los sigue usando.
+
+-- Login (validar_usuario): usuario es UNIQUE en los esquemas nuevos,
+-- pero no está garantizado en bases antiguas
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0]
+        WHERE i.indrelid = 'usuarios'::regclass
+        AND a.attname = 'usuario'
+    ) THEN
+        CREATE INDEX usuarios_usuario_idx ON usuarios (usuario);
+    END IF;
+END $$;
+
+-- Recuperación de contraseña: solo unas pocas filas tienen token
+CREATE INDEX IF NOT EXISTS usuarios_reset_token_idx
+ON usuarios (reset_token)
+WHERE reset_token IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS usuarios_email_idx
+ON usuarios (email);
+
+-- Listados y KPIs de personal activo (ordenados por nombre)
+CREATE INDEX IF NOT EXISTS personal_activos_idx
+ON personal (nombre)
+WHERE activo = TRUE;
+
+-- Proyectos no eliminados (listado, Gantt, KPIs)
+CREATE INDEX IF NOT EXISTS proyectos_vigentes_idx
+ON proyectos (inicio)
+WHERE eliminado = FALSE;
+
+-- Por persona: solapamientos, Gantt por persona, KPI de ocupados
+CREATE INDEX IF NOT EXISTS asignaciones_personal_idx
+ON asignaciones (personal_id, inicio);
+
+-- Por proyecto: disponibilidad de requerimientos, alertas por proyecto
+CREATE INDEX IF NOT EXISTS asignaciones_proyecto_idx
+ON asignaciones (proyecto_id);
+
+-- Activas en una ventana (fin >= desde AND inicio <= hasta), conteo de
+-- activas y el job de vencimientos (fin < hoy)
+CREATE INDEX IF NOT EXISTS asignaciones_activas_idx
+ON asignaciones (fin, inicio)
+WHERE activa = TRUE;
@@ -0,0 +1,15 @@
+-- Dedicación (% de jornada, 100 por defecto) de cada asignación.
+-- Antes: migrar_dedicacion_asignaciones.py (mismo DDL, idempotente).
+
+ALTER TABLE asignaciones
+ADD COLUMN IF NOT EXISTS dedicacion SMALLINT NOT NULL DEFAULT 100;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'asignaciones_dedicacion_check'
+    ) THEN
+        ALTER TABLE asignaciones
+        ADD CONSTRAINT asignaciones_dedicacion_check CHECK (dedicacion BETWEEN 1 AND 100);
+    END IF;
+END $$;
@@ -0,0 +1,20 @@
+-- Calendario laboral: feriados y ausencias (calendario_laboral.py).
+-- Antes: migrar_calendario_laboral.py.
+
+CREATE TABLE IF NOT EXISTS feriados (
+    id SERIAL PRIMARY KEY,
+    fecha DATE NOT NULL UNIQUE,
+    nombre TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ausencias (
+    id SERIAL PRIMARY KEY,
+    personal_id INTEGER NOT NULL REFERENCES personal(id),
+    inicio DATE NOT NULL,
+    fin DATE NOT NULL,
+    tipo TEXT,
+    CHECK (fin >= inicio)
+);
+
+CREATE INDEX IF NOT EXISTS ausencias_personal_fechas_idx
+ON ausencias (personal_id, inicio, fin);
@@ -0,0 +1,76 @@
+-- Registro de cambios para el motor de alertas incremental (alertas.py)
+-- y la versión del modelo de planificación. Un trigger por tabla anota qué
+-- persona y/o proyecto se tocó. Antes: migrar_cambios.py.
+
+CREATE TABLE IF NOT EXISTS cambios (
+    id BIGSERIAL PRIMARY KEY,
+    tabla TEXT NOT NULL,
+    personal_id INTEGER,
+    proyecto_id INTEGER,
+    fecha TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS cambios_fecha_idx
+ON cambios (fecha);
+
+CREATE OR REPLACE FUNCTION registrar_cambio() RETURNS TRIGGER AS $$
+DECLARE
+    fila RECORD;
+BEGIN
+    -- Movimientos masivos sin efecto en la planificación (archivado)
+    IF current_setting('cambios.omitir', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        fila := OLD;
+    ELSE
+        fila := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'asignaciones' THEN
+        INSERT INTO cambios (tabla, personal_id, proyecto_id)
+        VALUES (TG_TABLE_NAME, fila.personal_id, fila.proyecto_id);
+
+        -- Reasignación: la persona anterior también cambia
+        IF TG_OP = 'UPDATE' AND OLD.personal_id IS DISTINCT FROM NEW.personal_id THEN
+            INSERT INTO cambios (tabla, personal_id, proyecto_id)
+            VALUES (TG_TABLE_NAME, OLD.personal_id, OLD.proyecto_id);
+        END IF;
+
+    ELSIF TG_TABLE_NAME = 'proyectos' THEN
+        INSERT INTO cambios (tabla, proyecto_id)
+        VALUES (TG_TABLE_NAME, fila.id);
+
+    ELSIF TG_TABLE_NAME = 'personal' THEN
+        INSERT INTO cambios (tabla, personal_id)
+        VALUES (TG_TABLE_NAME, fila.id);
+
+    ELSIF TG_TABLE_NAME = 'ausencias' THEN
+        INSERT INTO cambios (tabla, personal_id)
+        VALUES (TG_TABLE_NAME, fila.personal_id);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS asignaciones_cambios ON asignaciones;
+CREATE TRIGGER asignaciones_cambios
+AFTER INSERT OR UPDATE OR DELETE ON asignaciones
+FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+DROP TRIGGER IF EXISTS proyectos_cambios ON proyectos;
+CREATE TRIGGER proyectos_cambios
+AFTER INSERT OR UPDATE OR DELETE ON proyectos
+FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+DROP TRIGGER IF EXISTS personal_cambios ON personal;
+CREATE TRIGGER personal_cambios
+AFTER INSERT OR UPDATE OR DELETE ON personal
+FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
+
+DROP TRIGGER IF EXISTS ausencias_cambios ON ausencias;
+CREATE TRIGGER ausencias_cambios
+AFTER INSERT OR UPDATE OR DELETE ON ausencias
+FOR EACH ROW EXECUTE FUNCTION registrar_cambio();
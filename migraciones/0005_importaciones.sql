@@ -0,0 +1,15 @@
+-- Huellas (SHA-256) de archivos ya importados: evita importar dos veces
+-- (importaciones.py). Antes: migrar_importaciones.py.
+
+CREATE TABLE IF NOT EXISTS importaciones (
+    id SERIAL PRIMARY KEY,
+    huella CHAR(64) NOT NULL,
+    tipo TEXT NOT NULL,
+    archivo TEXT,
+    usuario_id INTEGER,
+    resumen TEXT,
+    fecha TIMESTAMP NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS importaciones_huella_idx
+ON importaciones (huella, tipo);
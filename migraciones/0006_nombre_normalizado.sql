@@ -0,0 +1,31 @@
+-- Clave de búsqueda de personal: minúsculas, sin acentos, espacios
+-- colapsados (misma regla que nombres.normalizar_nombres).
+-- Antes: migrar_nombre_normalizado.py.
+
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+CREATE OR REPLACE FUNCTION normalizar_nombre(t TEXT) RETURNS TEXT AS $$
+    SELECT btrim(regexp_replace(lower(unaccent(COALESCE(t, ''))), '\s+', ' ', 'g'))
+$$ LANGUAGE sql STABLE;
+
+ALTER TABLE personal ADD COLUMN IF NOT EXISTS nombre_normalizado TEXT;
+
+-- El trigger cubre todas las escrituras (páginas, importaciones, seeds)
+CREATE OR REPLACE FUNCTION personal_nombre_normalizado() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.nombre_normalizado := normalizar_nombre(NEW.nombre);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS personal_nombre_normalizado ON personal;
+CREATE TRIGGER personal_nombre_normalizado
+BEFORE INSERT OR UPDATE OF nombre ON personal
+FOR EACH ROW EXECUTE FUNCTION personal_nombre_normalizado();
+
+UPDATE personal
+SET nombre_normalizado = normalizar_nombre(nombre)
+WHERE nombre_normalizado IS DISTINCT FROM normalizar_nombre(nombre);
+
+CREATE INDEX IF NOT EXISTS personal_nombre_normalizado_idx
+ON personal (nombre_normalizado);
@@ -0,0 +1,22 @@
+-- Almacén frío de asignaciones (archivo_asignaciones.py): mismas columnas
+-- que asignaciones más la fecha de archivado; la vista asignaciones_todas
+-- une ambas para informes e historial. Antes: migrar_archivo_asignaciones.py.
+
+CREATE TABLE IF NOT EXISTS asignaciones_archivo (
+    LIKE asignaciones,
+    archivada_en TIMESTAMP NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (id)
+);
+
+CREATE INDEX IF NOT EXISTS asignaciones_archivo_personal_idx
+ON asignaciones_archivo (personal_id, inicio);
+
+CREATE INDEX IF NOT EXISTS asignaciones_archivo_proyecto_idx
+ON asignaciones_archivo (proyecto_id);
+
+CREATE OR REPLACE VIEW asignaciones_todas AS
+SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion, activa, FALSE AS archivada
+FROM asignaciones
+UNION ALL
+SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion, activa, TRUE AS archivada
+FROM asignaciones_archivo;
@@ -0,0 +1,148 @@
+"""
+Migraciones versionadas del esquema Postgres.
+
+Cada archivo migraciones/NNNN_descripcion.sql se aplica una sola vez, en
+orden de versión y en su propia transacción. Las aplicadas quedan en
+schema_migraciones con el checksum del archivo; si un archivo ya aplicado
+cambia se avisa (las correcciones van en una migración nueva).
+
+Las migraciones parten del esquema base (usuarios, personal, proyectos,
+asignaciones, auditoria) y son idempotentes: en una base donde ya se
+corrieron los antiguos migrar_*.py solo quedan registradas.
+
+    python migrar_esquema.py            # aplica las pendientes
+    python migrar_esquema.py --estado   # solo lista
+
+También: python mantenimiento.py migrar
+"""
+import argparse
+import hashlib
+import re
+from pathlib import Path
+
+from database import get_connection
+
+DIRECTORIO = Path(__file__).resolve().parent / "migraciones"
+PATRON = re.compile(r"^(\d{4})_(.+)\.sql$")
+
+
+def _archivos(directorio=DIRECTORIO):
+    """
+    [(version, nombre, ruta)] ordenados por versión.
+    """
+    archivos = []
+    for ruta in Path(directorio).glob("*.sql"):
+        m = PATRON.match(ruta.name)
+        if m:
+            archivos.append((int(m.group(1)), m.group(2), ruta))
+
+    archivos.sort()
+    versiones = [v for v, _, _ in archivos]
+    if len(versiones) != len(set(versiones)):
+        raise ValueError(f"Versiones de migración repetidas en {directorio}")
+    return archivos
+
+
+def _checksum(texto):
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def _crear_registro(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migraciones (
+            version INTEGER PRIMARY KEY,
+            nombre TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            aplicada_en TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+
+
+def estado_migraciones(directorio=DIRECTORIO):
+    """
+    [(version, nombre, estado)] con estado 'aplicada', 'pendiente' o 'modificada'.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    try:
+        _crear_registro(cur)
+        conn.commit()
+        cur.execute("SELECT version, checksum FROM schema_migraciones")
+        aplicadas = dict(cur.fetchall())
+    finally:
+        cur.close()
+        conn.close()
+
+    estado = []
+    for version, nombre, ruta in _archivos(directorio):
+        if version not in aplicadas:
+            e = "pendiente"
+        elif aplicadas[version] != _checksum(ruta.read_text(encoding="utf-8")):
+            e = "modificada"
+        else:
+            e = "aplicada"
+        estado.append((version, nombre, e))
+    return estado
+
+
+def aplicar_migraciones(directorio=DIRECTORIO, hasta=None):
+    """
+    Aplica las migraciones pendientes (hasta la versión `hasta` incluida).
+    Devuelve [(version, nombre)] aplicadas.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    aplicadas = []
+
+    try:
+        _crear_registro(cur)
+        conn.commit()
+
+        for version, nombre, ruta in _archivos(directorio):
+            if hasta is not None and version > hasta:
+                break
+
+            # Otro proceso aplicando a la vez espera aquí y luego la ve registrada
+            cur.execute("LOCK TABLE schema_migraciones IN EXCLUSIVE MODE")
+            cur.execute("SELECT 1 FROM schema_migraciones WHERE version = %s", (version,))
+            if cur.fetchone():
+                conn.commit()
+                continue
+
+            texto = ruta.read_text(encoding="utf-8")
+            cur.execute(texto)
+            cur.execute(
+                "INSERT INTO schema_migraciones (version, nombre, checksum) VALUES (%s, %s, %s)",
+                (version, nombre, _checksum(texto))
+            )
+            conn.commit()
+            aplicadas.append((version, nombre))
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+    return aplicadas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migraciones del esquema")
+    parser.add_argument("--estado", action="store_true", help="Solo lista aplicadas y pendientes")
+    parser.add_argument("--hasta", type=int, help="Última versión a aplicar")
+    args = parser.parse_args(argv)
+
+    if not args.estado:
+        for version, nombre in aplicar_migraciones(hasta=args.hasta):
+            print(f"✅ {version:04d} {nombre}")
+
+    iconos = {"aplicada": "✔️", "pendiente": "⏳", "modificada": "⚠️"}
+    for version, nombre, e in estado_migraciones():
+        print(f"{iconos[e]} {version:04d} {nombre} ({e})")
+
+
+if __name__ == "__main__":
+    main()
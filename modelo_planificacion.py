@@ -0,0 +1,279 @@
+"""
+Modelo compacto de los datos de planificación (compartido por proceso).
+
+En lugar de DataFrames con "Personal" / "Proyecto" repetidos como str en
+cada fila de asignación y fechas como objetos date, el modelo guarda:
+
+- personas y proyectos como arreglos paralelos (id int32, flags bool,
+  área / cargo como Categorical) con sus nombres una sola vez,
+- asignaciones activas como índices int32 a esas tablas, inicio / fin
+  datetime64[D] y dedicación int16.
+
+Los cálculos (ocupación diaria, picos, disponibilidad) trabajan directo
+sobre esos arreglos con carga.py; a pandas se le entregan vistas (los
+nombres como Categorical.from_codes, sin repetir cadenas).
+
+El modelo se lee una vez (lectura.leer_frame) y se reutiliza mientras no
+cambie la tabla `cambios` (ver migraciones/0004_cambios.sql); sin ella se relee
+cada TTL_SIN_REGISTRO segundos. invalidar_modelo() fuerza la relectura
+tras escribir desde este proceso.
+
+Memoria medida con generar_dataset (5 000 personas, 2 000 proyectos):
+cada asignación ocupa 30 bytes, ~2,9 MB por 100 000 frente a ~28 MB del
+DataFrame equivalente de pd.read_sql (str y date como objetos), más
+~1,7 MB fijos de personas y proyectos (ver `python modelo_planificacion.py`).
+"""
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from carga import DEDICACION_COMPLETA, acumular, pico_por_persona
+from database import get_connection
+from lectura import leer_frame
+
+TTL_SIN_REGISTRO = 60
+
+_modelo = {"valor": None, "version": None, "leido": 0.0}
+_lock = threading.Lock()
+
+
+def _dias(valores):
+    return np.asarray(valores, dtype="datetime64[D]")
+
+
+class ModeloPlanificacion:
+
+    def __init__(self, personal, proyectos, asignaciones):
+        # ---------- personas ----------
+        self.personal_id = personal["id"].to_numpy(dtype=np.int32)
+        self.nombre = personal["nombre"].astype(object).to_numpy()
+        self.area = pd.Categorical(personal["area"])
+        self.cargo = pd.Categorical(personal["cargo"])
+        self.activo = personal["activo"].to_numpy(dtype=bool)
+
+        # ---------- proyectos ----------
+        self.proyecto_id = proyectos["id"].to_numpy(dtype=np.int32)
+        self.proyecto_nombre = proyectos["nombre"].astype(object).to_numpy()
+        self.proyecto_inicio = _dias(proyectos["inicio"])
+        self.proyecto_fin = _dias(proyectos["fin"])
+        self.confirmado = proyectos["confirmado"].to_numpy(dtype=bool)
+        self.eliminado = proyectos["eliminado"].to_numpy(dtype=bool)
+
+        self._personas = pd.Index(self.personal_id)
+        self._proyectos = pd.Index(self.proyecto_id)
+
+        # Diccionarios de nombres (pueden repetirse entre personas)
+        self._cod_nombre, self._nombres = pd.factorize(self.nombre)
+        self._cod_proyecto, self._nombres_proyecto = pd.factorize(self.proyecto_nombre)
+
+        # ---------- asignaciones activas ----------
+        persona = self._personas.get_indexer(asignaciones["personal_id"])
+        proyecto = self._proyectos.get_indexer(asignaciones["proyecto_id"])
+        ok = (persona >= 0) & (proyecto >= 0)
+
+        self.asignacion_id = asignaciones["id"].to_numpy(dtype=np.int32)[ok]
+        self.persona = persona[ok].astype(np.int32)
+        self.proyecto = proyecto[ok].astype(np.int32)
+        self.inicio = _dias(asignaciones["inicio"])[ok]
+        self.fin = _dias(asignaciones["fin"])[ok]
+        self.dedicacion = (
+            asignaciones["dedicacion"].fillna(DEDICACION_COMPLETA).to_numpy(dtype=np.int16)[ok]
+        )
+
+    # =====================================================
+    # CARGA
+    # =====================================================
+    @classmethod
+    def cargar(cls, conn=None):
+        propia = conn is None
+        if propia:
+            conn = get_connection()
+
+        try:
+            personal = leer_frame("""
+                SELECT id, nombre, area, cargo, activo
+                FROM personal
+                ORDER BY id
+            """, conn=conn)
+            proyectos = leer_frame("""
+                SELECT id, nombre, inicio, fin, confirmado, eliminado
+                FROM proyectos
+                ORDER BY id
+            """, conn=conn)
+            # Solo la tabla caliente: el historial archivado no cuenta para
+            # planificar (logic.calendario_recursos lo lee aparte)
+            asignaciones = leer_frame("""
+                SELECT id, personal_id, proyecto_id, inicio, fin, dedicacion
+                FROM asignaciones
+                WHERE activa = TRUE
+                ORDER BY inicio
+            """, conn=conn)
+
+        finally:
+            if propia:
+                conn.close()
+
+        return cls(personal, proyectos, asignaciones)
+
+    # =====================================================
+    # CONSULTAS
+    # =====================================================
+    def filas(self, ids):
+        """
+        ids de personal → posición en el modelo (-1 si no existe).
+        """
+        return self._personas.get_indexer(pd.Index(ids, dtype=np.int64))
+
+    def activos(self):
+        """
+        Posiciones del personal activo, ordenadas por nombre.
+        """
+        pos = np.nonzero(self.activo)[0]
+        return pos[np.argsort(self.nombre[pos], kind="stable")]
+
+    def en_rango(self, inicio, fin):
+        """
+        Máscara de asignaciones que tocan [inicio, fin].
+        """
+        return (self.inicio <= np.datetime64(fin, "D")) & (self.fin >= np.datetime64(inicio, "D"))
+
+    def _subconjunto(self, filas, mascara=None):
+        """
+        (fila, inicio, fin, dedicacion) de las asignaciones de `filas`
+        (posiciones), con `fila` = posición dentro de `filas`.
+        """
+        mapa = np.full(len(self.personal_id), -1, dtype=np.int32)
+        mapa[filas] = np.arange(len(filas), dtype=np.int32)
+
+        fila = mapa[self.persona]
+        sel = fila >= 0
+        if mascara is not None:
+            sel &= mascara
+        return fila[sel], self.inicio[sel], self.fin[sel], self.dedicacion[sel]
+
+    def pico(self, filas, inicio, fin, laborable=None):
+        """
+        Dedicación máxima (%) comprometida por cada fila en [inicio, fin].
+        """
+        fila, ini, fi, ded = self._subconjunto(filas, self.en_rango(inicio, fin))
+        return pico_por_persona(len(filas), fila, ini, fi, ded, inicio, fin, laborable)
+
+    def diaria(self, filas, desde, dias):
+        """
+        Matriz len(filas) × dias con la dedicación diaria (%).
+        """
+        desde = np.datetime64(desde, "D")
+        hasta = desde + np.timedelta64(dias - 1, "D")
+        fila, ini, fi, ded = self._subconjunto(filas, self.en_rango(desde, hasta))
+        return acumular(len(filas), fila, ini, fi, ded, desde, dias)
+
+    # =====================================================
+    # VISTAS PANDAS
+    # =====================================================
+    def personal_frame(self, filas):
+        return pd.DataFrame({
+            "id": self.personal_id[filas],
+            "nombre": self.nombre[filas],
+        })
+
+    def asignaciones_frame(self, mascara=None):
+        """
+        id | Personal | Proyecto | Inicio | Fin | Dedicacion
+        con nombres como Categorical (códigos int32 + diccionario).
+        """
+        sel = slice(None) if mascara is None else mascara
+        persona, proyecto = self.persona[sel], self.proyecto[sel]
+
+        return pd.DataFrame({
+            "id": self.asignacion_id[sel],
+            "Personal": pd.Categorical.from_codes(self._cod_nombre[persona], self._nombres),
+            "Proyecto": pd.Categorical.from_codes(self._cod_proyecto[proyecto], self._nombres_proyecto),
+            "Inicio": self.inicio[sel],
+            "Fin": self.fin[sel],
+            "Dedicacion": self.dedicacion[sel],
+        }, copy=False)
+
+    def memoria(self):
+        """
+        Bytes ocupados por el modelo (arreglos + diccionarios de nombres).
+        """
+        total = 0
+        for valor in vars(self).values():
+            if isinstance(valor, np.ndarray):
+                total += valor.nbytes
+                if valor.dtype == object:
+                    total += sum(sys.getsizeof(v) for v in valor)
+            elif isinstance(valor, (pd.Categorical, pd.Index)):
+                total += int(pd.Series(valor).memory_usage(deep=True, index=False))
+        return total
+
+
+# =====================================================
+# CACHÉ POR PROCESO
+# =====================================================
+def _version(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT COALESCE(MAX(id), 0) FROM cambios")
+        return cur.fetchone()[0]
+    except Exception:
+        conn.rollback()
+        return None
+    finally:
+        cur.close()
+
+
+def modelo():
+    """
+    Modelo vigente; se relee si hubo cambios (o pasó el TTL sin tabla `cambios`).
+    """
+    with _lock:
+        conn = get_connection()
+        try:
+            version = _version(conn)
+            actual = _modelo["valor"]
+            vigente = actual is not None and (
+                version == _modelo["version"] if version is not None
+                else time.monotonic() - _modelo["leido"] < TTL_SIN_REGISTRO
+            )
+            if not vigente:
+                _modelo["valor"] = ModeloPlanificacion.cargar(conn)
+                _modelo["version"] = version
+                _modelo["leido"] = time.monotonic()
+            return _modelo["valor"]
+
+        finally:
+            conn.close()
+
+
+def invalidar_modelo():
+    with _lock:
+        _modelo["valor"] = None
+
+
+if __name__ == "__main__":
+    import warnings
+
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    m = ModeloPlanificacion.cargar()
+    conn = get_connection()
+    plano = pd.read_sql("""
+        SELECT a.id, p.nombre AS "Personal", pr.nombre AS "Proyecto",
+               a.inicio AS "Inicio", a.fin AS "Fin", a.dedicacion AS "Dedicacion"
+        FROM asignaciones a
+        JOIN personal p ON p.id = a.personal_id
+        JOIN proyectos pr ON pr.id = a.proyecto_id
+        WHERE a.activa = TRUE
+    """, conn)
+    conn.close()
+
+    n = max(len(m.asignacion_id), 1)
+    compacto = m.memoria()
+    objeto = int(plano.memory_usage(deep=True).sum())
+    print(f"📦 {len(m.asignacion_id)} asignaciones, {len(m.personal_id)} personas, {len(m.proyecto_id)} proyectos")
+    print(f"   modelo    {compacto / 2**20:8.2f} MB  ({compacto / n * 1e5 / 2**20:.2f} MB / 100k asignaciones)")
+    print(f"   read_sql  {objeto / 2**20:8.2f} MB  ({objeto / n * 1e5 / 2**20:.2f} MB / 100k asignaciones)")
@@ -0,0 +1,299 @@
+"""
+Nivelación de recursos para proyectos no confirmados.
+
+Propone desplazar en el tiempo (dentro de una holgura) los proyectos con
+confirmado = FALSE para bajar el pico de carga semanal de cada área. La carga
+es una matriz área × día de dedicación (%): una parte fija (proyectos confirmados o ya
+iniciados) más el perfil de cada proyecto movible según su desplazamiento.
+Búsqueda local: por turnos, cada proyecto prueba todos sus desplazamientos
+y se queda con el que más reduce la suma de picos por área (desempate: la
+suma de cuadrados, que premia repartir la carga). Nada se escribe hasta
+`aplicar_nivelacion`.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from psycopg2.extras import execute_values
+
+from capacidad import SIN_AREA, _lunes
+from calendario_laboral import mascara_laboral
+from carga import DEDICACION_COMPLETA, dedicaciones, fechas
+from database import get_connection
+from logic import cerrar, registrar_auditoria
+from modelo_planificacion import invalidar_modelo
+from trazas import trazado
+
+HOLGURA_DIAS = 28
+PASO_DIAS = 7
+MAX_RONDAS = 6
+
+
+# =====================================================
+# MOTOR (SIN BD)
+# =====================================================
+class Nivelador:
+
+    def __init__(self, n_areas, dias, capacidad, fijo, perfiles, desplazamientos, laborable=None,
+                 ventana_semanas=None):
+        """
+        capacidad: personas por área (n_areas)
+        fijo: (área, d0, d1, dedicación) arrays con la carga que no se mueve
+        perfiles: por proyecto movible, (área, d0, d1, dedicación) de sus asignaciones
+        desplazamientos: por proyecto movible, array de desplazamientos válidos
+        laborable: bool por día (None = todos); solo esos días cuentan
+        ventana_semanas: semanas iniciales que puntúan (None = todas); el resto
+            es margen para que los desplazamientos no se salgan de la matriz
+        """
+        self.n_areas = n_areas
+        self.dias = dias
+        self.semanas = dias // 7
+        self.ventana = self.semanas if ventana_semanas is None else ventana_semanas
+        self.laborable = np.ones(dias, dtype=bool) if laborable is None else laborable
+        dias_semana = np.maximum(self.laborable.reshape(-1, 7).sum(axis=1), 1)
+        self.cap_semana = (
+            np.maximum(np.asarray(capacidad, dtype=np.float64), 1)[:, None]
+            * dias_semana[None, :] * DEDICACION_COMPLETA
+        )
+
+        self.perfiles = perfiles
+        self.opciones = desplazamientos
+        self.desp = np.zeros(len(perfiles), dtype=np.int64)
+
+        self.carga = self._diaria(*fijo)
+        for k in range(len(perfiles)):
+            self.carga += self._perfil(k, 0)
+
+    def _diaria(self, area, d0, d1, dedicacion):
+        dif = np.zeros((self.n_areas, self.dias + 1), dtype=np.int32)
+        np.add.at(dif, (area, np.clip(d0, 0, self.dias)), dedicacion)
+        np.add.at(dif, (area, np.clip(d1 + 1, 0, self.dias)), -dedicacion)
+        return np.cumsum(dif, axis=1)[:, :self.dias]
+
+    def _perfil(self, k, s):
+        area, d0, d1, dedicacion = self.perfiles[k]
+        return self._diaria(area, d0 + s, d1 + s, dedicacion)
+
+    def utilizacion(self, carga=None, areas=None):
+        """
+        Carga semanal / capacidad semanal (área × semana).
+        """
+        carga = self.carga if carga is None else carga
+        areas = np.arange(self.n_areas) if areas is None else areas
+        semanal = (carga * self.laborable).reshape(len(areas), self.semanas, 7).sum(axis=2)
+        return semanal / self.cap_semana[areas]
+
+    def _puntaje(self, util):
+        util = util[:, :self.ventana]
+        return float(util.max(axis=1).sum()), float((util ** 2).sum())
+
+    def resolver(self, max_rondas=MAX_RONDAS):
+        # Los proyectos con más personas-día primero: son los que forman el pico
+        volumen = [int(((d1 - d0 + 1) * ded).sum()) for _, d0, d1, ded in self.perfiles]
+        orden = np.argsort(volumen)[::-1]
+
+        for _ in range(max_rondas):
+            mejoro = False
+
+            for k in orden:
+                areas = np.unique(self.perfiles[k][0])
+                sin_k = self.carga[areas] - self._perfil(k, self.desp[k])[areas]
+
+                mejor_s = self.desp[k]
+                mejor = self._puntaje(self.utilizacion(self.carga[areas], areas))
+
+                for s in self.opciones[k]:
+                    puntaje = self._puntaje(self.utilizacion(sin_k + self._perfil(k, s)[areas], areas))
+                    if puntaje < mejor:
+                        mejor, mejor_s = puntaje, s
+
+                if mejor_s != self.desp[k]:
+                    self.carga[areas] = sin_k + self._perfil(k, mejor_s)[areas]
+                    self.desp[k] = mejor_s
+                    mejoro = True
+
+            if not mejoro:
+                break
+
+        return self.desp
+
+
+# =====================================================
+# PROPUESTA (LECTURA)
+# =====================================================
+@trazado()
+def proponer_nivelacion(semanas=26, holgura_dias=HOLGURA_DIAS, paso_dias=PASO_DIAS):
+    """
+    Devuelve dict con:
+        propuestas: proyectos a desplazar (inicio/fin actuales y nuevos)
+        picos: pico de uso semanal por área antes y después (%)
+        semanal: uso semanal por área antes y después (formato largo)
+    """
+    hoy = date.today()
+    desde = _lunes(hoy)
+    margen = -(-holgura_dias // 7) * 7
+    dias = semanas * 7 + margen
+    hasta = desde + timedelta(days=dias - 1)
+    # Solo se mueven (y solo puntúan) las semanas pedidas; el margen recoge
+    # la carga desplazada para no contarla como "eliminada"
+    fin_ventana = desde + timedelta(days=semanas * 7 - 1)
+
+    conn = get_connection()
+
+    personal = pd.read_sql("""
+        SELECT id, area
+        FROM personal
+        WHERE activo = TRUE
+    """, conn)
+
+    proyectos = pd.read_sql("""
+        SELECT id, nombre, inicio, fin
+        FROM proyectos
+        WHERE eliminado = FALSE
+        AND confirmado = FALSE
+        AND inicio > %s
+        AND inicio <= %s
+    """, conn, params=(hoy, fin_ventana))
+
+    asignaciones = pd.read_sql("""
+        SELECT a.personal_id, a.proyecto_id, a.inicio, a.fin, a.dedicacion
+        FROM asignaciones a
+        JOIN proyectos pr ON pr.id = a.proyecto_id
+        WHERE a.activa = TRUE
+        AND pr.eliminado = FALSE
+        AND a.inicio <= %s AND a.fin >= %s
+    """, conn, params=(hasta + timedelta(days=holgura_dias), desde))
+
+    cerrar(conn)
+
+    area_persona = personal["area"].fillna(SIN_AREA).astype("category")
+    areas = list(area_persona.cat.categories)
+    codigo = pd.Series(area_persona.cat.codes.to_numpy(), index=personal["id"].to_numpy())
+    capacidad = np.bincount(area_persona.cat.codes, minlength=len(areas))
+
+    origen = np.datetime64(desde, "D")
+    asignaciones["area"] = asignaciones["personal_id"].map(codigo)
+    asignaciones = asignaciones.dropna(subset=["area"])
+    asignaciones["d0"] = (fechas(asignaciones["inicio"]) - origen).astype(np.int64)
+    asignaciones["d1"] = (fechas(asignaciones["fin"]) - origen).astype(np.int64)
+    asignaciones["ded"] = dedicaciones(asignaciones)
+
+    def perfil_de(df):
+        return (
+            df["area"].to_numpy(dtype=np.int64),
+            df["d0"].to_numpy(dtype=np.int64),
+            df["d1"].to_numpy(dtype=np.int64),
+            df["ded"].to_numpy(dtype=np.int32),
+        )
+
+    por_proyecto = dict(tuple(asignaciones.groupby("proyecto_id")))
+    movibles = proyectos[proyectos["id"].isin(list(por_proyecto))].reset_index(drop=True)
+    fijo = asignaciones[~asignaciones["proyecto_id"].isin(movibles["id"])]
+
+    # Desplazamientos válidos: dentro de la holgura y sin empezar antes de mañana
+    inicio_d = (pd.to_datetime(movibles["inicio"]).to_numpy().astype("datetime64[D]") - np.datetime64(hoy, "D")).astype(np.int64)
+    candidatos = np.arange(-holgura_dias, holgura_dias + 1, paso_dias)
+    opciones = [candidatos[candidatos >= 1 - d] for d in inicio_d]
+
+    nivelador = Nivelador(
+        len(areas),
+        dias,
+        capacidad,
+        perfil_de(fijo),
+        [perfil_de(por_proyecto[pid]) for pid in movibles["id"]],
+        opciones,
+        mascara_laboral(desde, dias),
+        semanas
+    )
+
+    antes = nivelador.utilizacion()[:, :semanas].copy()
+    desp = nivelador.resolver()
+    despues = nivelador.utilizacion()[:, :semanas]
+
+    propuestas = movibles.assign(desplazamiento_dias=desp)
+    propuestas = propuestas[propuestas["desplazamiento_dias"] != 0].copy()
+    delta = pd.to_timedelta(propuestas["desplazamiento_dias"], "D")
+    propuestas["nuevo_inicio"] = (pd.to_datetime(propuestas["inicio"]) + delta).dt.date
+    propuestas["nuevo_fin"] = (pd.to_datetime(propuestas["fin"]) + delta).dt.date
+
+    picos = pd.DataFrame({
+        "Area": areas,
+        "Pico antes %": (antes.max(axis=1) * 100).round(1),
+        "Pico después %": (despues.max(axis=1) * 100).round(1),
+    })
+
+    n_semanas = antes.shape[1]
+    semanas_idx = origen + np.arange(n_semanas) * np.timedelta64(7, "D")
+    semanal = pd.concat([
+        pd.DataFrame({
+            "Area": np.repeat(areas, n_semanas),
+            "Semana": np.tile(semanas_idx, len(areas)),
+            "Uso %": (m * 100).ravel().round(1),
+            "Escenario": escenario,
+        })
+        for escenario, m in (("Antes", antes), ("Después", despues))
+    ], ignore_index=True)
+
+    return {"propuestas": propuestas, "picos": picos, "semanal": semanal}
+
+
+# =====================================================
+# APLICAR
+# =====================================================
+def aplicar_nivelacion(propuestas, uid=None):
+    """
+    Desplaza los proyectos aceptados y sus asignaciones activas en una transacción.
+    Los que se confirmaron entretanto no se mueven (ni ellos ni sus asignaciones).
+    Devuelve cuántos proyectos se desplazaron.
+    """
+    if propuestas.empty:
+        return 0
+
+    filas = [(int(r.id), int(r.desplazamiento_dias)) for r in propuestas.itertuples()]
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        # El UPDATE bloquea las filas de proyectos: una confirmación
+        # concurrente espera y las asignaciones siguen exactamente a los movidos
+        filas = execute_values(cur, """
+            UPDATE proyectos p
+            SET inicio = p.inicio + v.dias, fin = p.fin + v.dias
+            FROM (VALUES %s) AS v(id, dias)
+            WHERE p.id = v.id AND p.confirmado = FALSE
+            RETURNING p.id, v.dias
+        """, filas, fetch=True)
+
+        if filas:
+            execute_values(cur, """
+                UPDATE asignaciones a
+                SET inicio = a.inicio + v.dias, fin = a.fin + v.dias
+                FROM (VALUES %s) AS v(id, dias)
+                WHERE a.proyecto_id = v.id AND a.activa = TRUE
+            """, filas)
+
+        conn.commit()
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cerrar(conn, cur)
+
+    if not filas:
+        return 0
+
+    invalidar_modelo()
+
+    if uid:
+        registrar_auditoria(
+            uid,
+            "NIVELAR_PROYECTOS",
+            "PROYECTOS",
+            None,
+            ", ".join(f"{pid}:{d:+d}d" for pid, d in filas)
+        )
+
+    return len(filas)
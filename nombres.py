@@ -0,0 +1,136 @@
+"""
+Nombres de personal: clave normalizada, resolución en bloque y detección
+de posibles duplicados.
+
+La clave (minúsculas, sin acentos, espacios colapsados) vive en
+personal.nombre_normalizado y la mantiene un trigger con la función SQL
+normalizar_nombre() (ver migraciones/0006_nombre_normalizado.sql), así que todas las
+escrituras quedan cubiertas. normalizar_nombres() es el equivalente en
+pandas para comparar nombres de un archivo entre sí.
+
+Los duplicados se buscan por vecindario ordenado (sorted neighbourhood):
+se ordena por una clave y solo se comparan con difflib los registros a
+menos de `ventana` posiciones. Dos pasadas (nombre tal cual y con los
+tokens ordenados, "Pérez Juan" ≈ "Juan Pérez") cubren los casos típicos
+sin comparar todos contra todos.
+"""
+import difflib
+
+import pandas as pd
+
+from database import get_connection
+
+UMBRAL_SIMILITUD = 0.9
+VENTANA = 5
+
+
+def normalizar_nombres(nombres):
+    """
+    Series de nombres → clave normalizada (misma regla que normalizar_nombre en SQL).
+    """
+    return (
+        pd.Series(nombres, dtype=object).fillna("").astype(str)
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore").str.decode("ascii")
+        .str.lower()
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip()
+    )
+
+
+def resolver_personal(nombres, cur=None):
+    """
+    Nombre (tal como llega) → id de personal, en una sola consulta.
+    Compara por nombre normalizado; con varias coincidencias prefiere la
+    persona activa de menor id. Los no encontrados no aparecen en el dict.
+    """
+    nombres = [n for n in pd.unique(pd.Series(nombres, dtype=object).dropna()) if n != ""]
+    if not nombres:
+        return {}
+
+    propia = cur is None
+    if propia:
+        conn = get_connection()
+        cur = conn.cursor()
+
+    try:
+        cur.execute("""
+            SELECT e.nombre, (ARRAY_AGG(p.id ORDER BY p.activo DESC, p.id))[1]
+            FROM UNNEST(%s::text[]) AS e(nombre)
+            JOIN personal p ON p.nombre_normalizado = normalizar_nombre(e.nombre)
+            GROUP BY e.nombre
+        """, (nombres,))
+        return dict(cur.fetchall())
+
+    finally:
+        if propia:
+            cur.close()
+            conn.close()
+
+
+# =====================================================
+# POSIBLES DUPLICADOS
+# =====================================================
+def _tokens_ordenados(claves):
+    return claves.str.split().apply(lambda t: " ".join(sorted(t)))
+
+
+def pares_similares(claves, umbral=UMBRAL_SIMILITUD, ventana=VENTANA):
+    """
+    Pares (i, j, similitud) de posiciones de `claves` (Series de claves
+    normalizadas) con similitud >= umbral, por vecindario ordenado.
+    """
+    claves = pd.Series(claves, dtype=object).reset_index(drop=True)
+    encontrados = {}
+
+    for orden in (claves, _tokens_ordenados(claves)):
+        pos = orden.sort_values(kind="stable").index.to_numpy()
+        valores = orden.to_numpy()
+
+        for k in range(1, ventana):
+            for a, b in zip(pos[:-k], pos[k:]):
+                i, j = (a, b) if a < b else (b, a)
+                if (i, j) in encontrados:
+                    continue
+
+                x, y = valores[i], valores[j]
+                if x == y:
+                    encontrados[(i, j)] = 1.0
+                    continue
+
+                m = difflib.SequenceMatcher(None, x, y, autojunk=False)
+                if m.real_quick_ratio() >= umbral and m.quick_ratio() >= umbral:
+                    r = m.ratio()
+                    if r >= umbral:
+                        encontrados[(i, j)] = r
+
+    return [(i, j, s) for (i, j), s in encontrados.items()]
+
+
+def duplicados_personal(umbral=UMBRAL_SIMILITUD, ventana=VENTANA, solo_activos=False):
+    """
+    Informe de posibles personas duplicadas en `personal`
+    (id_a, nombre_a, id_b, nombre_b, similitud), más parecidas primero.
+    """
+    conn = get_connection()
+    df = pd.read_sql(f"""
+        SELECT id, nombre, COALESCE(nombre_normalizado, '') AS clave, area, activo
+        FROM personal
+        {"WHERE activo = TRUE" if solo_activos else ""}
+        ORDER BY id
+    """, conn)
+    conn.close()
+
+    pares = pares_similares(df["clave"], umbral, ventana)
+    columnas = ["id_a", "nombre_a", "area_a", "id_b", "nombre_b", "area_b", "similitud"]
+    if not pares:
+        return pd.DataFrame(columns=columnas)
+
+    i, j, s = map(list, zip(*pares))
+    a, b = df.iloc[i].reset_index(drop=True), df.iloc[j].reset_index(drop=True)
+
+    return pd.DataFrame({
+        "id_a": a["id"], "nombre_a": a["nombre"], "area_a": a["area"],
+        "id_b": b["id"], "nombre_b": b["nombre"], "area_b": b["area"],
+        "similitud": pd.Series(s).round(3),
+    }).sort_values(["similitud", "id_a"], ascending=[False, True], ignore_index=True)
@@ -0,0 +1,281 @@
+"""
+Motor de asignación óptima (sin acceso a BD).
+
+Cada proyecto con `cantidad` personas se expande en `cantidad` filas
+("plazas"); las columnas son personas. La matriz de costos se construye
+vectorizada y se resuelve con el algoritmo húngaro (Kuhn–Munkres con
+potenciales), de modo que cada persona cubre como máximo una plaza del lote.
+"""
+import time
+
+import numpy as np
+
+from carga import DEDICACION_COMPLETA, acumular
+
+# =====================================================
+# PESOS DEL COSTO
+# =====================================================
+PESOS = {
+    "sobrecarga_dia": 10.0,   # por día-persona ya comprometido en la ventana
+    "carga": 5.0,             # utilización de la persona en el horizonte (0..1)
+    "area": 50.0,             # área distinta a la requerida
+    "cargo": 25.0,            # cargo distinto al requerido
+    "continuidad": 3.0,       # bonificación si ya trabajó en el proyecto
+}
+
+PROHIBIDO = 1e9
+
+# Costo de dejar una plaza sin cubrir (columna ficticia): menor que
+# PROHIBIDO para que nunca se fuerce una asignación imposible
+SIN_CUBRIR = 1e6
+
+
+# =====================================================
+# MATRIZ DE COSTOS (VECTORIZADA)
+# =====================================================
+def dias_solapados(ini_a, fin_a, ini_b, fin_b):
+    """
+    Días (inclusive) de solapamiento entre intervalos; admite broadcasting.
+    """
+    desde = np.maximum(ini_a, ini_b)
+    hasta = np.minimum(fin_a, fin_b)
+    return np.maximum((hasta - desde).astype("timedelta64[D]").astype(np.int64) + 1, 0)
+
+
+def ocupacion_por_persona(n_personas, ex_persona, ex_inicio, ex_fin, ini, fin, ex_dedicacion=None):
+    """
+    Matriz (len(ini) × n_personas) de días-persona comprometidos por cada
+    persona dentro de cada ventana [ini, fin], ponderados por dedicación.
+    """
+    n_vent = len(ini)
+    ocupado = np.zeros((n_vent, n_personas), dtype=np.float64)
+    if len(ex_persona) == 0:
+        return ocupado
+
+    # (ventanas × asignaciones existentes) → acumulado por persona
+    solape = dias_solapados(ex_inicio[None, :], ex_fin[None, :], ini[:, None], fin[:, None])
+    if ex_dedicacion is not None:
+        solape = solape * (np.asarray(ex_dedicacion, dtype=np.float64) / 100)[None, :]
+    filas = np.repeat(np.arange(n_vent), len(ex_persona))
+    cols = np.tile(ex_persona, n_vent)
+    np.add.at(ocupado, (filas, cols), solape.ravel())
+    return ocupado
+
+
+def pico_en_ventanas(n_personas, ex_persona, ex_inicio, ex_fin, ex_dedicacion, ini, fin, laborable=None):
+    """
+    Matriz (len(ini) × n_personas) con la dedicación máxima (%) ya
+    comprometida por cada persona en algún día de cada ventana [ini, fin].
+    laborable: bool por día de [min(ini), max(fin)]; los no laborables no cuentan.
+    """
+    pico = np.zeros((len(ini), n_personas), dtype=np.int32)
+    if len(ex_persona) == 0 or len(ini) == 0:
+        return pico
+
+    desde = ini.min()
+    dias = int((fin.max() - desde).astype(np.int64)) + 1
+    diaria = acumular(n_personas, ex_persona, ex_inicio, ex_fin, ex_dedicacion, desde, dias)
+    if laborable is not None:
+        diaria = diaria * np.asarray(laborable, dtype=bool)[None, :dias]
+
+    d0 = (ini - desde).astype(np.int64)
+    d1 = (fin - desde).astype(np.int64) + 1
+    for k in range(len(ini)):
+        if d1[k] > d0[k]:
+            pico[k] = diaria[:, d0[k]:d1[k]].max(axis=1)
+    return pico
+
+
+def matriz_costos(personas, existentes, requerimientos, historial=None, pesos=PESOS, laborable=None):
+    """
+    personas: dict con arrays id, area, cargo (n personas)
+    existentes: dict con arrays persona (índice en personas), proyecto_id, inicio, fin, [dedicacion]
+    requerimientos: lista de dicts proyecto_id, cantidad, inicio, fin, [area], [cargo], [dedicacion]
+    historial: set de (índice persona, proyecto_id) ya trabajados
+    laborable: bool por día desde el inicio más temprano (ver pico_en_ventanas)
+
+    Superar el 100 % algún día con la dedicación pedida es imposible
+    (PROHIBIDO), no una penalización: ningún peso de área/cargo lo compensa.
+
+    Devuelve (costo [plazas × n], sobrecarga [plazas × n], plaza → índice de requerimiento).
+    """
+    n = len(personas["id"])
+    r_ini = np.array([r["inicio"] for r in requerimientos], dtype="datetime64[D]")
+    r_fin = np.array([r["fin"] for r in requerimientos], dtype="datetime64[D]")
+
+    ex_p = np.asarray(existentes["persona"], dtype=np.int64)
+    ex_i = np.asarray(existentes["inicio"], dtype="datetime64[D]")
+    ex_f = np.asarray(existentes["fin"], dtype="datetime64[D]")
+    ex_pr = np.asarray(existentes["proyecto_id"])
+    ex_d = existentes.get("dedicacion")
+
+    # Solapamiento por requerimiento y utilización global en el horizonte
+    sobre = ocupacion_por_persona(n, ex_p, ex_i, ex_f, r_ini, r_fin, ex_d)
+
+    pico = pico_en_ventanas(
+        n, ex_p, ex_i, ex_f,
+        np.full(len(ex_p), DEDICACION_COMPLETA) if ex_d is None else np.asarray(ex_d),
+        r_ini, r_fin, laborable
+    )
+    r_ded = np.array([int(r.get("dedicacion") or DEDICACION_COMPLETA) for r in requerimientos])
+
+    h_ini, h_fin = r_ini.min(), r_fin.max()
+    horizonte = ocupacion_por_persona(n, ex_p, ex_i, ex_f, np.array([h_ini]), np.array([h_fin]), ex_d)[0]
+    carga = np.minimum(horizonte / ((h_fin - h_ini).astype(np.int64) + 1), 1.0)
+
+    costo_req = pesos["sobrecarga_dia"] * sobre + pesos["carga"] * carga[None, :]
+
+    areas = np.asarray(personas["area"], dtype=object)
+    cargos = np.asarray(personas["cargo"], dtype=object)
+
+    for k, r in enumerate(requerimientos):
+        if r.get("area"):
+            costo_req[k] += pesos["area"] * (areas != r["area"])
+        if r.get("cargo"):
+            costo_req[k] += pesos["cargo"] * (cargos != r["cargo"])
+
+        # Ya asignado (activo) a este mismo proyecto → no puede repetirse
+        ya = ex_p[ex_pr == r["proyecto_id"]]
+        costo_req[k, ya] = PROHIBIDO
+
+        # Sin hueco para la dedicación pedida algún día de la ventana
+        costo_req[k, pico[k] + r_ded[k] > DEDICACION_COMPLETA] = PROHIBIDO
+
+    if historial:
+        req_por_proyecto = {}
+        for k, r in enumerate(requerimientos):
+            req_por_proyecto.setdefault(r["proyecto_id"], []).append(k)
+        for p_idx, proyecto_id in historial:
+            for k in req_por_proyecto.get(proyecto_id, ()):
+                if costo_req[k, p_idx] < PROHIBIDO:
+                    costo_req[k, p_idx] -= pesos["continuidad"]
+
+    plaza_req = np.repeat(np.arange(len(requerimientos)), [r["cantidad"] for r in requerimientos])
+    return costo_req[plaza_req], sobre[plaza_req], plaza_req
+
+
+# =====================================================
+# SOLVERS
+# =====================================================
+def asignacion_voraz(costo):
+    """
+    Línea base: cada plaza toma la persona libre más barata, en orden.
+    """
+    n, m = costo.shape
+    libre = np.ones(m, dtype=bool)
+    res = np.full(n, -1, dtype=np.int64)
+
+    for i in range(n):
+        fila = np.where(libre, costo[i], np.inf)
+        j = int(np.argmin(fila))
+        if np.isfinite(fila[j]) and fila[j] < PROHIBIDO:
+            res[i] = j
+            libre[j] = False
+
+    return res
+
+
+def hungaro(costo, tiempo_max=None):
+    """
+    Asignación de costo mínimo para una matriz rectangular n × m (n ≤ m).
+    Si se agota `tiempo_max` (segundos), las filas pendientes se completan
+    de forma voraz. Devuelve (columna por fila, -1 si no asignada; óptimo?).
+    """
+    n, m = costo.shape
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), True
+    if n > m:
+        raise ValueError("Más plazas que personas: reduce la cantidad requerida")
+
+    t0 = time.perf_counter()
+    c = np.asarray(costo, dtype=np.float64)
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=np.int64)     # p[j] = fila (1..n) asignada a la columna j
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    optimo = True
+    for i in range(1, n + 1):
+        if tiempo_max is not None and time.perf_counter() - t0 > tiempo_max:
+            optimo = False
+            break
+
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        usado = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            usado[j0] = True
+            i0 = p[j0]
+
+            libres = ~usado[1:]
+            actual = c[i0 - 1] - u[i0] - v[1:]
+            mejora = libres & (actual < minv[1:])
+            minv[1:][mejora] = actual[mejora]
+            way[1:][mejora] = j0
+
+            candidatos = np.where(libres, minv[1:], np.inf)
+            j1 = int(np.argmin(candidatos)) + 1
+            delta = candidatos[j1 - 1]
+
+            u[p[usado]] += delta
+            v[usado] -= delta
+            minv[1:][libres] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    res = np.full(n, -1, dtype=np.int64)
+    cols = np.nonzero(p[1:])[0]
+    res[p[1:][cols] - 1] = cols
+
+    if not optimo:
+        libre = np.ones(m, dtype=bool)
+        libre[res[res >= 0]] = False
+        for fila in np.nonzero(res < 0)[0]:
+            opciones = np.where(libre, c[fila], np.inf)
+            j = int(np.argmin(opciones))
+            res[fila] = j
+            libre[j] = False
+
+    # Plazas que solo podían cubrirse con un costo prohibido quedan sin asignar
+    asignadas = res >= 0
+    res[asignadas & (c[np.arange(n), np.maximum(res, 0)] >= PROHIBIDO)] = -1
+    return res, optimo
+
+
+def resolver(costo, sobrecarga, tiempo_max=None):
+    """
+    Resuelve y compara contra la línea base voraz.
+    """
+    t0 = time.perf_counter()
+    n, m = costo.shape
+
+    # Una columna ficticia por plaza: el solver decide qué plazas quedan vacías
+    ampliada = np.hstack([costo, np.full((n, n), SIN_CUBRIR)])
+    res, optimo = hungaro(ampliada, tiempo_max)
+    res[res >= m] = -1
+
+    voraz = asignacion_voraz(costo)
+
+    def total(asig, matriz):
+        ok = asig >= 0
+        return float(matriz[np.nonzero(ok)[0], asig[ok]].sum())
+
+    return {
+        "asignacion": res,
+        "optimo": optimo,
+        "costo": total(res, costo),
+        "sobrecarga_dias": total(res, sobrecarga),
+        "costo_voraz": total(voraz, costo),
+        "sobrecarga_voraz_dias": total(voraz, sobrecarga),
+        "segundos": time.perf_counter() - t0,
+    }
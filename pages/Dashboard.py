@@ -1,21 +1,20 @@
 import streamlit as st
 import plotly.express as px
+import numpy as np
 import pandas as pd
 from datetime import date, timedelta
 
 from logic import (
     asegurar_sesion,
     tiene_permiso,
-    obtener_personal_dashboard,
-    proyectos_gantt_por_persona,
-    obtener_alertas_por_persona,
-    kpi_proyectos,
-    kpi_personal,
-    kpi_asignaciones,
-    kpi_solapamientos,
-    kpi_proyectos_confirmados,
-    calendario_recursos
+    obtener_personal_dashboard
 )
+from alertas import NIVELES, a_tabla as tabla_alertas
+from capacidad import a_tabla
+from carga_paralela import cargar_dashboard
+from calendario_laboral import mascara_laboral
+from carga import acumular, dedicaciones, fechas, por_semana
+from trazas import trazar_pagina, span
 
 # =====================================================
 # 🔐 SESIÓN GLOBAL
@@ -40,143 +39,242 @@ if not tiene_permiso(st.session_state.rol, "ver_dashboard"):
 
 st.title("📊 Dashboard de Gestión")
 
-# =====================================================
-# FILTRO POR PERSONA
-# =====================================================
-st.subheader("🔎 Filtros")
-
-df_personal = obtener_personal_dashboard()
-opciones = ["Todos"] + df_personal["nombre"].tolist()
-
-persona_sel = st.selectbox("Filtrar por persona", opciones)
-
-personal_id = None
-persona_nombre = None
-
-if persona_sel != "Todos":
-    fila = df_personal[df_personal["nombre"] == persona_sel].iloc[0]
-    personal_id = int(fila["id"])
-    persona_nombre = fila["nombre"]
-
-# 👉 IR A CALENDARIO
-if persona_nombre:
-    if st.button(f"📅 Ver calendario de {persona_nombre}"):
-        st.session_state["filtro_persona"] = persona_nombre
-        st.switch_page("pages/calendario_recursos.py")
-
-st.divider()
-
-# =====================================================
-# KPIs
-# =====================================================
-col1, col2, col3, col4, col5 = st.columns(5)
-
-activos, cerrados = kpi_proyectos()
-total_personal, disponibles, ocupados = kpi_personal()
-total_asignaciones = kpi_asignaciones()
-solapamientos = kpi_solapamientos()
-confirmados, no_confirmados = kpi_proyectos_confirmados()
-
-col1.metric("Proyectos activos", activos)
-col2.metric("Personal total", total_personal)
-col3.metric("Asignaciones activas", total_asignaciones)
-col4.metric("⚠️ Sobreasignaciones", solapamientos)
-col5.metric("Proyectos confirmados", confirmados)
-
-st.divider()
-
-# =====================================================
-# ALERTAS
-# =====================================================
-st.subheader("🔔 Alertas")
-
-alertas = obtener_alertas_por_persona(personal_id)
-
-if not alertas:
-    st.success("No hay alertas pendientes 🎉")
-else:
-    for a in alertas:
-        st.warning(a)
-
-st.divider()
-
-# =====================================================
-# HEATMAP
-# =====================================================
-st.subheader("🔥 Heatmap semanal de carga")
-
-hoy = date.today()
-inicio = hoy - timedelta(weeks=4)
-fin = hoy + timedelta(weeks=8)
-
-df_cal = calendario_recursos(inicio, fin)
-
-if persona_nombre:
-    df_cal = df_cal[df_cal["Personal"] == persona_nombre]
-
-if not df_cal.empty:
-
-    df_cal["Inicio"] = pd.to_datetime(df_cal["Inicio"])
-    df_cal["Fin"] = pd.to_datetime(df_cal["Fin"])
-
-    filas = []
-    for _, r in df_cal.iterrows():
-        semana = r["Inicio"]
-        while semana <= r["Fin"]:
-            filas.append({
-                "Personal": r["Personal"],
-                "Semana": semana.strftime("%Y-%W")
+MAX_ALERTAS = 20
+SIN_DATO = "—"
+
+
+def aviso_carga(datos, *nombres):
+    for n in nombres:
+        if n in datos.errores:
+            st.warning(f"⏱️ No se pudo cargar '{n}': {datos.errores[n]}")
+
+with trazar_pagina("Dashboard", usuario=st.session_state.usuario):
+
+    # =====================================================
+    # FILTRO POR PERSONA
+    # =====================================================
+    with span("Filtros"):
+        st.subheader("🔎 Filtros")
+
+        df_personal = obtener_personal_dashboard()
+        opciones = ["Todos"] + df_personal["nombre"].tolist()
+
+        persona_sel = st.selectbox("Filtrar por persona", opciones)
+
+        personal_id = None
+        persona_nombre = None
+
+        if persona_sel != "Todos":
+            fila = df_personal[df_personal["nombre"] == persona_sel].iloc[0]
+            personal_id = int(fila["id"])
+            persona_nombre = fila["nombre"]
+
+        # 👉 IR A CALENDARIO
+        if persona_nombre:
+            if st.button(f"📅 Ver calendario de {persona_nombre}"):
+                st.session_state["filtro_persona"] = persona_nombre
+                st.switch_page("pages/calendario_recursos.py")
+
+        st.divider()
+
+    # =====================================================
+    # CARGA CONCURRENTE (todas las lecturas restantes a la vez)
+    # =====================================================
+    with span("Carga paralela"):
+        hoy = date.today()
+        inicio = hoy - timedelta(weeks=4)
+        fin = hoy + timedelta(weeks=8)
+
+        datos = cargar_dashboard(
+            personal_id,
+            inicio,
+            fin,
+            st.session_state.get("semanas_capacidad", 26)
+        )
+
+    # =====================================================
+    # KPIs
+    # =====================================================
+    with span("KPIs"):
+        col1, col2, col3, col4, col5, col6 = st.columns(6)
+
+        activos, cerrados = datos.resultado("kpi_proyectos", (SIN_DATO, SIN_DATO))
+        total_personal, disponibles, ocupados = datos.resultado("kpi_personal", (SIN_DATO,) * 3)
+        total_asignaciones = datos.resultado("kpi_asignaciones", SIN_DATO)
+        solapamientos = datos.resultado("kpi_solapamientos", SIN_DATO)
+        confirmados, no_confirmados = datos.resultado("kpi_confirmados", (SIN_DATO, SIN_DATO))
+
+        col1.metric("Proyectos activos", activos)
+        col2.metric("Personal total", total_personal)
+        col3.metric("Asignaciones activas", total_asignaciones)
+        col4.metric("⚠️ Sobreasignaciones", solapamientos)
+        col5.metric("Proyectos confirmados", confirmados)
+        col6.metric("Disponibles hoy", disponibles)
+
+        aviso_carga(datos, "kpi_proyectos", "kpi_personal", "kpi_asignaciones",
+                    "kpi_solapamientos", "kpi_confirmados")
+
+        st.divider()
+
+    # =====================================================
+    # ALERTAS
+    # =====================================================
+    with span("Alertas"):
+        st.subheader("🔔 Alertas")
+
+        alertas = datos.resultado("alertas", [])
+
+        if "alertas" in datos.errores:
+            aviso_carga(datos, "alertas")
+        elif not alertas:
+            st.success("No hay alertas pendientes 🎉")
+        else:
+            df_alertas = tabla_alertas(alertas)
+
+            conteo = df_alertas["tipo"].value_counts()
+            cols = st.columns(len(conteo))
+            for col, (tipo, n) in zip(cols, conteo.items()):
+                col.metric(tipo.replace("_", " ").capitalize(), int(n))
+
+            for a in df_alertas.head(MAX_ALERTAS).itertuples():
+                st.warning(f"{NIVELES[a.nivel]} {a.mensaje}")
+
+            if len(df_alertas) > MAX_ALERTAS:
+                with st.expander(f"Ver las {len(df_alertas) - MAX_ALERTAS} alertas restantes"):
+                    st.dataframe(
+                        df_alertas.iloc[MAX_ALERTAS:][["nivel", "tipo", "mensaje"]],
+                        use_container_width=True,
+                        hide_index=True
+                    )
+
+        st.divider()
+
+    # =====================================================
+    # HEATMAP
+    # =====================================================
+    with span("Heatmap"):
+        st.subheader("🔥 Heatmap semanal de carga")
+
+        df_cal = datos.resultado("calendario", pd.DataFrame(columns=["Personal"]))
+        aviso_carga(datos, "calendario")
+
+        if persona_nombre:
+            df_cal = df_cal[df_cal["Personal"] == persona_nombre]
+
+        if not df_cal.empty:
+
+            # % de dedicación medio por persona en los días laborables de cada semana
+            personas = df_cal["Personal"].astype("category")
+            desde = np.datetime64(inicio - timedelta(days=inicio.weekday()), "D")
+            n_semanas = -(-(fin - inicio).days // 7) + 1
+
+            diaria = acumular(
+                len(personas.cat.categories),
+                personas.cat.codes.to_numpy(),
+                fechas(df_cal["Inicio"]),
+                fechas(df_cal["Fin"]),
+                dedicaciones(df_cal, "Dedicacion"),
+                desde,
+                n_semanas * 7
+            )
+            laborable = mascara_laboral(desde, n_semanas * 7)
+            dias_semana = np.maximum(por_semana(laborable[None, :].astype(np.int32))[0], 1)
+            semanal = por_semana(diaria * laborable[None, :]) / dias_semana[None, :]
+
+            etiquetas = pd.to_datetime(desde + np.arange(n_semanas) * np.timedelta64(7, "D")).strftime("%Y-%W")
+            heat = pd.DataFrame({
+                "Personal": np.repeat(personas.cat.categories, n_semanas),
+                "Semana": np.tile(etiquetas, len(personas.cat.categories)),
+                "Carga %": semanal.ravel().round(),
+            })
+            heat = heat[heat["Carga %"] > 0]
+
+            fig_heat = px.density_heatmap(
+                heat,
+                x="Semana",
+                y="Personal",
+                z="Carga %",
+                color_continuous_scale="YlOrRd",
+                text_auto=True
+            )
+
+            st.plotly_chart(fig_heat, use_container_width=True)
+
+        else:
+            st.info("No hay datos para el heatmap")
+
+        st.divider()
+
+    # =====================================================
+    # PRONÓSTICO DE CAPACIDAD
+    # =====================================================
+    with span("Capacidad"):
+        st.subheader("📈 Pronóstico de capacidad por área")
+
+        c1, c2 = st.columns([1, 3])
+        with c1:
+            semanas_cap = st.select_slider("Semanas", [12, 26, 52], value=26, key="semanas_capacidad")
+        with c2:
+            incluir_no_conf = st.checkbox("Incluir proyectos no confirmados", value=True)
+
+        res_cap = datos.resultado("capacidad")
+        df_cap = pd.DataFrame() if res_cap is None else a_tabla(res_cap)
+
+        if res_cap is None:
+            aviso_carga(datos, "capacidad")
+        elif df_cap.empty:
+            st.info("No hay personal activo para pronosticar")
+        else:
+            columna = "% uso" if incluir_no_conf else "% uso confirmado"
+
+            fig_cap = px.density_heatmap(
+                df_cap,
+                x="Semana",
+                y="Area",
+                z=columna,
+                histfunc="sum",
+                nbinsx=semanas_cap,
+                color_continuous_scale="RdYlGn_r",
+                range_color=[0, 120]
+            )
+            st.plotly_chart(fig_cap, use_container_width=True)
+
+            total = df_cap.groupby("Semana", as_index=False)[["Disponible", "Confirmado", "No confirmado"]].sum()
+            capas = ["Confirmado", "No confirmado"] if incluir_no_conf else ["Confirmado"]
+
+            fig_tot = px.bar(total, x="Semana", y=capas, labels={"value": "Personas-día"})
+            fig_tot.add_scatter(x=total["Semana"], y=total["Disponible"], name="Disponible", mode="lines")
+            st.plotly_chart(fig_tot, use_container_width=True)
+
+        st.divider()
+
+    # =====================================================
+    # GANTT
+    # =====================================================
+    with span("Gantt"):
+        st.subheader("📅 Gantt de Proyectos")
+
+        df_gantt = datos.resultado("gantt", pd.DataFrame())
+        aviso_carga(datos, "gantt")
+
+        if df_gantt.empty:
+            st.info("No hay proyectos para el filtro seleccionado")
+        else:
+
+            df_gantt = df_gantt.rename(columns={
+                "nombre": "Proyecto",
+                "inicio": "Inicio",
+                "fin": "Fin",
+                "confirmacion": "Confirmacion"
             })
-            semana += timedelta(days=7)
-
-    heat = (
-        pd.DataFrame(filas)
-        .groupby(["Personal", "Semana"])
-        .size()
-        .reset_index(name="Asignaciones")
-    )
-
-    fig_heat = px.density_heatmap(
-        heat,
-        x="Semana",
-        y="Personal",
-        z="Asignaciones",
-        color_continuous_scale="YlOrRd",
-        text_auto=True
-    )
-
-    st.plotly_chart(fig_heat, use_container_width=True)
-
-else:
-    st.info("No hay datos para el heatmap")
 
-st.divider()
+            fig = px.timeline(
+                df_gantt,
+                x_start="Inicio",
+                x_end="Fin",
+                y="Proyecto",
+                color="Confirmacion"
+            )
 
-# =====================================================
-# GANTT
-# =====================================================
-st.subheader("📅 Gantt de Proyectos")
-
-df_gantt = proyectos_gantt_por_persona(personal_id)
-
-if df_gantt.empty:
-    st.info("No hay proyectos para el filtro seleccionado")
-else:
-
-    df_gantt = df_gantt.rename(columns={
-        "nombre": "Proyecto",
-        "inicio": "Inicio",
-        "fin": "Fin",
-        "confirmacion": "Confirmacion"
-    })
-
-    fig = px.timeline(
-        df_gantt,
-        x_start="Inicio",
-        x_end="Fin",
-        y="Proyecto",
-        color="Confirmacion"
-    )
-
-    fig.update_yaxes(autorange="reversed")
-    st.plotly_chart(fig, use_container_width=True)
+            fig.update_yaxes(autorange="reversed")
+            st.plotly_chart(fig, use_container_width=True)
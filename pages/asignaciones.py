@@ -2,14 +2,21 @@ import streamlit as st
 from logic import (
     asegurar_sesion,
     tiene_permiso,
+    ConflictoAsignacion,
     obtener_proyectos,
     obtener_personal_disponible,
     asignar_personal,
+    asignar_plan,
     hay_solapamiento,
     sugerir_personal,
     registrar_auditoria,
-    obtener_carga_personal
+    obtener_cargas_personal,
+    planificar_asignacion_optima
 )
+from trazas import trazar_fragmento, trazar_pagina
+from ventanas import buscar_ventana
+
+PAGINA = "Asignaciones"
 
 # =====================================================
 # 🔐 SESIÓN
@@ -30,119 +37,317 @@ if not tiene_permiso(st.session_state.rol, "asignar_personal"):
 st.set_page_config(page_title="ERP ULTRA – Asignaciones", layout="wide")
 st.title("🧠 ERP ULTRA – Asignación Inteligente de Personal")
 
+# Resultado de la última asignación (st.rerun descarta lo mostrado antes)
+for nivel, texto in st.session_state.pop("asignaciones_mensajes", []):
+    getattr(st, nivel)(texto)
+
+
+def avisar(nivel, texto):
+    st.session_state.setdefault("asignaciones_mensajes", []).append((nivel, texto))
+
 # =====================================================
-# PROYECTOS
+# SECCIONES (st.fragment: cada interacción solo reejecuta su sección)
 # =====================================================
-proyectos = obtener_proyectos()
+# Dependencias explícitas: cada fragmento recibe por parámetro lo que
+# necesita del script principal (proyecto, dedicación, personal libre).
 
-if proyectos.empty:
-    st.info("No hay proyectos")
-    st.stop()
+@st.fragment
+def seccion_ventana():
+    with trazar_fragmento(PAGINA, "Ventana"):
+        with st.expander("🔍 ¿Cuándo tengo personal disponible?"):
 
-proyecto = st.selectbox(
-    "Proyecto",
-    proyectos.to_dict("records"),
-    format_func=lambda x: f"{x['nombre']} ({'Confirmado' if x['confirmado'] else 'No confirmado'})"
-)
+            c1, c2, c3, c4, c5 = st.columns(5)
+            with c1:
+                v_cantidad = st.number_input("Personas", min_value=1, value=2, key="ventana_cantidad")
+            with c2:
+                v_duracion = st.number_input("Días laborables seguidos", min_value=1, max_value=250, value=10, key="ventana_duracion")
+            with c3:
+                v_dedicacion = st.number_input("Dedicación (%)", min_value=5, max_value=100, value=100, step=5, key="ventana_dedicacion")
+            with c4:
+                v_area = st.text_input("Área", key="ventana_area")
+            with c5:
+                v_cargo = st.text_input("Cargo", key="ventana_cargo")
 
-proyecto_id = proyecto["id"]
-inicio = proyecto["inicio"]
-fin = proyecto["fin"]
+            if st.button("🔎 Buscar primera ventana"):
+                st.session_state["ventanas_resultado"] = buscar_ventana(
+                    int(v_cantidad),
+                    int(v_duracion),
+                    area=v_area.strip() or None,
+                    cargo=v_cargo.strip() or None,
+                    dedicacion=int(v_dedicacion)
+                )
 
-st.info(f"📅 {inicio} → {fin}")
+            ventanas = st.session_state.get("ventanas_resultado")
 
-# =====================================================
-# 🤖 MOTOR IA ERP ULTRA
-# =====================================================
-st.subheader("🤖 Motor Inteligente")
+            if ventanas is not None:
+                if not ventanas:
+                    st.warning("No hay ventana con ese personal en los próximos 12 meses")
+                else:
+                    for v in ventanas:
+                        st.write(
+                            f"📅 **{v['inicio']} → {v['fin']}** · "
+                            f"{v['disponibles']} personas libres"
+                        )
 
-# SOLO PERSONAL DISPONIBLE (filtrado desde la BD → modo ERP real)
-personal_libre = obtener_personal_disponible(inicio, fin)
-if personal_libre.empty:
-    st.warning("No hay personal libre en ese rango")
-    st.stop()
+                    elegida = st.selectbox(
+                        "Ver personal de la ventana",
+                        range(len(ventanas)),
+                        format_func=lambda i: f"{ventanas[i]['inicio']} → {ventanas[i]['fin']}"
+                    )
+                    st.dataframe(
+                        ventanas[elegida]["personal"][["nombre", "area", "cargo", "dias_ocupados"]],
+                        hide_index=True,
+                        use_container_width=True
+                    )
+
+
+@st.fragment
+def seccion_auto(proyecto, dedicacion, max_personas):
+    with trazar_fragmento(PAGINA, "Auto"):
+        st.divider()
+        st.subheader("⚡ Auto Optimización ULTRA")
+
+        cantidad = st.number_input(
+            "Cantidad de personal requerido",
+            min_value=1,
+            max_value=max_personas,
+            value=1
+        )
+
+        if st.button("🚀 Asignación Inteligente ULTRA"):
+            plan = planificar_asignacion_optima([{
+                "proyecto_id": proyecto["id"],
+                "cantidad": int(cantidad),
+                "inicio": proyecto["inicio"],
+                "fin": proyecto["fin"],
+                "dedicacion": dedicacion
+            }])
+
+            ids = [int(x) for x in plan["asignaciones"]["personal_id"]]
+            sin_cubrir = sum(plan["sin_cubrir"].values())
+
+            if not ids:
+                st.warning("El motor no encontró personal asignable")
+                return
+
+            # Misma vía que el plan multi-proyecto: capacidad comprobada en la transacción
+            try:
+                asignar_plan(
+                    [(proyecto["id"], pid, proyecto["inicio"], proyecto["fin"], dedicacion) for pid in ids],
+                    st.session_state.user_id,
+                    "ASIGNACION_ULTRA",
+                    f"ERP ULTRA asignó {len(ids)} personas "
+                    f"(sobrecarga {plan['sobrecarga_dias']:.0f} días vs voraz {plan['sobrecarga_voraz_dias']:.0f})"
+                )
+            except ConflictoAsignacion as e:
+                st.error(
+                    f"{len(e.args[0])} personas ya no tienen hueco (cambios desde el cálculo). "
+                    "Vuelve a intentarlo."
+                )
+                return
+
+            if sin_cubrir:
+                avisar("warning", f"Asignadas {len(ids)} de {int(cantidad)} personas: {sin_cubrir} plazas sin cubrir")
+            else:
+                avisar("success", "Asignación optimizada completada")
+            # El personal libre cambió: rerun de toda la página
+            st.rerun(scope="app")
+
+
+@st.fragment
+def seccion_multi(proyectos):
+    with trazar_fragmento(PAGINA, "Multi-proyecto"):
+        st.divider()
+        st.subheader("🗂️ Planificación óptima multi-proyecto")
+
+        with st.expander("Asignar varios proyectos a la vez"):
+
+            tabla = proyectos[["id", "nombre", "inicio", "fin"]].copy()
+            tabla["cantidad"] = 0
+            tabla["area"] = ""
+            tabla["cargo"] = ""
+            tabla["dedicacion"] = 100
+
+            editado = st.data_editor(
+                tabla,
+                hide_index=True,
+                use_container_width=True,
+                disabled=["id", "nombre", "inicio", "fin"],
+                column_config={
+                    "cantidad": st.column_config.NumberColumn("Cantidad", min_value=0, step=1),
+                    "area": st.column_config.TextColumn("Área requerida"),
+                    "cargo": st.column_config.TextColumn("Cargo requerido"),
+                    "dedicacion": st.column_config.NumberColumn("Dedicación (%)", min_value=5, max_value=100, step=5)
+                },
+                key="plan_multi"
+            )
+
+            pedidos = editado[editado["cantidad"] > 0]
 
-# Obtener carga actual (%)
-personal_libre["carga"] = personal_libre["id"].apply(obtener_carga_personal)
+            if st.button("🧮 Calcular plan óptimo", disabled=pedidos.empty):
+                requerimientos = [
+                    {
+                        "proyecto_id": int(r.id),
+                        "cantidad": int(r.cantidad),
+                        "inicio": r.inicio,
+                        "fin": r.fin,
+                        "area": (r.area or "").strip() or None,
+                        "cargo": (r.cargo or "").strip() or None,
+                        "dedicacion": int(r.dedicacion)
+                    }
+                    for r in pedidos.itertuples()
+                ]
+                st.session_state["plan_multi_resultado"] = planificar_asignacion_optima(requerimientos)
+                # Se confirma con lo que se calculó, no con lo que haya ahora en el editor
+                st.session_state["plan_multi_pedidos"] = {r["proyecto_id"]: r for r in requerimientos}
 
-# Orden inteligente → menor carga primero
-personal_optimo = personal_libre.sort_values(by="carga")
+            plan = st.session_state.get("plan_multi_resultado")
 
-st.write("### Personal óptimo disponible")
+            if plan is not None:
+                c1, c2, c3 = st.columns(3)
+                c1.metric("Sobrecarga (días)", f"{plan['sobrecarga_dias']:.0f}",
+                          delta=f"{plan['sobrecarga_dias'] - plan['sobrecarga_voraz_dias']:.0f} vs voraz",
+                          delta_color="inverse")
+                c2.metric("Plazas sin cubrir", sum(plan["sin_cubrir"].values()))
+                c3.metric("Tiempo de cálculo", f"{plan['segundos'] * 1000:.0f} ms")
+
+                if not plan["optimo"]:
+                    st.caption("⏱️ Se agotó el tiempo: parte del plan se completó de forma voraz")
+
+                nombres = dict(zip(proyectos["id"], proyectos["nombre"]))
+                vista = plan["asignaciones"].assign(proyecto=lambda d: d["proyecto_id"].map(nombres))
+                st.dataframe(
+                    vista[["proyecto", "nombre", "area", "cargo", "sobrecarga_dias", "costo"]],
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+                if st.button("✅ Confirmar plan", disabled=vista.empty):
+                    pedidos_plan = st.session_state["plan_multi_pedidos"]
+
+                    # Todo el plan en una transacción: o entra completo o no entra
+                    try:
+                        asignar_plan(
+                            [
+                                (
+                                    int(r.proyecto_id), int(r.personal_id),
+                                    pedidos_plan[int(r.proyecto_id)]["inicio"],
+                                    pedidos_plan[int(r.proyecto_id)]["fin"],
+                                    pedidos_plan[int(r.proyecto_id)]["dedicacion"]
+                                )
+                                for r in vista.itertuples()
+                            ],
+                            st.session_state.user_id,
+                            "ASIGNACION_ULTRA_MULTI",
+                            f"Plan óptimo: {len(vista)} asignaciones en {vista['proyecto_id'].nunique()} proyectos"
+                        )
+                    except ConflictoAsignacion as e:
+                        st.error(
+                            f"{len(e.args[0])} personas ya no tienen hueco (cambios desde el cálculo). "
+                            "Vuelve a calcular el plan."
+                        )
+                        st.stop()
+
+                    del st.session_state["plan_multi_resultado"]
+                    del st.session_state["plan_multi_pedidos"]
+                    avisar("success", "Plan multi-proyecto asignado")
+                    st.rerun(scope="app")
+
+
+@st.fragment
+def seccion_manual(proyecto, dedicacion, personal_optimo):
+    with trazar_fragmento(PAGINA, "Manual"):
+        st.divider()
+        st.subheader("👤 Selección Manual Inteligente")
+
+        mapa = dict(zip(personal_optimo["nombre"], personal_optimo["id"]))
+
+        seleccion_manual = st.multiselect(
+            "Selecciona personal (ordenado por menor carga)",
+            list(mapa.keys())
+        )
+
+        if seleccion_manual:
+            ids = [int(mapa[n]) for n in seleccion_manual]
+
+            if st.button("✅ Asignar Manual Inteligente"):
+                asignar_personal(
+                    proyecto["id"],
+                    ids,
+                    proyecto["inicio"],
+                    proyecto["fin"],
+                    st.session_state.user_id,
+                    dedicacion
+                )
+
+                registrar_auditoria(
+                    st.session_state.user_id,
+                    "ASIGNACION_MANUAL_ULTRA",
+                    "ASIGNACION",
+                    proyecto["id"],
+                    f"Asignación manual ULTRA de {len(ids)} personas"
+                )
+
+                st.success("Asignación manual realizada")
+                st.rerun(scope="app")
 
-for _, r in personal_optimo.iterrows():
-    color = "🟢" if r["carga"] < 70 else "🟡" if r["carga"] < 90 else "🔴"
-    st.write(f"{color} {r['nombre']} → Carga {r['carga']}%")
 
 # =====================================================
-# ⚡ AUTO-OPTIMIZACIÓN TOTAL
+# PÁGINA (solo se reejecuta al cambiar proyecto o dedicación)
 # =====================================================
-st.divider()
-st.subheader("⚡ Auto Optimización ULTRA")
-
-cantidad = st.number_input(
-    "Cantidad de personal requerido",
-    min_value=1,
-    max_value=len(personal_optimo),
-    value=1
-)
+with trazar_pagina(PAGINA, usuario=st.session_state.usuario):
 
-if st.button("🚀 Asignación Inteligente ULTRA"):
-    seleccion = personal_optimo.head(cantidad)
+    seccion_ventana()
 
-    ids = seleccion["id"].tolist()
+    # =====================================================
+    # PROYECTOS
+    # =====================================================
+    proyectos = obtener_proyectos()
 
-    asignar_personal(
-        proyecto_id,
-        ids,
-        inicio,
-        fin,
-        st.session_state.user_id
-    )
+    if proyectos.empty:
+        st.info("No hay proyectos")
+        st.stop()
 
-    registrar_auditoria(
-        st.session_state.user_id,
-        "ASIGNACION_ULTRA",
-        "ASIGNACION",
-        proyecto_id,
-        f"ERP ULTRA asignó {len(ids)} personas automáticamente"
+    proyecto = st.selectbox(
+        "Proyecto",
+        proyectos.to_dict("records"),
+        format_func=lambda x: f"{x['nombre']} ({'Confirmado' if x['confirmado'] else 'No confirmado'})"
     )
 
-    st.success("Asignación optimizada completada")
-    st.rerun()
+    st.info(f"📅 {proyecto['inicio']} → {proyecto['fin']}")
 
-# =====================================================
-# 👤 MODO MANUAL INTELIGENTE
-# =====================================================
-st.divider()
-st.subheader("👤 Selección Manual Inteligente")
+    dedicacion = st.slider(
+        "Dedicación por persona (%)",
+        min_value=5,
+        max_value=100,
+        value=100,
+        step=5,
+        help="Porcentaje de jornada. Dos asignaciones al 50 % no se consideran solapadas."
+    )
 
-mapa = dict(zip(personal_optimo["nombre"], personal_optimo["id"]))
+    # =====================================================
+    # 🤖 MOTOR IA ERP ULTRA
+    # =====================================================
+    st.subheader("🤖 Motor Inteligente")
 
-seleccion_manual = st.multiselect(
-    "Selecciona personal (ordenado por menor carga)",
-    list(mapa.keys())
-)
+    # SOLO PERSONAL DISPONIBLE (filtrado desde la BD → modo ERP real)
+    personal_libre = obtener_personal_disponible(proyecto["inicio"], proyecto["fin"], dedicacion)
+    if personal_libre.empty:
+        st.warning("No hay personal con hueco en ese rango")
+        st.stop()
 
-if seleccion_manual:
-    ids = [mapa[n] for n in seleccion_manual]
+    # Carga actual (%) de todos en una sola consulta
+    personal_libre["carga"] = obtener_cargas_personal(personal_libre["id"]).to_numpy()
 
-    if st.button("✅ Asignar Manual Inteligente"):
-        asignar_personal(
-            proyecto_id,
-            ids,
-            inicio,
-            fin,
-            st.session_state.user_id
-        )
+    # Orden inteligente → menor carga primero
+    personal_optimo = personal_libre.sort_values(by="carga")
 
-        registrar_auditoria(
-            st.session_state.user_id,
-            "ASIGNACION_MANUAL_ULTRA",
-            "ASIGNACION",
-            proyecto_id,
-            f"Asignación manual ULTRA de {len(ids)} personas"
-        )
+    st.write("### Personal óptimo disponible")
+
+    for _, r in personal_optimo.iterrows():
+        color = "🟢" if r["carga"] < 70 else "🟡" if r["carga"] < 90 else "🔴"
+        st.write(f"{color} {r['nombre']} → Carga {r['carga']}%")
 
-        st.success("Asignación manual realizada")
-        st.rerun()
+    seccion_auto(proyecto, dedicacion, len(personal_optimo))
+    seccion_multi(proyectos)
+    seccion_manual(proyecto, dedicacion, personal_optimo)
@@ -0,0 +1,120 @@
+import streamlit as st
+from datetime import date, timedelta
+
+from logic import asegurar_sesion, tiene_permiso, registrar_auditoria, obtener_personal_dashboard
+from calendario_laboral import (
+    obtener_feriados,
+    agregar_feriado,
+    eliminar_feriado,
+    obtener_ausencias,
+    registrar_ausencia,
+    eliminar_ausencia,
+    dias_laborables
+)
+
+# =====================================================
+# 🔐 SESIÓN
+# =====================================================
+asegurar_sesion()
+
+if not st.session_state.autenticado:
+    st.switch_page("app.py")
+    st.stop()
+
+if not tiene_permiso(st.session_state.rol, "editar_personal"):
+    st.error("⛔ No tienes permiso")
+    st.stop()
+
+# =====================================================
+# CONFIG
+# =====================================================
+st.set_page_config(page_title="Calendario Laboral", layout="wide")
+st.title("🗓️ Calendario Laboral")
+
+tab_feriados, tab_ausencias = st.tabs(["🎌 Feriados", "🏖️ Ausencias"])
+
+# =====================================================
+# FERIADOS
+# =====================================================
+with tab_feriados:
+    with st.form("nuevo_feriado", clear_on_submit=True):
+        c1, c2 = st.columns([1, 2])
+        fecha = c1.date_input("Fecha")
+        nombre = c2.text_input("Nombre")
+
+        if st.form_submit_button("➕ Agregar feriado"):
+            agregar_feriado(fecha, nombre.strip() or None)
+            registrar_auditoria(st.session_state.user_id, "AGREGAR_FERIADO", "CALENDARIO", None, f"{fecha} {nombre}")
+            st.success("Feriado guardado")
+            st.rerun()
+
+    feriados = obtener_feriados()
+
+    if feriados.empty:
+        st.info("No hay feriados registrados: solo se descuentan fines de semana")
+    else:
+        st.dataframe(feriados[["fecha", "nombre"]], hide_index=True, use_container_width=True)
+
+        fid = st.selectbox(
+            "Eliminar feriado",
+            feriados["id"].tolist(),
+            format_func=lambda i: f"{feriados.loc[feriados['id'] == i, 'fecha'].iloc[0]} "
+                                  f"{feriados.loc[feriados['id'] == i, 'nombre'].iloc[0] or ''}"
+        )
+        if st.button("🗑️ Eliminar feriado"):
+            eliminar_feriado(fid)
+            registrar_auditoria(st.session_state.user_id, "ELIMINAR_FERIADO", "CALENDARIO", fid, "")
+            st.rerun()
+
+# =====================================================
+# AUSENCIAS
+# =====================================================
+with tab_ausencias:
+    personal = obtener_personal_dashboard()
+
+    with st.form("nueva_ausencia", clear_on_submit=True):
+        c1, c2, c3, c4 = st.columns([2, 1, 1, 1])
+        pid = c1.selectbox(
+            "Persona",
+            personal["id"].tolist(),
+            format_func=lambda i: personal.loc[personal["id"] == i, "nombre"].iloc[0]
+        )
+        inicio = c2.date_input("Desde", value=date.today())
+        fin = c3.date_input("Hasta", value=date.today() + timedelta(days=4))
+        tipo = c4.selectbox("Tipo", ["Vacaciones", "Licencia médica", "Capacitación", "Permiso"])
+
+        if st.form_submit_button("➕ Registrar ausencia"):
+            if fin < inicio:
+                st.error("La fecha final es anterior a la inicial")
+            else:
+                registrar_ausencia(pid, inicio, fin, tipo)
+                registrar_auditoria(
+                    st.session_state.user_id, "REGISTRAR_AUSENCIA", "CALENDARIO", pid,
+                    f"{tipo} {inicio} → {fin} ({dias_laborables(inicio, fin)} días laborables)"
+                )
+                st.success("Ausencia registrada")
+                st.rerun()
+
+    ausencias = obtener_ausencias(desde=date.today() - timedelta(days=30))
+
+    if ausencias.empty:
+        st.info("No hay ausencias vigentes o futuras")
+    else:
+        ausencias["dias_laborables"] = dias_laborables(ausencias["inicio"], ausencias["fin"])
+        st.dataframe(
+            ausencias[["nombre", "tipo", "inicio", "fin", "dias_laborables"]],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        aid = st.selectbox(
+            "Eliminar ausencia",
+            ausencias["id"].tolist(),
+            format_func=lambda i: " · ".join(
+                str(v) for v in ausencias.loc[ausencias["id"] == i, ["nombre", "tipo", "inicio"]].iloc[0]
+            )
+        )
+        if st.button("🗑️ Eliminar ausencia"):
+            eliminar_ausencia(aid)
+            registrar_auditoria(st.session_state.user_id, "ELIMINAR_AUSENCIA", "CALENDARIO", aid, "")
+            st.rerun()
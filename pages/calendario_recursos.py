@@ -85,8 +85,7 @@ if c_area:
 else:
     df["Area"] = "General"
 
-df["Inicio"] = pd.to_datetime(df["Inicio"], errors="coerce")
-df["Fin"] = pd.to_datetime(df["Fin"], errors="coerce")
+# Inicio / Fin ya llegan como datetime64 (lectura.leer_frame)
 df = df.dropna()
 
 # =====================================================
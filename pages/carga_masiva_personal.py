@@ -1,9 +1,17 @@
 import streamlit as st
 import pandas as pd
 import io
-import time
-from database import get_connection
 from logic import tiene_permiso, registrar_auditoria, asegurar_sesion
+from importaciones import (
+    ImportacionDuplicada,
+    analizar_erp,
+    analizar_personal,
+    importar_erp,
+    importar_personal,
+    obtener_importacion,
+    reporte_conflictos,
+    validar_asignaciones
+)
 
 # =====================================================
 # 🔐 SESIÓN
@@ -24,25 +32,6 @@ if not tiene_permiso(st.session_state.rol, "editar_personal"):
 st.set_page_config(page_title="Carga Masiva Corporativa", layout="wide")
 st.title("🏢 Carga Masiva Corporativa de Personal")
 
-# =====================================================
-# NORMALIZADOR COLUMNAS
-# =====================================================
-MAPEO_COLUMNAS = {
-    "nombre": ["nombre", "name", "empleado"],
-    "cargo": ["cargo", "puesto", "rol", "position"],
-    "area": ["area", "área", "department", "dept"]
-}
-
-def normalizar_columnas(df):
-    columnas_nuevas = {}
-    for col in df.columns:
-        c = col.strip().lower()
-        for destino, aliases in MAPEO_COLUMNAS.items():
-            if c in aliases:
-                columnas_nuevas[col] = destino
-    df = df.rename(columns=columnas_nuevas)
-    return df
-
 # =====================================================
 # 📄 PLANTILLA
 # =====================================================
@@ -62,6 +51,24 @@ st.download_button("⬇️ Descargar plantilla", buf, "plantilla_personal.xlsx")
 
 st.divider()
 
+# =====================================================
+# ⚠️ ARCHIVO YA IMPORTADO
+# =====================================================
+def aviso_importado(analisis):
+    """
+    Avisa si el archivo ya se importó; devuelve True si se permite repetir.
+    """
+    previa = obtener_importacion(analisis["huella"], analisis["tipo"])
+    if previa is None:
+        return False
+
+    st.warning(
+        f"⚠️ Este archivo ya se importó el {previa['fecha']:%Y-%m-%d %H:%M} "
+        f"({previa['resumen']})"
+    )
+    return st.checkbox("Importar de nuevo de todos modos", key=f"forzar_{analisis['huella']}")
+
+
 # =====================================================
 # 📥 CARGA MASIVA PERSONAL
 # =====================================================
@@ -70,71 +77,48 @@ archivo = st.file_uploader("Sube Excel Personal", type=["xlsx"])
 
 if archivo:
 
-    df = pd.read_excel(archivo)
-    df = normalizar_columnas(df)
+    # Se lee y normaliza una sola vez por contenido (caché por SHA-256)
+    analisis = analizar_personal(archivo.getvalue())
 
-    if set(df.columns) != {"nombre", "cargo", "area"}:
-        st.error("Columnas no válidas")
+    if not analisis["valido"]:
+        st.error(analisis["error"])
         st.stop()
 
-    df["nombre"] = df["nombre"].astype(str).str.strip()
-    df["cargo"] = df["cargo"].astype(str).str.strip()
-    df["area"] = df["area"].astype(str).str.strip()
-    df = df.dropna()
-    df = df[df["nombre"] != ""]
-    df = df.drop_duplicates("nombre")
+    df = analisis["personal"]
 
     st.subheader("Vista previa")
+    st.caption(f"Huella {analisis['huella'][:12]} · {len(df)} filas")
     st.dataframe(df, use_container_width=True)
 
-    if st.button("🚀 Ejecutar carga personal"):
-
-        conn = get_connection()
-        cur = conn.cursor()
+    forzar = aviso_importado(analisis)
 
-        cur.execute("SELECT nombre FROM personal")
-        existentes = {r[0] for r in cur.fetchall()}
-
-        insertar, actualizar, errores = [], [], []
+    if st.button("🚀 Ejecutar carga personal"):
 
-        for fila in df.itertuples():
-            nombre, cargo, area = fila.nombre, fila.cargo, fila.area
+        try:
+            insertados, actualizados = importar_personal(
+                analisis,
+                st.session_state.user_id,
+                archivo.name,
+                simulacion=modo_simulacion,
+                forzar=forzar
+            )
 
-            if nombre in existentes:
-                actualizar.append((cargo, area, nombre))
-            else:
-                insertar.append((nombre, cargo, area))
+        except ImportacionDuplicada:
+            st.error("⛔ Archivo ya importado: marca 'Importar de nuevo' para repetir")
+            st.stop()
 
         if not modo_simulacion:
-
-            if insertar:
-                cur.executemany(
-                    "INSERT INTO personal (nombre, cargo, area) VALUES (%s,%s,%s)",
-                    insertar
-                )
-
-            if actualizar:
-                cur.executemany(
-                    "UPDATE personal SET cargo=%s, area=%s WHERE nombre=%s",
-                    actualizar
-                )
-
-            conn.commit()
-
             registrar_auditoria(
                 st.session_state.user_id,
                 "CARGA_MASIVA_CORPORATIVA",
                 "PERSONAL",
                 None,
-                f"Insert={len(insertar)} Update={len(actualizar)}"
+                f"Insert={insertados} Update={actualizados}"
             )
 
-        cur.close()
-        conn.close()
-
         st.success("Carga finalizada")
-        st.metric("Insertados", len(insertar))
-        st.metric("Actualizados", len(actualizar))
+        st.metric("Insertados", insertados)
+        st.metric("Actualizados", actualizados)
 
 
 # =====================================================
@@ -153,135 +137,94 @@ archivo_multi = st.file_uploader(
 
 if archivo_multi:
 
-    errores = []
-    insertados = 0
-    actualizados = 0
-
-    try:
-        xls = pd.ExcelFile(archivo_multi)
-
-        conn = get_connection()
-        conn.autocommit = False   # 🔴 TRANSACCIÓN
-        cur = conn.cursor()
-
-        # ================= PERSONAL =================
-        if "Personal" in xls.sheet_names:
-            df = pd.read_excel(xls, "Personal")
-
-            for i, r in df.iterrows():
-                try:
-                    nombre = str(r.get("nombre", "")).strip()
-                    cargo = str(r.get("cargo", "")).strip()
-                    area = str(r.get("area", "")).strip()
-
-                    if not nombre:
-                        errores.append((i, "Nombre vacío"))
-                        continue
-
-                    cur.execute("SELECT id FROM personal WHERE nombre=%s", (nombre,))
-                    ex = cur.fetchone()
-
-                    if ex:
-                        if not modo_simulacion_erp:
-                            cur.execute(
-                                "UPDATE personal SET cargo=%s, area=%s WHERE nombre=%s",
-                                (cargo, area, nombre)
-                            )
-                        actualizados += 1
-                    else:
-                        if not modo_simulacion_erp:
-                            cur.execute(
-                                "INSERT INTO personal (nombre, cargo, area) VALUES (%s,%s,%s)",
-                                (nombre, cargo, area)
-                            )
-                        insertados += 1
-
-                except Exception as e:
-                    errores.append((i, str(e)))
-
-        # ================= PROYECTOS =================
-        if "Proyectos" in xls.sheet_names:
-            df = pd.read_excel(xls, "Proyectos")
-
-            for i, r in df.iterrows():
-                try:
-                    nombre = str(r.get("nombre", "")).strip()
-                    inicio = r.get("inicio")
-                    fin = r.get("fin")
-                    confirmado = bool(r.get("confirmado", False))
-
-                    if not nombre:
-                        errores.append((i, "Proyecto sin nombre"))
-                        continue
-
-                    if not modo_simulacion_erp:
-                        cur.execute("""
-                            INSERT INTO proyectos (nombre, inicio, fin, confirmado, estado, eliminado)
-                            VALUES (%s,%s,%s,%s,'Activo',FALSE)
-                            ON CONFLICT DO NOTHING
-                        """, (nombre, inicio, fin, confirmado))
-
-                    insertados += 1
-
-                except Exception as e:
-                    errores.append((i, str(e)))
-
-        # ================= ASIGNACIONES =================
-        if "Asignaciones" in xls.sheet_names:
-            df = pd.read_excel(xls, "Asignaciones")
-
-            for i, r in df.iterrows():
-                try:
-                    personal = str(r.get("personal", "")).strip()
-                    proyecto = str(r.get("proyecto", "")).strip()
-                    inicio = r.get("inicio")
-                    fin = r.get("fin")
-
-                    if not personal or not proyecto:
-                        errores.append((i, "Asignación incompleta"))
-                        continue
-
-                    cur.execute("SELECT id FROM personal WHERE nombre=%s", (personal,))
-                    p = cur.fetchone()
-
-                    cur.execute("SELECT id FROM proyectos WHERE nombre=%s", (proyecto,))
-                    pr = cur.fetchone()
-
-                    if not p or not pr:
-                        errores.append((i, "No existe personal/proyecto"))
-                        continue
-
-                    if not modo_simulacion_erp:
-                        cur.execute("""
-                            INSERT INTO asignaciones (personal_id, proyecto_id, inicio, fin, activa)
-                            VALUES (%s,%s,%s,%s,TRUE)
-                        """, (p[0], pr[0], inicio, fin))
-
-                    insertados += 1
-
-                except Exception as e:
-                    errores.append((i, str(e)))
-
-        # 🔴 COMMIT / ROLLBACK
-        if modo_simulacion_erp:
-            conn.rollback()
+    analisis_erp = analizar_erp(archivo_multi.getvalue())
+
+    if not analisis_erp["valido"]:
+        st.error(analisis_erp["error"])
+        st.stop()
+
+    hojas = analisis_erp["hojas"]
+    st.caption(
+        f"Huella {analisis_erp['huella'][:12]} · "
+        + " · ".join(f"{h}: {len(d)} filas" for h, d in hojas.items())
+        + f" · {len(analisis_erp['errores'])} filas con errores"
+    )
+
+    # ================= VALIDACIÓN PREVIA =================
+    if "Asignaciones" in hojas:
+        validacion = st.session_state.get("validacion_erp")
+        revalidar = st.button("🔄 Revalidar contra la base")
+
+        # Una validación por archivo (consulta la base: 3 lecturas en bloque)
+        if revalidar or validacion is None or validacion[0] != analisis_erp["huella"]:
+            validacion = (analisis_erp["huella"], validar_asignaciones(hojas)[1])
+            st.session_state["validacion_erp"] = validacion
+
+        conflictos = validacion[1]
+
+        if conflictos.empty:
+            st.success(f"✅ {len(hojas['Asignaciones'])} asignaciones sin conflictos")
         else:
-            conn.commit()
+            st.warning(
+                f"⚠️ {len(conflictos)} de {len(hojas['Asignaciones'])} asignaciones con conflictos "
+                "(no se importarán)"
+            )
+            st.dataframe(
+                conflictos["motivo"].value_counts().rename_axis("Motivo").reset_index(name="Filas"),
+                hide_index=True
+            )
+            st.download_button(
+                "⬇️ Descargar informe de conflictos",
+                reporte_conflictos(conflictos),
+                "conflictos_asignaciones.xlsx"
+            )
 
-        cur.close()
-        conn.close()
+    forzar_erp = aviso_importado(analisis_erp)
+
+    # La importación solo se ejecuta al pulsar el botón
+    if st.button("🚀 Ejecutar importación ERP"):
+        try:
+            st.session_state["resultado_erp"] = (
+                analisis_erp["huella"],
+                importar_erp(
+                    analisis_erp,
+                    st.session_state.user_id,
+                    archivo_multi.name,
+                    simulacion=modo_simulacion_erp,
+                    forzar=forzar_erp
+                )
+            )
+
+            if not modo_simulacion_erp:
+                res = st.session_state["resultado_erp"][1]
+                registrar_auditoria(
+                    st.session_state.user_id,
+                    "ERP_PRO_IMPORT",
+                    "SISTEMA",
+                    None,
+                    f"Insert={res['insertados']} Update={res['actualizados']} Error={len(res['errores'])}"
+                )
+
+        except ImportacionDuplicada:
+            st.error("⛔ Archivo ya importado: marca 'Importar de nuevo' para repetir")
 
-        # ================= RESULTADO =================
+        except Exception as e:
+            st.error(f"Fallo ERP PRO — rollback automático: {e}")
+
+    huella_res, res = st.session_state.get("resultado_erp", (None, None))
+
+    # ================= RESULTADO =================
+    if huella_res == analisis_erp["huella"]:
         st.success("ERP PRO ejecutado")
 
         c1, c2, c3 = st.columns(3)
-        c1.metric("Insertados", insertados)
-        c2.metric("Actualizados", actualizados)
-        c3.metric("Errores", len(errores))
+        c1.metric("Insertados", res["insertados"])
+        c2.metric("Actualizados", res["actualizados"])
+        c3.metric("Errores", len(res["errores"]))
 
         # Exportar errores
-        if errores:
-            df_err = pd.DataFrame(errores, columns=["Fila", "Error"])
+        if res["errores"]:
+            df_err = pd.DataFrame(res["errores"], columns=["Hoja", "Fila", "Error"])
             buf = io.BytesIO()
             df_err.to_excel(buf, index=False, engine="openpyxl")
             buf.seek(0)
@@ -291,15 +234,3 @@ if archivo_multi:
                 buf,
                 "errores_erp.xlsx"
             )
-
-        registrar_auditoria(
-            st.session_state.user_id,
-            "ERP_PRO_IMPORT",
-            "SISTEMA",
-            None,
-            f"Insert={insertados} Update={actualizados} Error={len(errores)}"
-        )
-
-    except Exception as e:
-        st.error(f"Fallo ERP PRO — rollback automático: {e}")
-
@@ -0,0 +1,110 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from logic import asegurar_sesion, tiene_permiso
+from trazas import paginas_trazadas, obtener_trazas, limpiar_trazas
+
+# =====================================================
+# 🔐 SESIÓN
+# =====================================================
+asegurar_sesion()
+
+if not st.session_state.autenticado:
+    st.switch_page("app.py")
+    st.stop()
+
+st.set_page_config(page_title="Trazas de Render", layout="wide")
+
+if not tiene_permiso(st.session_state.rol, "ver_rendimiento"):
+    st.error("⛔ Solo administradores")
+    st.stop()
+
+st.title("🧭 Trazas de Render por Página")
+
+paginas = paginas_trazadas()
+
+if not paginas:
+    st.info("Aún no hay trazas: navega por las páginas instrumentadas (p. ej. Dashboard)")
+    st.stop()
+
+c1, c2, c3 = st.columns([2, 3, 1])
+
+with c1:
+    pagina = st.selectbox("Página", paginas)
+
+trazas = obtener_trazas(pagina)
+
+with c2:
+    idx = st.selectbox(
+        "Rerun",
+        range(len(trazas)),
+        format_func=lambda i: (
+            f"{trazas[i]['fecha']} · {trazas[i]['duracion_ms']:.0f} ms · "
+            f"{trazas[i]['consultas']} consultas · {trazas[i]['usuario'] or '-'}"
+        )
+    )
+
+with c3:
+    st.write("")
+    if st.button("🗑️ Limpiar"):
+        limpiar_trazas()
+        st.rerun()
+
+traza = trazas[idx]
+
+# =====================================================
+# RESUMEN DE RERUNS
+# =====================================================
+hist = pd.DataFrame([
+    {"fecha": t["fecha"], "duracion_ms": t["duracion_ms"], "consultas": t["consultas"]}
+    for t in reversed(trazas)
+])
+
+k1, k2, k3 = st.columns(3)
+k1.metric("Rerun seleccionado (ms)", round(traza["duracion_ms"], 1))
+k2.metric("Mediana últimos reruns (ms)", round(hist["duracion_ms"].median(), 1))
+k3.metric("Consultas SQL", traza["consultas"])
+
+# =====================================================
+# WATERFALL
+# =====================================================
+st.subheader("📉 Waterfall")
+
+df = pd.DataFrame(traza["spans"])
+df["etiqueta"] = [
+    f"{'· ' * p}{n}" for p, n in zip(df["profundidad"], df["nombre"])
+]
+# Etiquetas únicas para que Plotly no agrupe spans homónimos
+df["etiqueta"] = df["etiqueta"] + [f" #{i}" for i in range(len(df))]
+
+ocultar_sql = st.checkbox("Ocultar spans SQL", value=False)
+if ocultar_sql:
+    df = df[df["tipo"] != "sql"]
+
+fig = px.bar(
+    df,
+    x="duracion_ms",
+    base="inicio_ms",
+    y="etiqueta",
+    color="tipo",
+    orientation="h",
+    hover_data=["nombre", "inicio_ms", "duracion_ms", "padre"]
+)
+fig.update_yaxes(autorange="reversed", title="")
+fig.update_xaxes(title="ms desde el inicio del rerun")
+fig.update_layout(height=max(300, 22 * len(df)))
+st.plotly_chart(fig, use_container_width=True)
+
+# =====================================================
+# AGREGADO POR SPAN
+# =====================================================
+st.subheader("📋 Tiempo por span")
+
+agregado = (
+    pd.DataFrame(traza["spans"])
+    .groupby(["tipo", "nombre"], as_index=False)
+    .agg(llamadas=("duracion_ms", "size"), total_ms=("duracion_ms", "sum"))
+    .sort_values("total_ms", ascending=False)
+)
+st.dataframe(agregado, use_container_width=True, hide_index=True)
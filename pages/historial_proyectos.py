@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
-import io
 from datetime import date, timedelta
-from database import get_connection
 from logic import tiene_permiso, asegurar_sesion
+from lectura import leer_por_bloques
+from exportar import excel_por_bloques
+
+# Filas que se muestran en la tabla (los KPIs y la exportación cubren todo)
+MAX_VISTA = 5000
 
 # =====================================================
 # 🔐 PROTEGER LOGIN (usar user_id correcto)
@@ -29,8 +32,6 @@ if not tiene_permiso(st.session_state.rol, "ver_auditoria"):
 st.set_page_config(page_title="Historial de Proyectos", layout="wide")
 st.title("📜 Historial de Cambios de Proyectos")
 
-conn = get_connection()
-
 # =====================================================
 # FILTROS
 # =====================================================
@@ -82,25 +83,42 @@ if accion_filtro != "Todas":
 
 query += " ORDER BY ph.fecha DESC"
 
-df = pd.read_sql(query, conn, params=params)
-conn.close()
+# =====================================================
+# LECTURA POR BLOQUES (cursor del servidor)
+# =====================================================
+# KPIs acumulados bloque a bloque; solo las primeras MAX_VISTA filas
+# quedan en memoria para la tabla
+total = 0
+usuarios, proyectos = set(), set()
+vista = []
+
+for bloque in leer_por_bloques(query, params):
+    total += len(bloque)
+    usuarios.update(bloque["usuario"].dropna())
+    proyectos.update(bloque["proyecto"].dropna())
+
+    faltan = MAX_VISTA - sum(len(v) for v in vista)
+    if faltan > 0:
+        vista.append(bloque.head(faltan))
 
 # =====================================================
 # RESULTADO
 # =====================================================
-if df.empty:
+if total == 0:
     st.info("No hay historial con esos filtros")
     st.stop()
 
+df = pd.concat(vista, ignore_index=True)
+
 # =====================================================
 # KPIs
 # =====================================================
 st.subheader("📊 Actividad")
 
 col1, col2, col3 = st.columns(3)
-col1.metric("Total cambios", len(df))
-col2.metric("Usuarios únicos", df["usuario"].nunique())
-col3.metric("Proyectos afectados", df["proyecto"].nunique())
+col1.metric("Total cambios", total)
+col2.metric("Usuarios únicos", len(usuarios))
+col3.metric("Proyectos afectados", len(proyectos))
 
 st.divider()
 
@@ -109,6 +127,9 @@ st.divider()
 # =====================================================
 st.subheader("📋 Detalle")
 
+if total > len(df):
+    st.caption(f"Mostrando los {len(df)} cambios más recientes de {total}")
+
 st.dataframe(
     df,
     use_container_width=True,
@@ -121,14 +142,22 @@ st.dataframe(
 st.divider()
 st.subheader("📥 Exportar")
 
-buffer = io.BytesIO()
-df.to_excel(buffer, index=False, engine="openpyxl")
-buffer.seek(0)
+filtros = (query, tuple(params))
 
-st.download_button(
-    "⬇️ Descargar historial en Excel",
-    data=buffer,
-    file_name="historial_proyectos.xlsx",
-    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-)
+# El Excel se genera bajo demanda releyendo por bloques (todas las filas)
+if st.button("📦 Preparar Excel"):
+    st.session_state["historial_excel"] = (
+        filtros,
+        excel_por_bloques(leer_por_bloques(query, params), "Historial")
+    )
+
+preparado = st.session_state.get("historial_excel")
+
+if preparado and preparado[0] == filtros:
+    st.download_button(
+        "⬇️ Descargar historial en Excel",
+        data=preparado[1],
+        file_name="historial_proyectos.xlsx",
+        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
 
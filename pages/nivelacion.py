@@ -0,0 +1,94 @@
+import streamlit as st
+import plotly.express as px
+
+from logic import asegurar_sesion, tiene_permiso
+from nivelacion import proponer_nivelacion, aplicar_nivelacion
+
+# =====================================================
+# 🔐 SESIÓN
+# =====================================================
+asegurar_sesion()
+
+if not st.session_state.autenticado:
+    st.switch_page("app.py")
+    st.stop()
+
+if not tiene_permiso(st.session_state.rol, "asignar_personal"):
+    st.error("⛔ No tienes permiso")
+    st.stop()
+
+# =====================================================
+# CONFIG
+# =====================================================
+st.set_page_config(page_title="Nivelación de Recursos", layout="wide")
+st.title("⚖️ Nivelación de Proyectos No Confirmados")
+
+st.caption(
+    "Propone mover proyectos no confirmados (con su personal) dentro de la "
+    "holgura para bajar el pico semanal de carga por área. Nada cambia hasta aplicar."
+)
+
+c1, c2, c3 = st.columns(3)
+
+with c1:
+    semanas = st.number_input("Horizonte (semanas)", min_value=4, max_value=52, value=26)
+with c2:
+    holgura = st.number_input("Holgura (± días)", min_value=7, max_value=120, value=28, step=7)
+with c3:
+    paso = st.number_input("Paso (días)", min_value=1, max_value=14, value=7)
+
+if st.button("🧮 Calcular propuesta"):
+    st.session_state["nivelacion"] = proponer_nivelacion(int(semanas), int(holgura), int(paso))
+
+res = st.session_state.get("nivelacion")
+
+if res is None:
+    st.stop()
+
+# =====================================================
+# ANTES / DESPUÉS
+# =====================================================
+st.subheader("📊 Pico de uso semanal por área")
+
+st.dataframe(res["picos"], hide_index=True, use_container_width=True)
+
+area = st.selectbox("Área", res["picos"]["Area"].tolist())
+
+fig = px.line(
+    res["semanal"][res["semanal"]["Area"] == area],
+    x="Semana",
+    y="Uso %",
+    color="Escenario"
+)
+fig.add_hline(y=100, line_dash="dot")
+st.plotly_chart(fig, use_container_width=True)
+
+# =====================================================
+# PROPUESTAS
+# =====================================================
+st.subheader("📋 Desplazamientos propuestos")
+
+propuestas = res["propuestas"]
+
+if propuestas.empty:
+    st.success("La carga ya está nivelada: no hay desplazamientos que mejoren el pico")
+    st.stop()
+
+tabla = propuestas[["id", "nombre", "inicio", "fin", "nuevo_inicio", "nuevo_fin", "desplazamiento_dias"]].copy()
+tabla.insert(0, "aplicar", True)
+
+editado = st.data_editor(
+    tabla,
+    hide_index=True,
+    use_container_width=True,
+    disabled=[c for c in tabla.columns if c != "aplicar"],
+    key="nivelacion_editor"
+)
+
+aceptadas = propuestas[editado["aplicar"].to_numpy()]
+
+if st.button(f"✅ Aplicar {len(aceptadas)} desplazamientos", disabled=aceptadas.empty):
+    n = aplicar_nivelacion(aceptadas, st.session_state.user_id)
+    del st.session_state["nivelacion"]
+    st.success(f"{n} proyectos desplazados")
+    st.rerun()
@@ -0,0 +1,152 @@
+import streamlit as st
+import time
+
+from logic import ConflictoAsignacion, asegurar_sesion, tiene_permiso
+from planificador import ConflictoPlan, PlanHorizonte
+
+# =====================================================
+# 🔐 SESIÓN
+# =====================================================
+asegurar_sesion()
+
+if not st.session_state.autenticado:
+    st.switch_page("app.py")
+    st.stop()
+
+if not tiene_permiso(st.session_state.rol, "asignar_personal"):
+    st.error("⛔ No tienes permiso")
+    st.stop()
+
+# =====================================================
+# CONFIG
+# =====================================================
+st.set_page_config(page_title="Planificador de Horizonte", layout="wide")
+st.title("🗺️ Planificador de Horizonte (what-if)")
+
+# Resultado de la última confirmación (st.rerun descarta lo mostrado antes)
+mensaje = st.session_state.pop("plan_horizonte_mensaje", None)
+if mensaje:
+    st.success(mensaje)
+
+# =====================================================
+# CARGA DEL PLAN (UNA VEZ POR SESIÓN)
+# =====================================================
+c1, c2 = st.columns([1, 3])
+
+with c1:
+    semanas = st.number_input("Horizonte (semanas)", min_value=4, max_value=52, value=26)
+
+with c2:
+    st.write("")
+    recargar = st.button("🔄 Recargar desde la base (descarta tentativas)")
+
+plan = st.session_state.get("plan_horizonte")
+
+if plan is None or recargar or plan.dias != semanas * 7:
+    t0 = time.perf_counter()
+    plan = PlanHorizonte.cargar(int(semanas))
+    st.session_state["plan_horizonte"] = plan
+    st.caption(f"Plan cargado en {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+if plan.proyectos.empty:
+    st.info("No hay proyectos en el horizonte")
+    st.stop()
+
+# =====================================================
+# AGREGAR TENTATIVAS
+# =====================================================
+st.subheader("➕ Asignación tentativa")
+
+solo_no_confirmados = st.checkbox("Solo proyectos no confirmados", value=True)
+
+proyectos = plan.proyectos.reset_index()
+if solo_no_confirmados:
+    proyectos = proyectos[~proyectos["confirmado"].astype(bool)]
+
+if proyectos.empty:
+    st.info("No hay proyectos para planificar con ese filtro")
+else:
+    proyecto = st.selectbox(
+        "Proyecto",
+        proyectos.to_dict("records"),
+        format_func=lambda p: f"{p['nombre']} ({p['inicio']} → {p['fin']})"
+    )
+
+    dedicacion = st.slider("Dedicación (%)", min_value=10, max_value=100, value=100, step=5)
+
+    libres = plan.libres(proyecto["inicio"], proyecto["fin"], dedicacion)
+    solo_libres = st.checkbox("Mostrar solo personal con hueco en ese rango", value=True)
+    candidatos = libres if solo_libres else plan.personal
+
+    elegidos = st.multiselect(
+        f"Personal ({len(candidatos)} candidatos)",
+        candidatos["id"].tolist(),
+        format_func=lambda pid: plan.personal.loc[plan.personal["id"] == pid, "nombre"].iloc[0]
+    )
+
+    if st.button("Agregar al plan", disabled=not elegidos):
+        for pid in elegidos:
+            _, conflictos = plan.agregar(pid, proyecto["id"], dedicacion=dedicacion)
+            if len(conflictos):
+                st.warning(f"Persona {pid}: {len(conflictos)} días sobreasignados")
+        st.rerun()
+
+# =====================================================
+# ESTADO DEL PLAN
+# =====================================================
+st.divider()
+st.subheader("📋 Plan tentativo")
+
+tentativas = plan.tentativas()
+conflictos = plan.conflictos()
+
+k1, k2, k3 = st.columns(3)
+k1.metric("Tentativas", len(tentativas))
+k2.metric("Personas con conflicto", len(conflictos))
+k3.metric("Dedicación media (%)", round(plan.utilizacion().mean(), 1))
+
+if tentativas.empty:
+    st.info("Aún no hay asignaciones tentativas")
+else:
+    st.dataframe(
+        tentativas.drop(columns=["personal_id", "proyecto_id"]),
+        hide_index=True,
+        use_container_width=True
+    )
+
+    quitar = st.multiselect("Quitar tentativas", tentativas["clave"].tolist())
+
+    c1, c2, c3 = st.columns(3)
+
+    with c1:
+        if st.button("🗑️ Quitar seleccionadas", disabled=not quitar):
+            for clave in quitar:
+                plan.quitar(clave)
+            st.rerun()
+
+    with c2:
+        if st.button("↩️ Descartar todo"):
+            plan.descartar()
+            st.rerun()
+
+    with c3:
+        sobreasignado = bool(tentativas["conflicto"].any())
+        if st.button("✅ Confirmar plan", type="primary", disabled=sobreasignado):
+            try:
+                total = plan.confirmar(st.session_state.user_id)
+                # Se muestra tras el rerun (ver más abajo)
+                st.session_state["plan_horizonte_mensaje"] = f"{total} asignaciones confirmadas"
+                st.rerun()
+            except ConflictoPlan as e:
+                st.error(f"El plan sobreasigna a {len(e.args[0])} personas: quita esas tentativas")
+            except ConflictoAsignacion as e:
+                st.error(
+                    f"La base cambió desde que se cargó el plan: {len(e.args[0])} personas "
+                    "quedarían por encima del 100 %. Recarga el plan y revisa los conflictos."
+                )
+        if sobreasignado:
+            st.caption("Hay tentativas en conflicto (columna 'conflicto'): quítalas para confirmar")
+
+if not conflictos.empty:
+    with st.expander(f"⚠️ Conflictos ({len(conflictos)} personas)"):
+        st.dataframe(conflictos, hide_index=True, use_container_width=True)
@@ -0,0 +1,123 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from logic import asegurar_sesion, tiene_permiso
+from instrumentacion import (
+    UMBRAL_LENTA_MS,
+    resumen_consultas,
+    reiniciar_estadisticas,
+    estadisticas_desde,
+    leer_log_lentas
+)
+
+# =====================================================
+# 🔐 SESIÓN
+# =====================================================
+asegurar_sesion()
+
+if not st.session_state.autenticado:
+    st.switch_page("app.py")
+    st.stop()
+
+st.set_page_config(page_title="Rendimiento de Consultas", layout="wide")
+
+if not tiene_permiso(st.session_state.rol, "ver_rendimiento"):
+    st.error("⛔ Solo administradores")
+    st.stop()
+
+st.title("⏱️ Rendimiento de Consultas SQL")
+st.caption(
+    f"Estadísticas de este proceso desde {estadisticas_desde():%Y-%m-%d %H:%M:%S} · "
+    f"umbral de consulta lenta: {UMBRAL_LENTA_MS:.0f} ms"
+)
+
+# =====================================================
+# TOP CONSULTAS
+# =====================================================
+c1, c2, c3 = st.columns([2, 1, 1])
+
+with c1:
+    orden = st.selectbox(
+        "Ordenar por",
+        ["total_ms", "p95_ms", "max_ms", "llamadas", "media_ms"],
+        format_func=lambda x: {
+            "total_ms": "Tiempo total",
+            "p95_ms": "p95",
+            "max_ms": "Máximo",
+            "llamadas": "Llamadas",
+            "media_ms": "Media"
+        }[x]
+    )
+
+with c2:
+    limite = st.number_input("Top", min_value=5, max_value=200, value=25, step=5)
+
+with c3:
+    st.write("")
+    if st.button("🔄 Reiniciar estadísticas"):
+        reiniciar_estadisticas()
+        st.rerun()
+
+filas = resumen_consultas(orden, int(limite))
+
+if not filas:
+    st.info("Aún no se han registrado consultas en este proceso")
+    st.stop()
+
+df = pd.DataFrame(filas)
+
+k1, k2, k3 = st.columns(3)
+k1.metric("Consultas distintas", len(df))
+k2.metric("Ejecuciones", int(df["llamadas"].sum()))
+k3.metric("Tiempo total (s)", round(df["total_ms"].sum() / 1000, 2))
+
+df["consulta_corta"] = df["consulta"].str.slice(0, 80)
+
+fig = px.bar(
+    df.sort_values(orden),
+    x=orden,
+    y="consulta_corta",
+    orientation="h",
+    hover_data=["llamadas", "media_ms", "p95_ms", "max_ms", "sitio"]
+)
+fig.update_layout(height=max(300, 28 * len(df)), yaxis_title="", xaxis_title=orden)
+st.plotly_chart(fig, use_container_width=True)
+
+st.dataframe(
+    df[["consulta", "llamadas", "total_ms", "media_ms", "p50_ms", "p95_ms",
+        "max_ms", "filas_media", "errores", "sitio"]],
+    use_container_width=True,
+    hide_index=True
+)
+
+# =====================================================
+# HISTOGRAMA
+# =====================================================
+st.divider()
+st.subheader("📊 Histograma de latencia")
+
+sel = st.selectbox("Consulta", range(len(filas)), format_func=lambda i: filas[i]["consulta"][:120])
+
+hist = pd.DataFrame(
+    list(filas[sel]["histograma"].items()),
+    columns=["≤ ms", "Ejecuciones"]
+)
+st.plotly_chart(px.bar(hist, x="≤ ms", y="Ejecuciones"), use_container_width=True)
+
+# =====================================================
+# LOG DE LENTAS
+# =====================================================
+st.divider()
+st.subheader("🐢 Consultas lentas recientes")
+
+lentas = leer_log_lentas(50)
+
+if not lentas:
+    st.success("Sin consultas lentas registradas")
+else:
+    for e in lentas:
+        with st.expander(f"{e['fecha']} · {e['ms']} ms · {e['sitio']}"):
+            st.code(e["consulta"], language="sql")
+            if e.get("plan"):
+                st.code(e["plan"])
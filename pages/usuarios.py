@@ -9,6 +9,10 @@ from logic import (
     cambiar_estado,
     registrar_auditoria
 )
+from trazas import trazar_fragmento, trazar_pagina
+
+PAGINA = "Usuarios"
+ROLES = ["usuario", "gestor", "admin"]
 
 # =====================================================
 # 🔐 SESIÓN GLOBAL
@@ -36,146 +40,175 @@ st.title("👥 Gestión de Usuarios")
 # =====================================================
 # ➕ CREAR USUARIO
 # =====================================================
-st.subheader("➕ Crear Usuario")
+@st.fragment
+def seccion_crear():
+    with trazar_fragmento(PAGINA, "Crear"):
+        st.subheader("➕ Crear Usuario")
 
-col1, col2, col3 = st.columns(3)
+        col1, col2, col3 = st.columns(3)
 
-with col1:
-    nuevo_usuario = st.text_input("Usuario")
+        with col1:
+            nuevo_usuario = st.text_input("Usuario")
 
-with col2:
-    nueva_password = st.text_input("Contraseña", type="password")
+        with col2:
+            nueva_password = st.text_input("Contraseña", type="password")
 
-with col3:
-    nuevo_rol = st.selectbox("Rol", ["usuario", "gestor", "admin"])
+        with col3:
+            nuevo_rol = st.selectbox("Rol", ROLES)
 
-if st.button("Crear usuario"):
+        if st.button("Crear usuario"):
 
-    if not nuevo_usuario.strip() or not nueva_password.strip():
-        st.warning("Completa todos los campos")
-    else:
-        df = obtener_usuarios()
+            if not nuevo_usuario.strip() or not nueva_password.strip():
+                st.warning("Completa todos los campos")
+            else:
+                df = obtener_usuarios()
 
-        if nuevo_usuario in df["usuario"].values:
-            st.error("El usuario ya existe")
-        else:
-            crear_usuario(nuevo_usuario, nueva_password, nuevo_rol)
+                if nuevo_usuario in df["usuario"].values:
+                    st.error("El usuario ya existe")
+                else:
+                    crear_usuario(nuevo_usuario, nueva_password, nuevo_rol)
 
-            registrar_auditoria(
-                st.session_state.user_id,
-                "CREAR",
-                "USUARIO",
-                None,
-                f"Usuario {nuevo_usuario} creado con rol {nuevo_rol}"
-            )
+                    registrar_auditoria(
+                        st.session_state.user_id,
+                        "CREAR",
+                        "USUARIO",
+                        None,
+                        f"Usuario {nuevo_usuario} creado con rol {nuevo_rol}"
+                    )
 
-            st.success("Usuario creado correctamente")
-            st.rerun()
+                    st.success("Usuario creado correctamente")
+                    # La lista debe incluir al nuevo usuario
+                    st.rerun(scope="app")
 
-st.divider()
 
 # =====================================================
-# 📋 LISTA DE USUARIOS
+# 📋 FILA DE USUARIO
 # =====================================================
-st.subheader("📋 Usuarios del sistema")
-
-df = obtener_usuarios()
+@st.fragment
+def fila_usuario(uid):
+    """
+    Una fila por usuario. Cambiar rol/estado o resetear la contraseña
+    solo reejecuta esta fila; el estado vigente se guarda en
+    st.session_state.usuarios para no releer la lista.
+    """
+    with trazar_fragmento(PAGINA, "Fila"):
+        row = st.session_state.usuarios[uid]
+        es_yo = uid == st.session_state.user_id
+
+        col1, col2, col3, col4 = st.columns([3, 3, 3, 3])
+
+        # ---------------- USER
+        with col1:
+            label = f"**{row['usuario']}**"
+            if es_yo:
+                label += " (Tú)"
+            st.write(label)
+
+        # ---------------- CAMBIAR ROL
+        with col2:
+            rol_sel = st.selectbox(
+                "Rol",
+                ROLES,
+                index=ROLES.index(row["rol"]),
+                key=f"rol_{uid}"
+            )
 
-if df.empty:
-    st.info("No hay usuarios registrados")
-    st.stop()
+            if rol_sel != row["rol"]:
+
+                if es_yo and row["rol"] == "admin" and rol_sel != "admin":
+                    st.error("⛔ No puedes quitarte el rol admin")
+                else:
+                    cambiar_rol(uid, rol_sel)
+
+                    registrar_auditoria(
+                        st.session_state.user_id,
+                        "EDITAR",
+                        "USUARIO",
+                        uid,
+                        f"Cambio de rol a {rol_sel}"
+                    )
+
+                    row["rol"] = rol_sel
+                    st.success("Rol actualizado")
+
+        # ---------------- ACTIVO
+        with col3:
+            activo = st.toggle(
+                "Activo",
+                value=bool(row["activo"]),
+                key=f"activo_{uid}"
+            )
 
-for _, row in df.iterrows():
+            if activo != bool(row["activo"]):
+
+                if es_yo and not activo:
+                    st.error("⛔ No puedes desactivarte a ti mismo")
+                else:
+                    cambiar_estado(uid, activo)
+
+                    registrar_auditoria(
+                        st.session_state.user_id,
+                        "EDITAR",
+                        "USUARIO",
+                        uid,
+                        f"Usuario {'activado' if activo else 'desactivado'}"
+                    )
+
+                    row["activo"] = activo
+                    st.success("Estado actualizado")
+
+        # ---------------- RESET PASSWORD
+        with col4:
+            nueva_pass = st.text_input(
+                "Nueva contraseña",
+                type="password",
+                key=f"pass_{uid}"
+            )
 
-    uid = int(row["id"])
-    es_yo = uid == st.session_state.user_id
+            if st.button("Reset", key=f"reset_{uid}"):
 
-    col1, col2, col3, col4 = st.columns([3, 3, 3, 3])
+                if not nueva_pass.strip():
+                    st.warning("Introduce una contraseña")
+                else:
+                    cambiar_password(uid, nueva_pass)
 
-    # ---------------- USER
-    with col1:
-        label = f"**{row['usuario']}**"
-        if es_yo:
-            label += " (Tú)"
-        st.write(label)
+                    registrar_auditoria(
+                        st.session_state.user_id,
+                        "EDITAR",
+                        "USUARIO",
+                        uid,
+                        "Reset de contraseña"
+                    )
 
-    # ---------------- CAMBIAR ROL
-    with col2:
-        rol_sel = st.selectbox(
-            "Rol",
-            ["usuario", "gestor", "admin"],
-            index=["usuario", "gestor", "admin"].index(row["rol"]),
-            key=f"rol_{uid}"
-        )
+                    st.success("Contraseña actualizada")
 
-        if rol_sel != row["rol"]:
+        st.divider()
 
-            if es_yo and row["rol"] == "admin" and rol_sel != "admin":
-                st.error("⛔ No puedes quitarte el rol admin")
-            else:
-                cambiar_rol(uid, rol_sel)
-
-                registrar_auditoria(
-                    st.session_state.user_id,
-                    "EDITAR",
-                    "USUARIO",
-                    uid,
-                    f"Cambio de rol a {rol_sel}"
-                )
-
-                st.success("Rol actualizado")
-                st.rerun()
-
-    # ---------------- ACTIVO
-    with col3:
-        activo = st.toggle(
-            "Activo",
-            value=bool(row["activo"]),
-            key=f"activo_{uid}"
-        )
-
-        if activo != bool(row["activo"]):
-
-            if es_yo and not activo:
-                st.error("⛔ No puedes desactivarte a ti mismo")
-            else:
-                cambiar_estado(uid, activo)
-
-                registrar_auditoria(
-                    st.session_state.user_id,
-                    "EDITAR",
-                    "USUARIO",
-                    uid,
-                    f"Usuario {'activado' if activo else 'desactivado'}"
-                )
-
-                st.success("Estado actualizado")
-                st.rerun()
-
-    # ---------------- RESET PASSWORD
-    with col4:
-        nueva_pass = st.text_input(
-            "Nueva contraseña",
-            type="password",
-            key=f"pass_{uid}"
-        )
-
-        if st.button("Reset", key=f"reset_{uid}"):
-
-            if not nueva_pass.strip():
-                st.warning("Introduce una contraseña")
-            else:
-                cambiar_password(uid, nueva_pass)
 
-                registrar_auditoria(
-                    st.session_state.user_id,
-                    "EDITAR",
-                    "USUARIO",
-                    uid,
-                    "Reset de contraseña"
-                )
+# =====================================================
+# PÁGINA
+# =====================================================
+with trazar_pagina(PAGINA, usuario=st.session_state.usuario):
 
-                st.success("Contraseña actualizada")
-                st.rerun()
+    seccion_crear()
 
     st.divider()
+
+    # =====================================================
+    # 📋 LISTA DE USUARIOS
+    # =====================================================
+    st.subheader("📋 Usuarios del sistema")
+
+    df = obtener_usuarios()
+
+    if df.empty:
+        st.info("No hay usuarios registrados")
+        st.stop()
+
+    st.session_state.usuarios = {
+        int(r["id"]): {"usuario": r["usuario"], "rol": r["rol"], "activo": bool(r["activo"])}
+        for r in df.to_dict("records")
+    }
+
+    for uid in st.session_state.usuarios:
+        fila_usuario(uid)
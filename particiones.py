@@ -0,0 +1,351 @@
+import gzip
+import os
+import re
+from datetime import date
+from pathlib import Path
+
+from psycopg2 import sql
+
+from database import get_connection
+
+# =====================================================
+# CONFIG
+# =====================================================
+TABLAS_PARTICIONADAS = ("auditoria", "proyectos_historial")
+COLUMNA_FECHA = "fecha"
+
+MESES_ADELANTE = 3
+RETENCION_MESES = 24
+DIRECTORIO_ARCHIVO = Path("archivo")
+
+PATRON_PARTICION = re.compile(r"^(?P<tabla>.+)_p(?P<anio>\d{4})_(?P<mes>\d{2})$")
+
+
+# =====================================================
+# UTIL FECHAS
+# =====================================================
+def inicio_mes(d):
+    return date(d.year, d.month, 1)
+
+
+def sumar_meses(d, n):
+    m = d.month - 1 + n
+    return date(d.year + m // 12, m % 12 + 1, 1)
+
+
+def nombre_particion(tabla, mes):
+    return f"{tabla}_p{mes:%Y_%m}"
+
+
+def nombre_default(tabla):
+    return f"{tabla}_default"
+
+
+# =====================================================
+# CATÁLOGO
+# =====================================================
+def _existe(cur, tabla):
+    cur.execute("SELECT to_regclass(%s) IS NOT NULL", (tabla,))
+    return cur.fetchone()[0]
+
+
+def esta_particionada(cur, tabla):
+    cur.execute("""
+        SELECT c.relkind = 'p'
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = current_schema()
+        AND c.relname = %s
+    """, (tabla,))
+    row = cur.fetchone()
+    return bool(row and row[0])
+
+
+def listar_particiones(cur, tabla):
+    """
+    Particiones mensuales adjuntas a `tabla` → [(nombre, mes)].
+    La partición DEFAULT no se incluye.
+    """
+    cur.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = %s
+        ORDER BY c.relname
+    """, (tabla,))
+
+    particiones = []
+    for (nombre,) in cur.fetchall():
+        m = PATRON_PARTICION.match(nombre)
+        if m and m.group("tabla") == tabla:
+            particiones.append((nombre, date(int(m.group("anio")), int(m.group("mes")), 1)))
+
+    return particiones
+
+
+# =====================================================
+# CREACIÓN DE PARTICIONES
+# =====================================================
+def _crear_particion(cur, tabla, mes):
+    """
+    Crea la partición mensual de `tabla` para `mes`.
+    Si la partición DEFAULT ya recibió filas de ese mes, se mueven
+    antes de adjuntar (ATTACH fallaría en caso contrario).
+    """
+    nombre = nombre_particion(tabla, mes)
+
+    if _existe(cur, nombre):
+        return False
+
+    desde, hasta = mes, sumar_meses(mes, 1)
+    t, p, d = sql.Identifier(tabla), sql.Identifier(nombre), sql.Identifier(nombre_default(tabla))
+    col = sql.Identifier(COLUMNA_FECHA)
+
+    cur.execute(sql.SQL("CREATE TABLE {} (LIKE {})").format(p, t))
+
+    if _existe(cur, nombre_default(tabla)):
+        cur.execute(sql.SQL("""
+            WITH movidas AS (
+                DELETE FROM {d}
+                WHERE {col} >= %s AND {col} < %s
+                RETURNING *
+            )
+            INSERT INTO {p} SELECT * FROM movidas
+        """).format(d=d, p=p, col=col), (desde, hasta))
+
+    cur.execute(
+        sql.SQL("ALTER TABLE {} ATTACH PARTITION {} FOR VALUES FROM (%s) TO (%s)").format(t, p),
+        (desde, hasta)
+    )
+    return True
+
+
+def crear_particiones_futuras(meses=MESES_ADELANTE, tablas=TABLAS_PARTICIONADAS):
+    """
+    Garantiza particiones desde el mes actual hasta `meses` adelante.
+    Las tablas que aún no están particionadas se ignoran.
+    Devuelve la lista de particiones creadas.
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    creadas = []
+
+    try:
+        actual = inicio_mes(date.today())
+
+        for tabla in tablas:
+            if not esta_particionada(cur, tabla):
+                continue
+
+            for i in range(meses + 1):
+                mes = sumar_meses(actual, i)
+                if _crear_particion(cur, tabla, mes):
+                    creadas.append(nombre_particion(tabla, mes))
+
+        conn.commit()
+        return creadas
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+
+# =====================================================
+# CONVERSIÓN (UNA SOLA VEZ)
+# =====================================================
+def _transferir_secuencia_id(cur, tabla, legado):
+    cur.execute("""
+        SELECT is_identity
+        FROM information_schema.columns
+        WHERE table_schema = current_schema()
+        AND table_name = %s AND column_name = 'id'
+    """, (legado,))
+    row = cur.fetchone()
+
+    if not row:
+        return
+
+    if row[0] == "YES":
+        # La identidad copiada arranca en 1 → continuar donde iba el legado
+        cur.execute(sql.SQL("SELECT COALESCE(MAX(id), 0) + 1 FROM {}").format(sql.Identifier(legado)))
+        siguiente = cur.fetchone()[0]
+        cur.execute(
+            sql.SQL("ALTER TABLE {} ALTER COLUMN id RESTART WITH {}").format(
+                sql.Identifier(tabla), sql.Literal(siguiente)
+            )
+        )
+        return
+
+    cur.execute("SELECT pg_get_serial_sequence(%s, 'id')", (legado,))
+    secuencia = cur.fetchone()[0]
+
+    if secuencia:
+        # Si no se transfiere, DROP del legado borraría la secuencia del default
+        cur.execute(
+            sql.SQL("ALTER SEQUENCE {} OWNED BY {}.id").format(
+                sql.SQL(secuencia), sql.Identifier(tabla)
+            )
+        )
+
+
+def _copiar_indices(cur, tabla, legado):
+    """
+    Recrea en `tabla` los índices no únicos del legado (los únicos sin la
+    fecha no son válidos en una tabla particionada).
+    """
+    cur.execute("""
+        SELECT pg_get_indexdef(i.indexrelid)
+        FROM pg_index i
+        WHERE i.indrelid = %s::regclass
+        AND NOT i.indisunique
+    """, (legado,))
+
+    for (definicion,) in cur.fetchall():
+        # "CREATE INDEX nombre ON esquema.legado USING btree (...)"
+        m = re.match(r"^CREATE INDEX \S+ ON \S+ (USING .+)$", definicion)
+        if m:
+            cur.execute(sql.SQL("CREATE INDEX ON {} ").format(sql.Identifier(tabla)) + sql.SQL(m.group(1)))
+
+
+def convertir_a_particionada(tabla, meses=MESES_ADELANTE, conservar_legado=False):
+    """
+    Convierte `tabla` en tabla particionada por rango mensual de `fecha`.
+    Copia los datos existentes a sus particiones en una sola transacción.
+    """
+    if tabla not in TABLAS_PARTICIONADAS:
+        raise ValueError(f"Tabla no particionable: {tabla}")
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        if esta_particionada(cur, tabla):
+            return False
+
+        legado = f"{tabla}_legado"
+        t, l = sql.Identifier(tabla), sql.Identifier(legado)
+        col = sql.Identifier(COLUMNA_FECHA)
+
+        cur.execute(sql.SQL(
+            "SELECT MIN({col}), COUNT(*), COUNT(*) FILTER (WHERE {col} IS NULL) FROM {t}"
+        ).format(col=col, t=t))
+        minimo, total, sin_fecha = cur.fetchone()
+
+        if sin_fecha:
+            # La clave primaria incluye la fecha (NOT NULL)
+            raise ValueError(f"{tabla}: {sin_fecha} filas sin {COLUMNA_FECHA}")
+
+        cur.execute(sql.SQL("ALTER TABLE {} RENAME TO {}").format(t, l))
+        cur.execute(
+            sql.SQL("""
+                CREATE TABLE {t} (LIKE {l} INCLUDING DEFAULTS INCLUDING IDENTITY INCLUDING CONSTRAINTS)
+                PARTITION BY RANGE ({col})
+            """).format(t=t, l=l, col=col)
+        )
+        _transferir_secuencia_id(cur, tabla, legado)
+
+        # Una PK en tabla particionada debe incluir la clave de partición;
+        # las particiones la heredan al adjuntarse
+        cur.execute(
+            sql.SQL("ALTER TABLE {} ADD PRIMARY KEY (id, {})").format(t, col)
+        )
+        cur.execute(
+            sql.SQL("CREATE INDEX ON {} ({} DESC)").format(t, col)
+        )
+        _copiar_indices(cur, tabla, legado)
+
+        desde = inicio_mes(minimo) if minimo else inicio_mes(date.today())
+        hasta = sumar_meses(inicio_mes(date.today()), meses)
+
+        mes = desde
+        while mes <= hasta:
+            _crear_particion(cur, tabla, mes)
+            mes = sumar_meses(mes, 1)
+
+        cur.execute(
+            sql.SQL("CREATE TABLE {} PARTITION OF {} DEFAULT").format(
+                sql.Identifier(nombre_default(tabla)), t
+            )
+        )
+
+        cur.execute(sql.SQL("INSERT INTO {} SELECT * FROM {}").format(t, l))
+
+        if not conservar_legado:
+            cur.execute(sql.SQL("DROP TABLE {}").format(l))
+
+        conn.commit()
+        return total
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+
+# =====================================================
+# ARCHIVO / RETENCIÓN
+# =====================================================
+def archivar_particiones(retencion_meses=RETENCION_MESES, destino=DIRECTORIO_ARCHIVO,
+                         tablas=TABLAS_PARTICIONADAS):
+    """
+    Desacopla las particiones anteriores a la ventana de retención,
+    las vuelca a `destino/<particion>.csv.gz` y las elimina.
+    Cada partición va en su propia transacción: si el volcado falla,
+    el rollback la deja adjunta como estaba.
+    """
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+
+    limite = sumar_meses(inicio_mes(date.today()), -retencion_meses)
+
+    conn = get_connection()
+    cur = conn.cursor()
+    archivadas = []
+
+    try:
+        for tabla in tablas:
+            if not esta_particionada(cur, tabla):
+                continue
+
+            for nombre, mes in listar_particiones(cur, tabla):
+                if mes >= limite:
+                    continue
+
+                p = sql.Identifier(nombre)
+                archivo = destino / f"{nombre}.csv.gz"
+                temporal = archivo.with_suffix(".gz.tmp")
+
+                try:
+                    cur.execute(
+                        sql.SQL("ALTER TABLE {} DETACH PARTITION {}").format(sql.Identifier(tabla), p)
+                    )
+
+                    with gzip.open(temporal, "wb") as f:
+                        cur.copy_expert(
+                            sql.SQL("COPY {} TO STDOUT WITH (FORMAT csv, HEADER)").format(p).as_string(conn),
+                            f
+                        )
+                    os.replace(temporal, archivo)
+
+                    cur.execute(sql.SQL("DROP TABLE {}").format(p))
+                    conn.commit()
+                    archivadas.append(str(archivo))
+
+                except Exception:
+                    conn.rollback()
+                    temporal.unlink(missing_ok=True)
+                    raise
+
+        return archivadas
+
+    finally:
+        cur.close()
+        conn.close()
@@ -0,0 +1,281 @@
+"""
+Planificador por horizonte con capa de asignaciones tentativas.
+
+Carga una sola vez personal, proyectos y asignaciones activas del horizonte
+en arreglos NumPy (dedicación % personas × días; conflicto = más de 100 %).
+Las asignaciones tentativas
+viven en una capa copy-on-write: la matriz base nunca se modifica y solo se
+copian las filas de las personas tocadas, así cada cambio recalcula la
+ocupación y los conflictos de una única persona. `confirmar` escribe todo
+el plan en una transacción.
+"""
+import itertools
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from calendario_laboral import mascara_laboral
+from carga import DEDICACION_COMPLETA, acumular, dedicaciones, fechas
+from database import get_connection
+from logic import asignar_plan, cerrar
+
+
+class ConflictoPlan(Exception):
+    """
+    Tentativas que el propio plan deja por encima del 100 % (args[0]: personal_id).
+    """
+
+
+class PlanHorizonte:
+
+    def __init__(self, desde, dias, personal, proyectos, asignaciones, laborable=None):
+        self.desde = np.datetime64(desde, "D")
+        self.dias = int(dias)
+        self.hasta = self.desde + np.timedelta64(self.dias - 1, "D")
+        self.laborable = np.ones(self.dias, dtype=bool) if laborable is None else laborable
+
+        self.personal = personal.reset_index(drop=True)
+        self.proyectos = proyectos.set_index("id")
+        self._idx = {int(pid): i for i, pid in enumerate(self.personal["id"])}
+
+        self.base = self._ocupacion_base(asignaciones)
+        self._filas = {}          # persona → fila copiada (copy-on-write)
+        self._tentativas = {}     # clave → (persona, proyecto_id, inicio, fin, d0, d1, dedicacion)
+        self._conflictos = {}     # persona → días (índices) con más de 100 %
+        self._claves = itertools.count(1)
+
+        # Conflictos ya existentes antes de planificar (solo días laborables)
+        for p in np.nonzero(((self.base > DEDICACION_COMPLETA) & self.laborable).any(axis=1))[0]:
+            self._recalcular(int(p))
+
+    # =====================================================
+    # CARGA
+    # =====================================================
+    @classmethod
+    def cargar(cls, semanas=26, desde=None):
+        desde = desde or date.today()
+        hasta = desde + timedelta(weeks=semanas) - timedelta(days=1)
+
+        conn = get_connection()
+
+        personal = pd.read_sql("""
+            SELECT id, nombre, cargo, area
+            FROM personal
+            WHERE activo = TRUE
+            ORDER BY nombre
+        """, conn)
+
+        proyectos = pd.read_sql("""
+            SELECT id, nombre, inicio, fin, confirmado
+            FROM proyectos
+            WHERE eliminado = FALSE
+            AND inicio <= %s AND fin >= %s
+            ORDER BY inicio
+        """, conn, params=(hasta, desde))
+
+        asignaciones = pd.read_sql("""
+            SELECT personal_id, proyecto_id, inicio, fin, dedicacion
+            FROM asignaciones
+            WHERE activa = TRUE
+            AND inicio <= %s AND fin >= %s
+        """, conn, params=(hasta, desde))
+
+        cerrar(conn)
+        return cls(desde, semanas * 7, personal, proyectos, asignaciones, mascara_laboral(desde, semanas * 7))
+
+    def _dia(self, fecha):
+        return int((np.datetime64(fecha, "D") - self.desde).astype(np.int64))
+
+    def _rango(self, inicio, fin):
+        """
+        Índices [d0, d1] recortados al horizonte; None si queda fuera.
+        """
+        d0 = max(self._dia(inicio), 0)
+        d1 = min(self._dia(fin), self.dias - 1)
+        return (d0, d1) if d0 <= d1 else None
+
+    def _ocupacion_base(self, asignaciones):
+        """
+        Dedicación (%) por persona y día, acumulada por intervalos.
+        """
+        p = asignaciones["personal_id"].map(self._idx)
+        ok = p.notna().to_numpy()
+
+        return acumular(
+            len(self.personal),
+            p[ok].astype(np.int64).to_numpy(),
+            fechas(asignaciones["inicio"])[ok],
+            fechas(asignaciones["fin"])[ok],
+            dedicaciones(asignaciones)[ok],
+            self.desde,
+            self.dias,
+            dtype=np.int16
+        )
+
+    # =====================================================
+    # CAPA TENTATIVA
+    # =====================================================
+    def _fila(self, persona, escribir=False):
+        fila = self._filas.get(persona)
+        if fila is None:
+            if not escribir:
+                return self.base[persona]
+            fila = self._filas[persona] = self.base[persona].copy()
+        return fila
+
+    def _recalcular(self, persona):
+        # Igual que logic._conflictos_plan: fines de semana y feriados no cuentan
+        dias = np.nonzero((self._fila(persona) > DEDICACION_COMPLETA) & self.laborable)[0]
+        if len(dias):
+            self._conflictos[persona] = dias
+        else:
+            self._conflictos.pop(persona, None)
+
+    def agregar(self, personal_id, proyecto_id, inicio=None, fin=None, dedicacion=DEDICACION_COMPLETA):
+        """
+        Añade una asignación tentativa (por defecto con las fechas del proyecto).
+        Devuelve (clave, fechas en conflicto para esa persona).
+        """
+        persona = self._idx[int(personal_id)]
+        proyecto = self.proyectos.loc[int(proyecto_id)]
+        inicio = inicio or proyecto["inicio"]
+        fin = fin or proyecto["fin"]
+
+        rango = self._rango(inicio, fin)
+        if rango is None:
+            raise ValueError("La asignación queda fuera del horizonte del plan")
+
+        d0, d1 = rango
+        self._fila(persona, escribir=True)[d0:d1 + 1] += dedicacion
+        self._recalcular(persona)
+
+        clave = next(self._claves)
+        self._tentativas[clave] = (persona, int(proyecto_id), inicio, fin, d0, d1, int(dedicacion))
+        return clave, self.fechas_conflicto(personal_id)
+
+    def quitar(self, clave):
+        persona, _, _, _, d0, d1, dedicacion = self._tentativas.pop(clave)
+        self._fila(persona, escribir=True)[d0:d1 + 1] -= dedicacion
+
+        if np.array_equal(self._filas[persona], self.base[persona]):
+            del self._filas[persona]
+        self._recalcular(persona)
+
+    def descartar(self):
+        self._tentativas.clear()
+        for persona in list(self._filas):
+            del self._filas[persona]
+            self._recalcular(persona)
+
+    def copiar(self):
+        """
+        Escenario alternativo: comparte la matriz base y copia solo la capa.
+        """
+        otro = object.__new__(PlanHorizonte)
+        otro.__dict__.update(self.__dict__)
+        otro._filas = {p: f.copy() for p, f in self._filas.items()}
+        otro._tentativas = dict(self._tentativas)
+        otro._conflictos = dict(self._conflictos)
+        otro._claves = itertools.count(max(self._tentativas, default=0) + 1)
+        return otro
+
+    # =====================================================
+    # CONSULTAS
+    # =====================================================
+    def ocupacion(self, personal_id):
+        return self._fila(self._idx[int(personal_id)])
+
+    def fechas_conflicto(self, personal_id):
+        dias = self._conflictos.get(self._idx[int(personal_id)], np.zeros(0, dtype=np.int64))
+        return self.desde + dias.astype("timedelta64[D]")
+
+    def libres(self, inicio, fin, dedicacion=DEDICACION_COMPLETA):
+        """
+        Personal con hueco para `dedicacion` % (base + tentativas) en todo el rango.
+        """
+        rango = self._rango(inicio, fin)
+        if rango is None:
+            return self.personal.iloc[0:0]
+
+        d0, d1 = rango
+        pico = self.base[:, d0:d1 + 1].max(axis=1)
+        for persona, fila in self._filas.items():
+            pico[persona] = fila[d0:d1 + 1].max()
+
+        return self.personal[pico + dedicacion <= DEDICACION_COMPLETA]
+
+    def tentativas(self):
+        columnas = ["clave", "personal_id", "nombre", "proyecto_id", "proyecto", "inicio", "fin", "dedicacion", "conflicto"]
+        filas = []
+        for clave, (persona, proyecto_id, inicio, fin, d0, d1, dedicacion) in self._tentativas.items():
+            dias = self._conflictos.get(persona, ())
+            filas.append((
+                clave,
+                int(self.personal.at[persona, "id"]),
+                self.personal.at[persona, "nombre"],
+                proyecto_id,
+                self.proyectos.at[proyecto_id, "nombre"],
+                inicio,
+                fin,
+                dedicacion,
+                bool(len(dias)) and bool(((dias >= d0) & (dias <= d1)).any())
+            ))
+        return pd.DataFrame(filas, columns=columnas)
+
+    def conflictos(self):
+        """
+        Personas con días sobreasignados (base + tentativas).
+        """
+        filas = [
+            (self.personal.at[p, "nombre"], len(d), self.desde + np.timedelta64(int(d[0]), "D"))
+            for p, d in self._conflictos.items()
+        ]
+        return pd.DataFrame(filas, columns=["Personal", "Dias en conflicto", "Primer conflicto"])
+
+    def utilizacion(self):
+        """
+        Dedicación media (%) por persona en los días laborables del horizonte
+        (con tentativas).
+        """
+        media = self.base[:, self.laborable].mean(axis=1)
+        for persona, fila in self._filas.items():
+            media[persona] = fila[self.laborable].mean()
+        return pd.Series(media, index=self.personal["nombre"])
+
+    # =====================================================
+    # CONFIRMAR
+    # =====================================================
+    def confirmar(self, uid=None):
+        """
+        Inserta todas las tentativas en `asignaciones` en una transacción.
+        Lanza ConflictoPlan si el propio plan sobreasigna a alguien; la
+        capacidad se vuelve a comprobar contra la base dentro de la
+        transacción (logic.ConflictoAsignacion si la base cambió).
+        """
+        if not self._tentativas:
+            return 0
+
+        tentativas = self.tentativas()
+        if tentativas["conflicto"].any():
+            raise ConflictoPlan(sorted(set(tentativas.loc[tentativas["conflicto"], "personal_id"])))
+
+        filas = [
+            (proyecto_id, int(self.personal.at[persona, "id"]), inicio, fin, dedicacion)
+            for persona, proyecto_id, inicio, fin, _, _, dedicacion in self._tentativas.values()
+        ]
+
+        asignar_plan(
+            filas, uid, "CONFIRMAR_PLAN",
+            f"Plan de horizonte: {len(filas)} asignaciones en "
+            f"{len({f[0] for f in filas})} proyectos"
+        )
+
+        # Lo confirmado pasa a la base (nueva copia: otros escenarios no cambian)
+        self.base = self.base.copy()
+        for persona, fila in self._filas.items():
+            self.base[persona] = fila
+
+        self._tentativas.clear()
+        self._filas.clear()
+        return len(filas)
@@ -0,0 +1,54 @@
+"""
+Regresión de planes con pytest: cada consulta de verificar_planes.CONSULTAS
+debe usar sus índices (ningún Seq Scan sobre las tablas principales).
+
+Necesita Postgres (variables SUPABASE_DB_*); sin base se omite. Con
+PLANES_CARGAR_DATASET=1 antes se carga el dataset de generar_dataset.py
+con --crear-esquema --limpiar (¡vacía las tablas! solo en una base de
+pruebas). Si no, se aplican las migraciones y se usa lo que haya.
+
+    PLANES_CARGAR_DATASET=1 python -m pytest -q test_planes.py
+"""
+import os
+
+import pytest
+
+import verificar_planes
+
+# Más chico que el dataset por defecto: con enable_seqscan = off el plan
+# no depende del tamaño, solo de que existan los índices
+DATASET = dict(personal=500, proyectos=200, asignaciones=10000,
+               historial=1000, auditoria=1000, ausencias=500)
+
+
+def _conectar():
+    if not os.environ.get("SUPABASE_DB_HOST"):
+        pytest.skip("Sin base Postgres (SUPABASE_DB_HOST)")
+    from database import get_connection
+    try:
+        conn = get_connection()
+    except Exception as e:
+        pytest.skip(f"Sin conexión a Postgres: {e}")
+    conn.close()
+
+
+@pytest.fixture(scope="module")
+def resultados():
+    _conectar()
+
+    if os.environ.get("PLANES_CARGAR_DATASET") == "1":
+        import generar_dataset
+        generar_dataset.cargar_postgres(
+            generar_dataset.generar(**DATASET), crear_esquema=True, limpiar=True
+        )
+    else:
+        from migrar_esquema import aplicar_migraciones
+        aplicar_migraciones()
+
+    return {nombre: (problemas, usados) for nombre, problemas, usados in verificar_planes.verificar()}
+
+
+@pytest.mark.parametrize("nombre", [nombre for nombre, _, _ in verificar_planes.CONSULTAS])
+def test_usa_indices(resultados, nombre):
+    problemas, usados = resultados[nombre]
+    assert not problemas, f"{nombre}: {'; '.join(problemas)} (usa {sorted(usados) or '-'})"
@@ -0,0 +1,206 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import metricas
+
+# =====================================================
+# CONFIG
+# =====================================================
+TRAZAS_POR_PAGINA = int(os.environ.get("TRAZAS_POR_PAGINA", "20"))
+
+# Consultas por traza: evita trazas enormes en bucles N+1
+MAX_SPANS_SQL = 500
+
+
+# =====================================================
+# MODELO
+# =====================================================
+class Span:
+    __slots__ = ("nombre", "tipo", "inicio", "fin", "hijos", "meta")
+
+    def __init__(self, nombre, tipo, inicio=None, meta=None):
+        self.nombre = nombre
+        self.tipo = tipo
+        self.inicio = time.perf_counter() if inicio is None else inicio
+        self.fin = None
+        self.hijos = []
+        self.meta = meta or {}
+
+    @property
+    def duracion_ms(self):
+        fin = self.fin if self.fin is not None else time.perf_counter()
+        return (fin - self.inicio) * 1000
+
+    def aplanar(self, origen=None, profundidad=0, padre=None):
+        """
+        Lista de filas (pre-orden) con tiempos relativos al span raíz.
+        """
+        origen = self.inicio if origen is None else origen
+        filas = [{
+            "nombre": self.nombre,
+            "tipo": self.tipo,
+            "profundidad": profundidad,
+            "padre": padre,
+            "inicio_ms": round((self.inicio - origen) * 1000, 3),
+            "duracion_ms": round(self.duracion_ms, 3),
+            **self.meta,
+        }]
+        for h in self.hijos:
+            filas.extend(h.aplanar(origen, profundidad + 1, self.nombre))
+        return filas
+
+
+_actual = contextvars.ContextVar("span_actual", default=None)
+_consultas = contextvars.ContextVar("consultas_traza", default=None)
+
+_trazas = defaultdict(lambda: deque(maxlen=TRAZAS_POR_PAGINA))
+_lock = threading.Lock()
+
+
+# =====================================================
+# API
+# =====================================================
+@contextmanager
+def trazar_pagina(pagina, **meta):
+    """
+    Span raíz de un rerun. Al salir (incluido st.stop / st.rerun)
+    la traza se guarda entre las últimas N de la página.
+    """
+    raiz = Span(pagina, "pagina", meta=meta)
+    contador = [0]
+    token = _actual.set(raiz)
+    token_sql = _consultas.set(contador)
+
+    try:
+        yield raiz
+    finally:
+        raiz.fin = time.perf_counter()
+        _actual.reset(token)
+        _consultas.reset(token_sql)
+        raiz.meta["consultas"] = contador[0]
+        _guardar(pagina, raiz)
+        metricas.RENDERS_PAGINA.inc(pagina)
+        metricas.DURACION_PAGINA.observar(raiz.duracion_ms / 1000, pagina)
+
+
+@contextmanager
+def span(nombre, tipo="seccion", **meta):
+    """
+    Span hijo del actual. Fuera de una traza de página no registra nada.
+    """
+    padre = _actual.get()
+    if padre is None:
+        yield None
+        return
+
+    s = Span(nombre, tipo, meta=meta)
+    padre.hijos.append(s)
+    token = _actual.set(s)
+
+    try:
+        yield s
+    finally:
+        s.fin = time.perf_counter()
+        _actual.reset(token)
+
+
+@contextmanager
+def trazar_fragmento(pagina, nombre, **meta):
+    """
+    Cuerpo de un st.fragment. Dentro del rerun completo de la página es un
+    span más; en un rerun parcial (solo el fragmento) es una traza propia
+    "pagina · nombre", así se ven las consultas de cada interacción.
+    """
+    if _actual.get() is not None:
+        with span(nombre, "fragmento", **meta) as s:
+            yield s
+    else:
+        with trazar_pagina(f"{pagina} · {nombre}", **meta) as raiz:
+            yield raiz
+
+
+def trazado(nombre=None, tipo="logica"):
+    """
+    Decorador: cada llamada a la función se registra como span
+    (si hay traza activa) y siempre en la métrica de latencia.
+    """
+    def decorador(fn):
+        etiqueta = nombre or fn.__name__
+
+        @functools.wraps(fn)
+        def envoltura(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                if _actual.get() is None:
+                    return fn(*args, **kwargs)
+                with span(etiqueta, tipo):
+                    return fn(*args, **kwargs)
+            except Exception:
+                metricas.ERRORES_LOGICA.inc(etiqueta)
+                raise
+            finally:
+                metricas.DURACION_LOGICA.observar(time.perf_counter() - t0, etiqueta)
+
+        return envoltura
+    return decorador
+
+
+def seccion(nombre):
+    return trazado(nombre, "seccion")
+
+
+def registrar_sql(consulta, inicio, fin, filas):
+    """
+    Llamado por instrumentacion.CursorInstrumentado tras cada sentencia.
+    """
+    padre = _actual.get()
+    if padre is None:
+        return
+
+    contador = _consultas.get()
+    contador[0] += 1
+    if contador[0] > MAX_SPANS_SQL:
+        return
+
+    s = Span(consulta[:120], "sql", inicio=inicio, meta={"filas": filas})
+    s.fin = fin
+    padre.hijos.append(s)
+
+
+# =====================================================
+# ALMACÉN
+# =====================================================
+def _guardar(pagina, raiz):
+    with _lock:
+        _trazas[pagina].append({
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "pagina": pagina,
+            "duracion_ms": round(raiz.duracion_ms, 3),
+            "consultas": raiz.meta.get("consultas", 0),
+            "usuario": raiz.meta.get("usuario"),
+            "spans": raiz.aplanar(),
+        })
+
+
+def paginas_trazadas():
+    with _lock:
+        return sorted(_trazas)
+
+
+def obtener_trazas(pagina):
+    """
+    Últimas trazas de la página, más recientes primero.
+    """
+    with _lock:
+        return list(reversed(_trazas.get(pagina, ())))
+
+
+def limpiar_trazas():
+    with _lock:
+        _trazas.clear()
@@ -0,0 +1,108 @@
+"""
+Desactivación de asignaciones vencidas (fin anterior a hoy).
+
+Trabaja en lotes de LOTE filas. Cada lote es una sola sentencia
+(UPDATE … RETURNING → INSERT en auditoria) en su propia transacción.
+FOR UPDATE SKIP LOCKED salta las filas que un gestor está editando, así
+que el job nunca le bloquea; esas filas caen en la siguiente pasada.
+
+Se ejecuta por CLI o cron (python mantenimiento.py vencer-asignaciones),
+y app.py lanza una pasada acotada una vez al día por proceso.
+"""
+import time
+from datetime import date
+
+import metricas
+from database import get_connection
+
+LOTE = 5000
+# Pasada automática desde app.py: como mucho MAX_LOTES_APP × LOTE filas
+MAX_LOTES_APP = 10
+
+# (hoy, lote): desactiva un lote y audita cada fila en la misma sentencia
+SQL_VENCER_LOTE = """
+    WITH lote AS (
+        SELECT id
+        FROM asignaciones
+        WHERE activa = TRUE
+        AND fin < %s
+        ORDER BY id
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ), vencidas AS (
+        UPDATE asignaciones a
+        SET activa = FALSE
+        FROM lote
+        WHERE a.id = lote.id
+        RETURNING a.id, a.personal_id, a.proyecto_id, a.fin
+    )
+    INSERT INTO auditoria (usuario_id, accion, modulo, referencia, detalle, fecha)
+    SELECT
+        NULL, 'VENCER_ASIGNACION', 'ASIGNACIONES', v.proyecto_id,
+        'Asignación ' || v.id || ' (personal ' || v.personal_id
+            || ') desactivada: terminó el ' || v.fin,
+        NOW()
+    FROM vencidas v
+"""
+
+
+def vencer_asignaciones(hoy=None, lote=LOTE, max_lotes=None):
+    """
+    Pone activa = FALSE en las asignaciones con fin < hoy y deja una
+    entrada de auditoría por asignación. Devuelve dict filas, lotes,
+    segundos y filas_por_segundo.
+    """
+    hoy = hoy or date.today()
+    t0 = time.perf_counter()
+    filas = lotes = 0
+
+    conn = get_connection()
+    cur = conn.cursor()
+
+    try:
+        while max_lotes is None or lotes < max_lotes:
+            # Una sola marca en `cambios` por lote en vez de una por fila
+            cur.execute("SET LOCAL cambios.omitir = 'on'")
+            cur.execute(SQL_VENCER_LOTE, (hoy, lote))
+            n = cur.rowcount
+
+            if n > 0:
+                _marcar_cambio(cur)
+            conn.commit()
+
+            if n <= 0:
+                break
+            filas += n
+            lotes += 1
+            # Lote incompleto: no quedan vencidas (salvo las bloqueadas)
+            if n < lote:
+                break
+
+    except Exception:
+        conn.rollback()
+        raise
+
+    finally:
+        cur.close()
+        conn.close()
+
+    segundos = time.perf_counter() - t0
+    metricas.registrar_tarea("vencer_asignaciones", filas, segundos)
+
+    return {
+        "filas": filas,
+        "lotes": lotes,
+        "segundos": round(segundos, 2),
+        "filas_por_segundo": round(filas / segundos) if segundos > 0 else 0,
+    }
+
+
+def _marcar_cambio(cur):
+    # Sin personal_id / proyecto_id: invalida el modelo de planificación
+    # sin forzar recálculos de alertas (los vencidos no las afectan)
+    cur.execute("SAVEPOINT marca")
+    try:
+        cur.execute("INSERT INTO cambios (tabla) VALUES ('asignaciones')")
+        cur.execute("RELEASE SAVEPOINT marca")
+    except Exception:
+        cur.execute("ROLLBACK TO SAVEPOINT marca")
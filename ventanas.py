@@ -0,0 +1,118 @@
+"""
+Búsqueda de la primera ventana en la que `cantidad` personas (filtradas
+por área/cargo) tienen hueco para `dedicacion` % a la vez durante
+`duracion` días laborables seguidos.
+
+Se construye la matriz libre personas × días laborables del horizonte
+(fines de semana y feriados fuera; ausencias = no libre) y, con una suma
+acumulada por fila, se evalúa de golpe si cada persona está libre en cada
+ventana [t, t + duracion). Un año para toda la plantilla se resuelve en
+milisegundos.
+"""
+from datetime import date, timedelta
+
+import numpy as np
+
+from calendario_laboral import disponibilidad
+from carga import DEDICACION_COMPLETA
+from modelo_planificacion import modelo
+from trazas import trazado
+
+HORIZONTE_DIAS = 365
+
+
+def matriz_libre(asignado, dedicacion=DEDICACION_COMPLETA):
+    """
+    Bool (personas × días): True si cabe `dedicacion` % más ese día.
+    """
+    return asignado + dedicacion <= DEDICACION_COMPLETA
+
+
+def ventanas_factibles(libre, duracion):
+    """
+    Bool (personas × inicios): libre todos los días de [t, t + duracion).
+    """
+    n, dias = libre.shape
+    if duracion > dias:
+        return np.zeros((n, 0), dtype=bool)
+
+    acum = np.zeros((n, dias + 1), dtype=np.int32)
+    np.cumsum(libre, axis=1, out=acum[:, 1:])
+    return (acum[:, duracion:] - acum[:, :-duracion]) == duracion
+
+
+def primeras_ventanas(factible, cantidad, max_ventanas=5, separacion=1):
+    """
+    Índices de inicio donde al menos `cantidad` personas caben, en orden;
+    cada candidata empieza `separacion` días después de la anterior.
+    """
+    libres = factible.sum(axis=0)
+    inicios = []
+    t = 0
+
+    while len(inicios) < max_ventanas:
+        ok = np.nonzero(libres[t:] >= cantidad)[0]
+        if not len(ok):
+            break
+        t += int(ok[0])
+        inicios.append(t)
+        t += max(separacion, 1)
+
+    return inicios, libres
+
+
+@trazado()
+def buscar_ventana(cantidad, duracion, area=None, cargo=None, desde=None,
+                   horizonte_dias=HORIZONTE_DIAS, max_ventanas=5,
+                   dedicacion=DEDICACION_COMPLETA):
+    """
+    Devuelve una lista de ventanas candidatas (más temprana primero), cada una
+    dict con inicio, fin, disponibles y personal (DataFrame ordenado por
+    menos días-persona comprometidos en el horizonte). Las ventanas no se
+    solapan entre sí.
+    """
+    desde = desde or date.today()
+
+    m = modelo()
+    filas = m.activos()
+    if area:
+        filas = filas[np.asarray(m.area)[filas] == area]
+    if cargo:
+        filas = filas[np.asarray(m.cargo)[filas] == cargo]
+
+    if len(filas) < cantidad:
+        return []
+
+    personal = m.personal_frame(filas).assign(
+        area=np.asarray(m.area)[filas],
+        cargo=np.asarray(m.cargo)[filas]
+    )
+
+    trabaja = disponibilidad(personal["id"], desde, horizonte_dias)
+    laborables = np.nonzero(trabaja.any(axis=0))[0]
+
+    asignado = m.diaria(filas, desde, horizonte_dias)
+
+    # Solo columnas laborables: la duración se cuenta en días de trabajo
+    libre = matriz_libre(asignado, dedicacion) & trabaja
+    factible = ventanas_factibles(libre[:, laborables], duracion)
+    inicios, libres = primeras_ventanas(factible, cantidad, max_ventanas, duracion)
+
+    ocupacion = (
+        (asignado * trabaja).sum(axis=1) / DEDICACION_COMPLETA
+    ).round(1)
+    ventanas = []
+
+    for t in inicios:
+        quienes = np.nonzero(factible[:, t])[0]
+        quienes = quienes[np.argsort(ocupacion[quienes], kind="stable")]
+
+        inicio = desde + timedelta(days=int(laborables[t]))
+        ventanas.append({
+            "inicio": inicio,
+            "fin": desde + timedelta(days=int(laborables[t + duracion - 1])),
+            "disponibles": int(libres[t]),
+            "personal": personal.iloc[quienes].assign(dias_ocupados=ocupacion[quienes])
+        })
+
+    return ventanas
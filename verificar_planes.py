@@ -0,0 +1,202 @@
+"""
+Regresión de planes: EXPLAIN de las consultas frecuentes de logic.py
+(las constantes SQL_* que usa la aplicación, no copias).
+
+Requiere una base Postgres con datos y migraciones aplicadas:
+
+    python generar_dataset.py --destino postgres --crear-esquema --limpiar
+    python verificar_planes.py
+
+La misma revisión corre en pytest (test_planes.py, se omite sin base).
+
+Por defecto se desactiva enable_seqscan: así un Seq Scan en el plan
+significa que ningún índice sirve a la consulta (independiente del tamaño
+de las tablas). Con --sin-forzar se ve el plan que elige el planificador.
+
+Termina con código 1 si alguna consulta recorre secuencialmente una tabla
+de TABLAS o no usa el índice esperado (migraciones/0001_indices_consultas.sql).
+"""
+import argparse
+import json
+import sys
+from datetime import date, timedelta
+
+import logic
+from carga import DEDICACION_COMPLETA
+from database import get_connection
+from vencimientos import LOTE, SQL_VENCER_LOTE
+
+TABLAS = {"usuarios", "personal", "proyectos", "asignaciones"}
+
+CONSULTAS = []
+
+
+def consulta(nombre, indices=()):
+    def decorador(fn):
+        CONSULTAS.append((nombre, fn, set(indices)))
+        return fn
+    return decorador
+
+
+# =====================================================
+# CONSULTAS (EL MISMO SQL QUE USA LA APLICACIÓN)
+# =====================================================
+@consulta("validar_usuario")
+def _login(ctx):
+    return logic.SQL_USUARIO, ("admin",)
+
+
+@consulta("validar_token_reset", ["usuarios_reset_token_idx"])
+def _token(ctx):
+    return logic.SQL_USUARIO_POR_TOKEN, ("token",)
+
+
+@consulta("generar_token_reset", ["usuarios_email_idx"])
+def _email(ctx):
+    # Solo EXPLAIN (sin ANALYZE): el UPDATE no se ejecuta
+    return logic.SQL_GUARDAR_TOKEN_RESET, ("token", ctx["hoy"], "admin@example.com")
+
+
+@consulta("obtener_personal_dashboard", ["personal_activos_idx"])
+def _personal(ctx):
+    return logic.SQL_PERSONAL_ACTIVO, ()
+
+
+@consulta("obtener_proyectos", ["proyectos_vigentes_idx"])
+def _proyectos(ctx):
+    return logic.SQL_PROYECTOS_VIGENTES, ()
+
+
+@consulta("kpi_proyectos_confirmados", ["proyectos_vigentes_idx"])
+def _confirmados(ctx):
+    return logic.SQL_PROYECTOS_CONFIRMADOS, ()
+
+
+@consulta("hay_solapamiento", ["asignaciones_personal_idx"])
+def _solapamiento(ctx):
+    return logic.SQL_ASIGNACIONES_PERSONA, (ctx["pid"], ctx["hasta"], ctx["hoy"])
+
+
+@consulta("disponibilidad_requerimientos", ["asignaciones_activas_idx", "asignaciones_proyecto_idx"])
+def _disponibilidad(ctx):
+    return logic.SQL_DISPONIBILIDAD, (ctx["hasta"], ctx["hoy"], ctx["proyectos"])
+
+
+@consulta("kpi_personal", ["personal_activos_idx"])
+def _kpi_personal(ctx):
+    return logic.SQL_KPI_PERSONAL, (DEDICACION_COMPLETA,)
+
+
+@consulta("kpi_asignaciones", ["asignaciones_activas_idx"])
+def _kpi_asignaciones(ctx):
+    return logic.SQL_ASIGNACIONES_ACTIVAS, ()
+
+
+@consulta("proyectos_gantt_por_persona", ["asignaciones_personal_idx"])
+def _gantt(ctx):
+    return logic.SQL_GANTT_PERSONA, (ctx["pid"],)
+
+
+@consulta("vencer_asignaciones[lote]")
+def _vencimientos(ctx):
+    return SQL_VENCER_LOTE, (ctx["hoy"], LOTE)
+
+
+# =====================================================
+# PLANES
+# =====================================================
+def _contexto(cur):
+    cur.execute("SELECT personal_id FROM asignaciones WHERE activa = TRUE LIMIT 1")
+    fila = cur.fetchone()
+    cur.execute("SELECT ARRAY(SELECT id FROM proyectos ORDER BY id LIMIT 5)")
+    hoy = date.today()
+    return {
+        "pid": fila[0] if fila else 1,
+        "proyectos": cur.fetchone()[0],
+        "hoy": hoy,
+        "hasta": hoy + timedelta(days=90),
+    }
+
+
+def _nodos(plan):
+    yield plan
+    for hijo in plan.get("Plans", ()):
+        yield from _nodos(hijo)
+
+
+def revisar(plan, esperados):
+    """
+    (problemas, índices usados) de un plan JSON.
+    """
+    nodos = list(_nodos(plan))
+    usados = {n["Index Name"] for n in nodos if "Index Name" in n}
+
+    problemas = [
+        f"Seq Scan en {n['Relation Name']}"
+        for n in nodos
+        if n["Node Type"] == "Seq Scan" and n.get("Relation Name") in TABLAS
+    ]
+    problemas += [f"no usa {i}" for i in sorted(esperados - usados)]
+    return problemas, usados
+
+
+def verificar(forzar=True, mostrar=False):
+    """
+    Devuelve [(nombre, problemas, índices usados)].
+    """
+    conn = get_connection()
+    cur = conn.cursor()
+    resultados = []
+
+    try:
+        ctx = _contexto(cur)
+        if forzar:
+            cur.execute("SET LOCAL enable_seqscan = off")
+
+        for nombre, fn, esperados in CONSULTAS:
+            sql, params = fn(ctx)
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            doc = cur.fetchone()[0]
+            if isinstance(doc, str):
+                doc = json.loads(doc)
+            plan = doc[0]["Plan"]
+
+            problemas, usados = revisar(plan, esperados)
+            resultados.append((nombre, problemas, usados))
+
+            if mostrar and problemas:
+                cur.execute("EXPLAIN " + sql, params)
+                print("\n".join(r[0] for r in cur.fetchall()))
+
+    finally:
+        # Solo EXPLAIN (sin ANALYZE): nada que confirmar
+        conn.rollback()
+        cur.close()
+        conn.close()
+
+    return resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regresión de planes de consulta")
+    parser.add_argument("--sin-forzar", action="store_true",
+                        help="No desactivar enable_seqscan (plan real del planificador)")
+    parser.add_argument("--mostrar-planes", action="store_true",
+                        help="Imprime el plan de las consultas que fallan")
+    args = parser.parse_args(argv)
+
+    fallos = 0
+    for nombre, problemas, usados in verificar(not args.sin_forzar, args.mostrar_planes):
+        if problemas:
+            fallos += 1
+            print(f"❌ {nombre}: {'; '.join(problemas)}")
+        else:
+            print(f"✅ {nombre}: {', '.join(sorted(usados)) or '-'}")
+
+    if fallos:
+        print(f"\n{fallos} consultas sin índice adecuado")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()